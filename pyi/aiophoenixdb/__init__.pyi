@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import aiohttp
+from typing import List, Tuple
 from .connection import Connection
+from .pool import Pool
+from .sizing import AdaptiveFrameSize
+from .avatica.balancer import EndpointBalancer, Endpoint
+from .avatica.retry import RetryPolicy, RetryBudget
+from .avatica.connector import SharedSession, set_default_session, close_default_session
 
 
-async def connect(url,
+async def connect(url: str | List[str | Tuple[str, int] | Endpoint] | EndpointBalancer,
                   max_retries: int | None,
                   auth=None,
                   authentication=None,
@@ -27,4 +34,18 @@ async def connect(url,
                   user=None,
                   password=None,
                   extra_headers=None,
-                  **kwargs) -> Connection: ...
\ No newline at end of file
+                  session: SharedSession | aiohttp.ClientSession | None = None,
+                  balance_strategy: str = 'least_outstanding',
+                  retry_policy: RetryPolicy | None = None,
+                  retry_budget: RetryBudget | None = None,
+                  timeout: float | None = None,
+                  **kwargs) -> Connection: ...
+
+
+async def create_pool(url,
+                      minsize: int = 1,
+                      maxsize: int = 10,
+                      max_idle: float = 300.0,
+                      max_lifetime: float | None = 3600.0,
+                      validate_interval: float | None = 30.0,
+                      **kwargs) -> Pool: ...
@@ -0,0 +1,55 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+import pyarrow
+
+from aiophoenixdb.avatica.proto.common_pb import ColumnMetaData
+from aiophoenixdb.types import MS_PER_DAY as MS_PER_DAY
+
+__all__: List[str]
+
+
+ARROW_TYPES: Dict[int, Callable[[int, int], pyarrow.DataType]]
+
+_ARROW_TYPES: Dict[int, Callable[[int, int], pyarrow.DataType]]
+
+
+def _decimal(precision: int, scale: int) -> pyarrow.DataType: ...
+
+
+def require_pyarrow() -> ModuleType: ...
+
+
+def arrow_type(column: ColumnMetaData) -> pyarrow.DataType: ...
+
+
+def _arrow_type(jdbc_code: int, precision: int, scale: int) -> pyarrow.DataType: ...
+
+
+def arrow_schema(columns: Sequence[ColumnMetaData], names: Sequence[str]) -> pyarrow.Schema: ...
+
+
+class RecordBatchConverter(object):
+    schema: pyarrow.Schema
+    _time_columns: frozenset[int]
+
+    def __init__(self, schema: pyarrow.Schema, time_columns: Iterable[int] = ...): ...
+
+    def convert(self, rows: Sequence[Sequence[Any]], raw: bool) -> pyarrow.RecordBatch: ...
+
+    def to_table(self, batches: Iterable[pyarrow.RecordBatch]) -> pyarrow.Table: ...
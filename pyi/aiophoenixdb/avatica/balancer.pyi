@@ -0,0 +1,63 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, Iterable, List, Tuple
+from .retry import CircuitBreaker
+
+__all__: List[str]
+
+LEAST_OUTSTANDING: str
+ROUND_ROBIN: str
+STRATEGIES: Tuple[str, ...]
+
+
+class Endpoint(object):
+    url: str
+    weight: int
+    outstanding: int
+    connections: int
+    _current_weight: int
+    circuit_breaker: CircuitBreaker
+
+    def __init__(self, url: str, weight: int = 1): ...
+
+
+class EndpointBalancer(object):
+    _endpoints: List[Endpoint]
+    _strategy: str
+    _next: int
+
+    def __init__(self, endpoints: Iterable[str | Tuple[str, int] | Endpoint], strategy: str = ...): ...
+
+    @staticmethod
+    def _to_endpoint(endpoint: str | Tuple[str, int] | Endpoint) -> Endpoint: ...
+
+    @property
+    def endpoints(self) -> List[Endpoint]: ...
+
+    @property
+    def strategy(self) -> str: ...
+
+    def select(self) -> Endpoint: ...
+
+    def _select_least_outstanding(self, endpoints: List[Endpoint]) -> Endpoint: ...
+
+    def _select_round_robin(self, endpoints: List[Endpoint]) -> Endpoint: ...
+
+
+_balancers: Dict[Tuple, EndpointBalancer]
+
+
+def get_balancer(endpoints: Iterable[str | Tuple[str, int] | Endpoint] | EndpointBalancer,
+                 strategy: str = ...) -> EndpointBalancer: ...
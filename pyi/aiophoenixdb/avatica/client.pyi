@@ -12,16 +12,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import ssl
+import asyncio
 import aiohttp
 import betterproto
 from html.parser import HTMLParser
-from typing import TypeVar, Type, List, Dict, Any, Optional
+from typing import TypeVar, Type, List, Dict, Any, Optional, Callable, Tuple, Iterable
 from urllib.parse import ParseResult
 from aiohttp import ClientResponse, BasicAuth
 from aiophoenixdb import errors
 from aiophoenixdb.typeshed import Self
+from .balancer import Endpoint
+from .connector import SharedSession
+from .retry import RetryPolicy, RetryBudget, CircuitBreaker
+from .decoder import RowDecoder, ResultSet
+from .decoder import Frame as DecodedFrame
+from .proto.responses_pb import RpcMetadata
 from .proto.common_pb import Frame
 from .proto.common_pb import StatementHandle
+from .proto.common_pb import Signature
 from .proto.common_pb import ConnectionProperties
 from .proto.responses_pb import ResultSetResponse
 from .proto.responses_pb import SyncResultsResponse
@@ -71,6 +80,15 @@ def parse_error_page(html: str) -> None: ...
 def parse_error_protobuf(text: bytes) -> None: ...
 
 
+def deadline_after(timeout: float | None) -> float | None: ...
+
+
+def time_left(deadline: float | None) -> float | None: ...
+
+
+def _ssl_option(verify) -> ssl.SSLContext | bool | None: ...
+
+
 _MESSAGE_TYPE = TypeVar("_MESSAGE_TYPE", bound=betterproto.Message)
 
 
@@ -78,68 +96,102 @@ class AvaticaClient(object):
     _url: str
     _headers = {'content-type': 'application/x-google-protobuf'}
     _verify: Any
+    _ssl: ssl.SSLContext | bool | None
+    _auth: Optional[BasicAuth]
     _max_retries: int
-    _session: aiohttp.ClientSession
+    _retry_policy: RetryPolicy
+    _retry_budget: RetryBudget
+    _circuit_breaker: CircuitBreaker
+    _shared_session: SharedSession
+    _session: aiohttp.ClientSession | None
+    _lock: asyncio.Lock
 
-    def __init__(self, url: str, max_retries: int, verify, extra_headers: Dict, auth: Optional[BasicAuth]): ...
+    _endpoint: Endpoint | None
+    _server_address: str | None
 
-    async def __post_request(self, body: bytes, retry_delay: int = 1) -> ClientResponse: ...
+    def __init__(self, url: str, max_retries: int, verify, extra_headers: Dict, auth: Optional[BasicAuth],
+                 session: Optional[SharedSession] = None, endpoint: Optional[Endpoint] = None,
+                 retry_policy: Optional[RetryPolicy] = None, retry_budget: Optional[RetryBudget] = None): ...
 
-    async def _request(self, request_data: betterproto.Message,
-                       expected_response_cls: Type[_MESSAGE_TYPE] | None = None) -> _MESSAGE_TYPE: ...
+    @property
+    def url(self) -> str: ...
 
-    async def get_catalogs(self, connection_id: str) -> ResultSetResponse: ...
+    @property
+    def server_address(self) -> str | None: ...
+
+    def _check_server_address(self, metadata: RpcMetadata | None) -> None: ...
+
+    def _get_session(self) -> aiohttp.ClientSession: ...
+
+    async def __post_request(self, body: bytes, request_name: str,
+                             deadline: float | None = None) -> ClientResponse: ...
+
+    async def _request(self, request_data: betterproto.Message | bytes,
+                       expected_response_cls: Type[_MESSAGE_TYPE] | None = None,
+                       timeout: float | None = None,
+                       decode: Callable[[bytes, int, int], Any] | None = None,
+                       request_name: str | None = None) -> _MESSAGE_TYPE: ...
+
+    async def get_catalogs(self, connection_id: str, timeout: float | None = None) -> ResultSetResponse: ...
 
     async def get_schemas(self, connection_id: str,
                           catalog: str | None = None,
-                          schema_pattern: str | None = None) -> ResultSetResponse: ...
+                          schema_pattern: str | None = None, timeout: float | None = None) -> ResultSetResponse: ...
 
     async def get_tables(self, connection_id, catalog=None,
                          schema_pattern=None,
                          table_name_pattern=None,
-                         type_list: List[str] = None) -> ResultSetResponse: ...
+                         type_list: List[str] = None, timeout: float | None = None) -> ResultSetResponse: ...
 
     async def get_columns(self, connection_id,
                           catalog=None, schema_pattern=None,
                           table_name_pattern=None,
-                          column_name_pattern=None) -> ResultSetResponse: ...
+                          column_name_pattern=None, timeout: float | None = None) -> ResultSetResponse: ...
 
-    async def get_table_types(self, connection_id) -> ResultSetResponse: ...
+    async def get_table_types(self, connection_id, timeout: float | None = None) -> ResultSetResponse: ...
 
-    async def get_type_info(self, connection_id) -> ResultSetResponse: ...
+    async def get_type_info(self, connection_id, timeout: float | None = None) -> ResultSetResponse: ...
 
-    async def get_sync_results(self, connection_id, statement_id, state) -> SyncResultsResponse: ...
+    async def get_sync_results(self, connection_id, statement_id, state, timeout: float | None = None) -> SyncResultsResponse: ...
 
-    async def connection_sync_dict(self, connection_id, conn_props: Dict[str, Any] = None) -> Dict[str, Any]: ...
+    async def connection_sync_dict(self, connection_id, conn_props: Dict[str, Any] = None, timeout: float | None = None) -> Dict[str, Any]: ...
 
-    async def connection_sync(self, connection_id, conn_props: Dict[str, Any] = None) -> ConnectionProperties: ...
+    async def connection_sync(self, connection_id, conn_props: Dict[str, Any] = None, timeout: float | None = None) -> ConnectionProperties: ...
 
-    async def open_connection(self, connection_id, info=None) -> OpenConnectionResponse: ...
+    async def open_connection(self, connection_id, info=None, timeout: float | None = None) -> OpenConnectionResponse: ...
 
-    async def close_connection(self, connection_id) -> CloseConnectionResponse: ...
+    async def close_connection(self, connection_id, timeout: float | None = None) -> CloseConnectionResponse: ...
 
-    async def create_statement(self, connection_id) -> int: ...
+    async def create_statement(self, connection_id, timeout: float | None = None) -> int: ...
 
-    async def close_statement(self, connection_id, statement_id) -> CloseStatementResponse: ...
+    async def close_statement(self, connection_id, statement_id, timeout: float | None = None) -> CloseStatementResponse: ...
 
     async def prepare_and_execute(self, connection_id, statement_id, sql, max_rows_total=None,
-                                  first_frame_max_size=None) -> List[ResultSetResponse]: ...
+                                  first_frame_max_size=None, timeout: float | None = None,
+                                  row_decoder_factory: Callable[[Signature], RowDecoder] | None = None
+                                  ) -> List[ResultSetResponse] | List[ResultSet]: ...
+
+    async def prepare_and_execute_batch(self, connection_id, statement_id, sql_commands: Iterable[str],
+                                        timeout: float | None = None) -> List[int]: ...
 
-    async def prepare(self, connection_id, sql, max_rows_total=None) -> StatementHandle: ...
+    async def prepare(self, connection_id, sql, max_rows_total=None, timeout: float | None = None) -> StatementHandle: ...
 
     async def execute(self, connection_id,
                       statement_id,
                       signature,
                       parameter_values=None,
-                      first_frame_max_size=None) -> List[ResultSetResponse]: ...
+                      first_frame_max_size=None, timeout: float | None = None,
+                      row_decoder_factory: Callable[[Signature], RowDecoder] | None = None
+                      ) -> List[ResultSetResponse] | List[ResultSet]: ...
 
-    async def execute_batch(self, connection_id, statement_id, rows) -> List[int]: ...
+    async def execute_batch(self, connection_id, statement_id, rows, timeout: float | None = None) -> List[int]: ...
 
-    async def fetch(self, connection_id, statement_id, offset=0, frame_max_size=None) -> Frame: ...
+    async def fetch(self, connection_id, statement_id, offset=0, frame_max_size=None, timeout: float | None = None,
+                    row_decoder: RowDecoder | None = None) -> Frame | DecodedFrame: ...
 
-    async def commit(self, connection_id) -> CommitResponse: ...
+    async def commit(self, connection_id, timeout: float | None = None) -> CommitResponse: ...
 
-    async def rollback(self, connection_id) -> RollbackResponse: ...
+    async def rollback(self, connection_id, timeout: float | None = None) -> RollbackResponse: ...
 
     async def close(self) -> None: ...
 
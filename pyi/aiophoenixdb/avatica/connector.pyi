@@ -0,0 +1,64 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import aiohttp
+from typing import Any, Dict, List, Optional
+from aiophoenixdb.typeshed import Self
+
+__all__: List[str]
+
+
+class SharedSession(object):
+    _connector_kwargs: Dict[str, Any]
+    _session: aiohttp.ClientSession | None
+    _owned: bool
+    _shares: Dict[asyncio.AbstractEventLoop, List[Any]]
+    _closing: bool
+
+    def __init__(self,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: float = 15.0,
+                 ttl_dns_cache: int | None = 10,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 **connector_kwargs): ...
+
+    @property
+    def refcount(self) -> int: ...
+
+    @property
+    def closed(self) -> bool: ...
+
+    def acquire(self) -> aiohttp.ClientSession: ...
+
+    async def release(self, session: aiohttp.ClientSession) -> None: ...
+
+    async def close(self) -> None: ...
+
+    async def __aenter__(self: Self) -> Self: ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+
+_default_session: SharedSession | None
+
+
+def get_default_session() -> SharedSession: ...
+
+
+def set_default_session(session: SharedSession | aiohttp.ClientSession) -> None: ...
+
+
+async def close_default_session() -> None: ...
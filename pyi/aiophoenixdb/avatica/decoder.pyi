@@ -0,0 +1,179 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, overload
+from .proto import common_pb
+from .proto.responses_pb import RpcMetadata
+
+__all__: List[str]
+
+FIELD_NUMBERS: Dict[str, int]
+FIELD_DEFAULTS: Dict[int, Any]
+
+
+class Frame(object):
+    offset: int
+    done: bool
+    rows: List[Tuple[Any, ...]]
+    nbytes: int
+
+    def __init__(self, offset: int = 0, done: bool = False, rows: Optional[List[Tuple[Any, ...]]] = None,
+                 nbytes: int = 0): ...
+
+
+class ResultSet(object):
+    connection_id: str
+    statement_id: int
+    own_statement: bool
+    signature: common_pb.Signature | None
+    first_frame: Frame | None
+    update_count: int
+    metadata: RpcMetadata | None
+
+
+class ExecuteResult(object):
+    results: List[ResultSet]
+    missing_statement: bool
+    metadata: RpcMetadata | None
+
+
+class FetchResult(object):
+    frame: Frame | None
+    missing_statement: bool
+    missing_results: bool
+    metadata: RpcMetadata | None
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]: ...
+
+
+def _read_tag(buf: bytes, pos: int) -> Tuple[int, int]: ...
+
+
+def _skip_field(buf: bytes, pos: int, tag: int) -> int: ...
+
+
+def _read_string(buf: bytes, pos: int) -> Tuple[str, int]: ...
+
+
+def _decode_typed_value(buf: bytes, pos: int, end: int, field: int) -> Any: ...
+
+
+def _decode_column_value(buf: bytes, pos: int, end: int, field: int,
+                         cast_from: Callable[[Any], Any] | None) -> Any: ...
+
+
+def _decode_row(buf: bytes, pos: int, end: int,
+                columns: Tuple[Tuple[int, Callable[[Any], Any] | None], ...]) -> Tuple[Any, ...]: ...
+
+
+_CELL_TEMPLATE: str
+_LENGTH_DELIMITED_TEMPLATE: str
+_VALUE_TEMPLATES: Dict[int, str]
+_RAW_VALUES: Dict[int, str]
+
+
+def _cast(i: int, cast_from: Callable[[Any], Any] | None, expression: str) -> str: ...
+
+
+def _compile_row_decoder(
+        columns: Tuple[Tuple[int, Callable[[Any], Any] | None], ...]
+) -> Callable[[bytes, int, int], List[Any]]: ...
+
+
+class RowDecoder(object):
+    columns: Tuple[Tuple[int, Callable[[Any], Any] | None], ...]
+    decode_row: Callable[[bytes, int, int], Tuple[Any, ...]]
+
+    def __init__(self, column_types: Iterable[Tuple[str, Any, Any, Any]]): ...
+
+    def decode_frame(self, buf: bytes, pos: int = 0, end: int | None = None) -> Frame: ...
+
+    def decode_message(self, frame: common_pb.Frame | None) -> Frame | None: ...
+
+
+class LazyRow(object):
+    _buf: bytes | None
+    _start: int
+    _end: int
+    _columns: Tuple[Tuple[int, Callable[[Any], Any] | None], ...]
+    _spans: List[Tuple[int, int]] | None
+    _values: List[Any]
+    _remaining: int
+
+    def __init__(self, buf: bytes, pos: int, end: int,
+                 columns: Tuple[Tuple[int, Callable[[Any], Any] | None], ...]): ...
+
+    def _index(self) -> List[Tuple[int, int]]: ...
+
+    def _get(self, i: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[Any, ...]: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[Any]: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+
+class LazyRowDecoder(RowDecoder):
+
+    def decode_row(self, buf: bytes, pos: int, end: int) -> LazyRow: ...
+
+
+class StringInterner(Dict[str, str]):
+    max_size: int
+
+    def __init__(self, max_size: int = 65536): ...
+
+    def __missing__(self, key: str) -> str: ...
+
+
+def _get_row_decoder(column_types: Tuple[Tuple[str, Any, Any, Any], ...],
+                     decoder_class: Type[RowDecoder]) -> RowDecoder: ...
+
+
+def get_row_decoder(column_types: Iterable[Tuple[str, Any, Any, Any]],
+                    decoder_class: Type[RowDecoder] = ...) -> RowDecoder: ...
+
+
+def get_lazy_row_decoder(column_types: Iterable[Tuple[str, Any, Any, Any]]) -> LazyRowDecoder: ...
+
+
+def row_decoder_for(signature: common_pb.Signature) -> RowDecoder: ...
+
+
+def decode_wire_message(buf: bytes) -> Tuple[str, int, int]: ...
+
+
+def _decode_metadata(buf: bytes, pos: int, end: int) -> RpcMetadata: ...
+
+
+def _decode_result_set(buf: bytes, pos: int, end: int,
+                       row_decoder_factory: Callable[[common_pb.Signature], RowDecoder]) -> ResultSet: ...
+
+
+def decode_execute_response(buf: bytes, pos: int, end: int,
+                            row_decoder_factory: Callable[[common_pb.Signature], RowDecoder] = ...
+                            ) -> ExecuteResult: ...
+
+
+def decode_fetch_response(buf: bytes, pos: int, end: int, row_decoder: RowDecoder) -> FetchResult: ...
@@ -0,0 +1,112 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from aiophoenixdb import errors
+from aiophoenixdb.avatica.proto.common_pb import TypedValue
+
+__all__: List[str]
+
+_SMALL_VARINTS: List[bytes]
+
+_INT64_MIN: int
+_INT64_MAX: int
+
+_VALUE_ENCODERS: Dict[str, Callable[[Any], bytes]]
+
+_NULL_VALUE: bytes
+
+_NULL_ELEMENT: bytes
+
+_VALUE_TEMPLATES: Dict[str, str]
+
+_PARAMETER_TEMPLATE: str
+
+_ARRAY_TEMPLATE: str
+
+
+def _pack_double(v: float) -> bytes: ...
+
+
+def _varint(n: int) -> bytes: ...
+
+
+def _zigzag(n: int) -> int: ...
+
+
+def _field(number: int, data: bytes) -> bytes: ...
+
+
+def _enum_field(number: int, value: int) -> bytes: ...
+
+
+def _encode_bool(v: Any) -> bytes: ...
+
+
+def _encode_string(v: str) -> bytes: ...
+
+
+def _encode_number(v: int) -> bytes: ...
+
+
+def _encode_bytes(v: bytes) -> bytes: ...
+
+
+def _encode_double(v: float) -> bytes: ...
+
+
+def _invalid(i: int, value: Any, error: Exception) -> errors.ProgrammingError: ...
+
+
+def _array_encoder(field_name: str, rep: Any, mutate_to: Callable[[Any], Any] | None) -> Callable[[Sequence[Any]], bytes]: ...
+
+
+def _compile_parameter_encoder(parameter_types: Tuple[Tuple[str, Any, Any, Any, bool], ...],
+                               field_number: int) -> Callable[[Sequence[Any]], bytes]: ...
+
+
+class ParameterEncoder(object):
+    parameter_types: Tuple[Tuple[str, Any, Any, Any, bool], ...]
+    _encode_execute: Callable[[Sequence[Any]], bytes]
+    _encode_update: Callable[[Sequence[Any]], bytes]
+
+    def __init__(self, parameter_types: Iterable[Tuple[str, Any, Any, Any, bool]]): ...
+
+    def _check(self, values: Sequence[Any]) -> None: ...
+
+    def encode_execute(self, values: Sequence[Any]) -> bytes: ...
+
+    def encode_update(self, values: Sequence[Any]) -> bytes: ...
+
+
+def _get_parameter_encoder(parameter_types: Tuple[Tuple[str, Any, Any, Any, bool], ...]) -> ParameterEncoder: ...
+
+
+def get_parameter_encoder(parameter_types: Iterable[Tuple[str, Any, Any, Any, bool]]) -> ParameterEncoder: ...
+
+
+def encode_wire_message(name: str, data: bytes) -> bytes: ...
+
+
+def encode_statement_handle(connection_id: str, statement_id: int, signature: bytes) -> bytes: ...
+
+
+def encode_parameter_values(values: Iterable[TypedValue]) -> bytes: ...
+
+
+def encode_execute_request(handle: bytes, parameters: bytes | None, first_frame_max_size: int | None = None) -> bytes: ...
+
+
+def encode_execute_batch_request(connection_id: str, statement_id: int, updates: Iterable[bytes]) -> bytes: ...
@@ -0,0 +1,99 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, FrozenSet, Iterable, List
+
+__all__: List[str]
+
+IDEMPOTENT_REQUESTS: FrozenSet[str]
+
+
+class RetryPolicy(object):
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    max_elapsed: float
+    idempotent_requests: FrozenSet[str]
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.1,
+                 max_delay: float = 5.0,
+                 max_elapsed: float = 30.0,
+                 idempotent_requests: Iterable[str] = ...): ...
+
+    def is_idempotent(self, request_name: str) -> bool: ...
+
+    def backoff(self, attempt: int) -> float: ...
+
+
+class RetryBudget(object):
+    _ratio: float
+    _min_retries_per_second: float
+    _max_tokens: float
+    _tokens: float
+    _updated: float
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 10.0, max_tokens: float = 100.0): ...
+
+    @property
+    def tokens(self) -> float: ...
+
+    def _refill(self) -> None: ...
+
+    def record_request(self) -> None: ...
+
+    def try_withdraw(self) -> bool: ...
+
+
+class CircuitBreaker(object):
+    CLOSED: str
+    OPEN: str
+    HALF_OPEN: str
+
+    failure_threshold: int
+    reset_timeout: float
+    _state: str
+    _failures: int
+    _opened_at: float
+    _probing: bool
+    _probe_started: float
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0): ...
+
+    @property
+    def state(self) -> str: ...
+
+    def _probe_pending(self) -> bool: ...
+
+    @property
+    def available(self) -> bool: ...
+
+    def allow(self) -> bool: ...
+
+    def record_success(self) -> None: ...
+
+    def record_failure(self) -> None: ...
+
+
+_default_retry_budget: RetryBudget
+
+
+def get_default_retry_budget() -> RetryBudget: ...
+
+
+_circuit_breakers: Dict[str, CircuitBreaker]
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker: ...
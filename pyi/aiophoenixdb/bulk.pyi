@@ -0,0 +1,89 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import datetime
+import logging
+import os
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+import pandas
+
+from aiophoenixdb.connection import Connection
+from aiophoenixdb.pool import Pool
+
+__all__: List[str]
+
+logger: logging.Logger
+
+_CSV_PARSERS: Dict[int, Callable[[str], Any]]
+
+_DONE: object
+
+
+def _parse_bool(value: str) -> bool: ...
+
+
+def _parse_datetime(value: str) -> datetime.datetime: ...
+
+
+def _parse_time(value: str) -> datetime.time: ...
+
+
+def _quote(name: str) -> str: ...
+
+
+def upsert_statement(table: str, columns: Sequence[str]) -> str: ...
+
+
+async def _get_column_types(connection: Connection, table: str) -> Tuple[Dict[str, int], List[str]]: ...
+
+
+def _csv_rows(source: str | os.PathLike | TextIO, parsers: Sequence[Callable[[str], Any] | None], skip_header: bool,
+              encoding: str, fmtparams: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]: ...
+
+
+def _frame_rows(frame: pandas.DataFrame) -> Iterator[Tuple[Any, ...]]: ...
+
+
+class Loader(object):
+    _connection: Connection
+    _table: str
+    _columns: List[str] | None
+    _workers: int
+    _batch_size: int
+    _commit_every: int | None
+    _queue_size: int
+    _pool: Pool | None
+    _timeout: float | None
+    rows: int
+    batches: int
+    commits: int
+
+    def __init__(self, connection: Connection, table: str, columns: Sequence[str] | None = None, workers: int = 4,
+                 batch_size: int = 10000, commit_every: int | None = 100000, queue_size: int | None = None,
+                 pool: Pool | None = None, timeout: float | None = None): ...
+
+    async def load(self, source: Iterable[Sequence[Any]] | AsyncIterable[Sequence[Any]] | pandas.DataFrame | str
+                   | os.PathLike | TextIO, skip_header: bool = False, encoding: str = 'utf-8',
+                   **fmtparams: Any) -> int: ...
+
+    async def _produce(self, rows: Iterable[Sequence[Any]] | AsyncIterable[Sequence[Any]],
+                       queue: asyncio.Queue) -> None: ...
+
+    async def _work(self, sql: str, queue: asyncio.Queue) -> None: ...
+
+    async def _write(self, connection: Connection, sql: str, queue: asyncio.Queue) -> None: ...
+
+    async def _commit(self, connection: Connection, uncommitted: int) -> None: ...
@@ -0,0 +1,45 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy
+
+__all__: List[str]
+
+
+class CategoricalArray(NamedTuple):
+    codes: numpy.ndarray
+    categories: numpy.ndarray
+
+
+_STORAGE_DTYPES: Dict[str, str]
+
+
+def require_numpy() -> ModuleType: ...
+
+
+class ColumnBuilder(object):
+    _column_types: Sequence[Tuple[str | None, Callable[[Any], Any] | None]]
+    _chunks: List[List[numpy.ndarray]]
+    _masks: List[List[numpy.ndarray]]
+    _categories: Dict[int, Dict[Any, int]]
+
+    def __init__(self, column_types: Sequence[Tuple[str | None, Callable[[Any], Any] | None]],
+                 categorical: Iterable[int] = ...): ...
+
+    def add(self, rows: Sequence[Sequence[Any]], raw: bool) -> None: ...
+
+    def build(self) -> List[numpy.ma.MaskedArray | CategoricalArray]: ...
@@ -14,9 +14,13 @@
 
 from .cursors import Cursor, CursorRef
 from .avatica.client import AvaticaClient
-from typing import Generic, TypeVar, overload, Dict, Any, List
+import asyncio
+from typing import Generic, TypeVar, overload, Dict, Any, List, Set, Sequence, AsyncIterator
 from aiophoenixdb.typeshed import Props, Self
 from .meta import Meta
+from .pool import Pool
+from .types import Converters
+from .statements import StatementCache, StatementPool
 
 _C = TypeVar("_C", bound=Cursor)
 _C2 = TypeVar("_C2", bound=Cursor)
@@ -32,14 +36,23 @@ class Connection(Generic[_C]):
     avatica_props_init: Dict[str, Any]
     _conn_id: str
     _avatica_props: Dict
+    _background_tasks: Set[asyncio.Task]
+    _converters: Converters | None
+    _statement_cache: StatementCache
+    _statement_pool: StatementPool
+    _pending_closes: List[int]
+    _close_task: asyncio.Task | None
 
     def __init__(self,
                  client: AvaticaClient,
                  cursor_factory: _C,
+                 converters: Converters | str | Dict[Any, Any] | None = None,
+                 statement_cache_size: int = 32,
+                 statement_pool_size: int = 16,
                  **kwargs
                  ): ...
 
-    async def connect(self): ...
+    async def connect(self, timeout: float | None = None) -> None: ...
     async def __aenter__(self: Self) -> Self: ...
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
 
@@ -50,12 +63,23 @@ class Connection(Generic[_C]):
     @property
     def connect_id(self) -> str: ...
     @property
+    def statement_cache(self) -> StatementCache: ...
+    @property
+    def statement_pool(self) -> StatementPool: ...
+    @property
+    def converters(self) -> Converters | None: ...
+    @converters.setter
+    def converters(self, value: Converters | str | Dict[Any, Any] | None) -> None: ...
+    @property
     def _default_avatica_props(self): ...
     @staticmethod
     def _map_conn_props(conn_props: Props): ...
     @staticmethod
     def _map_legacy_avatica_props(props: Props): ...
-    async def open(self) -> None: ...
+    async def open(self, timeout: float | None = None) -> None: ...
+    def _close_statement_later(self, statement_id: int) -> None: ...
+    async def _close_pending_statements(self) -> None: ...
+    def _background_task_done(self, task: asyncio.Task) -> None: ...
     async def close(self) -> None: ...
     async def commit(self) -> None: ...
     async def rollback(self) -> None: ...
@@ -63,7 +87,7 @@ class Connection(Generic[_C]):
     def cursor(self) -> _C: ...
     @overload
     def cursor(self, cursor_factory: type[_C2] | None = ...) -> _C2: ...
-    async def set_session(self, **props) -> None: ...
+    async def set_session(self, timeout: float | None = None, **props) -> None: ...
 
     @overload
     def autocommit(self) -> bool: ...
@@ -80,4 +104,13 @@ class Connection(Generic[_C]):
     @overload
     def transactionisolation(self, value) -> None: ...
 
+    def parallel_scan(self, sql: str, split_by: str, parallelism: int = 4, parameters: Sequence[Any] | None = None,
+                      table: str | None = None, splits: Sequence[Any] | None = None, ordered: bool = False,
+                      pool: Pool | None = None, buffer_frames: int = 2,
+                      timeout: float | None = None) -> AsyncIterator[Any]: ...
+
+    async def bulk_upsert(self, table: str, columns: Sequence[str] | None, source: Any, workers: int = 4,
+                          batch_size: int = 10000, commit_every: int | None = 100000, queue_size: int | None = None,
+                          pool: Pool | None = None, timeout: float | None = None, **csv_options: Any) -> int: ...
+
     def meta(self) -> Meta: ...
\ No newline at end of file
@@ -11,14 +11,32 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import datetime
 from _weakref import ReferenceType
-from typing import Any, List, Generator, Dict, TypeVar, Callable
+import numpy
+import pandas
+import pyarrow
+from typing import Any, List, Generator, Dict, TypeVar, Callable, Tuple, Sequence, AsyncIterator, NamedTuple, Type, Iterable, FrozenSet, Awaitable, AsyncIterable, AsyncGenerator
+from aiophoenixdb.columnar import CategoricalArray
+from aiophoenixdb.arrow import RecordBatchConverter
+from aiophoenixdb.sizing import AdaptiveFrameSize
+from aiophoenixdb.types import Converters
+from aiophoenixdb.statements import PreparedStatement
 from aiophoenixdb.typeshed import Self
-from aiophoenixdb.avatica.proto.common_pb import ColumnMetaData, Signature, Frame, Row
+from aiophoenixdb.avatica.proto.common_pb import ColumnMetaData, Signature
+from aiophoenixdb.avatica.decoder import Frame
 from aiophoenixdb.avatica.proto.responses_pb import ResultSetResponse, SyncResultsResponse
 from aiophoenixdb.connection import Connection
+from aiophoenixdb.avatica.decoder import RowDecoder, LazyRowDecoder, ResultSet, StringInterner
+from aiophoenixdb.avatica.encoder import ParameterEncoder
 
 _C = TypeVar("_C", bound="Cursor")
+_T = TypeVar("_T")
+
+_ENCODE_SLICE: int
+
+def _aiter(iterable: Iterable[_T]) -> AsyncIterator[_T]: ...
 
 class CursorRef:
 
@@ -31,30 +49,118 @@ class CursorRef:
 class Cursor(object):
     _ARRAY_SIZE: int
     _ITER_SIZE: int
+    _PREFETCH: int
+    _BATCH_SIZE: int
+    _BATCH_BYTES: int
+    _INTERN_SIZE: int
+    _ROW_DECODER: Type[RowDecoder]
     _connection: Connection
-    _id: int
+    _id: int | None
+    _id_pooled: bool
+    _result_open: bool
+    _statement: PreparedStatement | None
     _signature: Any
     _column_data_types: List
+    _row_decoder: RowDecoder | None
+    _raw_row_decoder: RowDecoder | None
+    _builtin_data_types: List[Tuple[str, Any, Any, Any]] | None
+    _numpy_types: List[Tuple[str | None, Callable[[Any], Any] | None]] | None
+    _raw_casts: List[Tuple[int, Callable[[Any], Any]]] | None
+    _columnar_casts: Dict[bool, List[Tuple[int, Callable[[Any], Any]]]] | None
+    _arrow_converter: RecordBatchConverter | None
+    _frame_raw: bool
     _frame: Frame | None
     _pos: int
+    _fetched: List[Tuple[Any, ...]]
     _closed: bool
     _array_size: int
     _iter_size: int
+    _prefetch: int
+    _batch_size: int
+    _batch_bytes: int
+    _prefetch_task: asyncio.Task | None
+    _prefetch_queue: asyncio.Queue | None
+    _interning: bool | FrozenSet[str] | None
+    _interner: StringInterner | None
+    _timezone: datetime.tzinfo | None
+    _converters: Converters | None
+    _interned_decoders: Dict[Tuple[Tuple[Tuple[str, Any, Any, Any], ...], Type[RowDecoder]], RowDecoder]
+
+    @property
+    def interning(self) -> bool | FrozenSet[str] | None: ...
+
+    @interning.setter
+    def interning(self, value: bool | Iterable[str] | None) -> None: ...
+
+    @property
+    def timezone(self) -> datetime.tzinfo | None: ...
+
+    @timezone.setter
+    def timezone(self, value: datetime.tzinfo | None) -> None: ...
+
+    @property
+    def converters(self) -> Converters | None: ...
+
+    @converters.setter
+    def converters(self, value: Converters | str | Dict[Any, Any] | None) -> None: ...
+
+    def _get_column_data_types(self, signature: Signature,
+                               converters: bool = True) -> List[Tuple[str, Any, Any, Any]]: ...
+
+    def _get_builtin_data_types(self) -> List[Tuple[str, Any, Any, Any]]: ...
+    _frame_sizing: AdaptiveFrameSize | None
     _update_count: int
     _parameter_data_types: List[Any]
+    _parameter_encoder: ParameterEncoder | None
 
 
 
-    def __init__(self, connection: Connection, _id: int = None): ...
+    def __init__(self, connection: Connection, _id: int | None = None): ...
     async def __aenter__(self: Self) -> Self: ...
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
-    def __iter__(self: Self): Self
-    async def __anext__(self) -> Generator[List[List[Any], Any]]: ...
+    def __aiter__(self: Self) -> Self: ...
+    async def __anext__(self) -> Any: ...
 
     async def close(self) -> None: ...
     @property
     def closed(self) -> bool: ...
 
+    @property
+    def arraysize(self) -> int: ...
+
+    @arraysize.setter
+    def arraysize(self, value: int) -> None: ...
+
+    @property
+    def prefetch(self) -> int: ...
+
+    @prefetch.setter
+    def prefetch(self, value: int) -> None: ...
+
+    @property
+    def batch_size(self) -> int: ...
+
+    @batch_size.setter
+    def batch_size(self, value: int) -> None: ...
+
+    @property
+    def batch_bytes(self) -> int: ...
+
+    @batch_bytes.setter
+    def batch_bytes(self, value: int) -> None: ...
+
+    @property
+    def frame_sizing(self) -> AdaptiveFrameSize | None: ...
+
+    @frame_sizing.setter
+    def frame_sizing(self, value: AdaptiveFrameSize | None) -> None: ...
+
+    def _first_frame_size(self) -> int: ...
+
+    def _frame_size(self) -> int: ...
+
+    def _record_frame(self, frame: Frame | None, elapsed: float | None = None) -> None: ...
+
     @property
     def description(self) -> List[Any]: ...
 
@@ -63,32 +169,124 @@ class Cursor(object):
 
     async def _set_id(self, _id) -> None: ...
 
+    async def _acquire_id(self, deadline: float | None) -> None: ...
+
+    def _release_id(self) -> None: ...
+
     def _set_signature(self, signature: Signature) -> None: ...
-    def _set_frame(self, frame: Frame | None) -> None: ...
+    def _make_row_decoder(self, column_types: Iterable[Tuple[str, Any, Any, Any]],
+                          decoder_class: Type[RowDecoder] | None = None) -> RowDecoder: ...
 
-    async def _fetch_next_frame(self) -> None: ...
+    def _row_decoder_for(self, signature: Signature) -> RowDecoder: ...
+
+    def _get_numpy_types(self) -> List[Tuple[str | None, Callable[[Any], Any] | None]]: ...
+
+    def _get_raw_row_decoder(self) -> RowDecoder: ...
+
+    def _get_arrow_converter(self) -> RecordBatchConverter: ...
+
+    def _get_raw_casts(self) -> List[Tuple[int, Callable[[Any], Any]]]: ...
+
+    def _get_columnar_casts(self, raw: bool) -> List[Tuple[int, Callable[[Any], Any]]]: ...
+
+    def _cook_row(self, row: Tuple[Any, ...]) -> Tuple[Any, ...]: ...
+
+    def _cook_rows(self, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]: ...
+
+    def _columnar_rows(self, rows: List[Tuple[Any, ...]], raw: bool) -> List[Tuple[Any, ...]]: ...
+
+    @staticmethod
+    def _cast_columns(rows: List[Tuple[Any, ...]],
+                      casts: List[Tuple[int, Callable[[Any], Any]]]) -> List[Tuple[Any, ...]]: ...
 
-    async def process_result(self, result: ResultSetResponse) -> None: ...
+    def _set_frame(self, frame: Frame | None, raw: bool = False) -> None: ...
+
+    def _abandon_statement(self) -> None: ...
+
+    def _drop_statement(self) -> None: ...
+
+    def _start_prefetch(self) -> None: ...
+
+    async def _prefetch_frames(self, offset: int, queue: asyncio.Queue) -> None: ...
+
+    def _stop_prefetch(self) -> None: ...
+
+    async def _fetch_next_frame(self, deadline: float | None = None, raw: bool = False) -> None: ...
+
+    async def process_result(self, result: ResultSetResponse | ResultSet) -> None: ...
 
     async def _process_results(self, results: List[ResultSetResponse]) -> None: ...
 
-    def _transform_parameters(self, parameters) -> List[Any]: ...
+    def _get_parameter_encoder(self) -> ParameterEncoder: ...
+
+    async def execute(self, operation, parameters=None, timeout: float | None = None) -> None: ...
+
+    async def executemany(self, operation: str, seq_of_parameters: Iterable[Sequence] | AsyncIterable[Sequence],
+                          timeout: float | None = None) -> List[int]: ...
+
+    async def executebatch(self, sql_commands: Iterable[str], timeout: float | None = None) -> List[int]: ...
+
+    async def _execute_batches(self, operation: str, seq_of_parameters: Iterable[Sequence] | AsyncIterable[Sequence],
+                               deadline: float | None) -> List[int]: ...
 
-    async def execute(self, operation, parameters=None) -> None: ...
+    async def _execute_batch(self, operation: str, statement: PreparedStatement, updates: List[bytes],
+                             deadline: float | None) -> Tuple[List[int], PreparedStatement]: ...
 
-    async def executemany(self, operation, seq_of_parameters) -> List[int]: ...
+    def _encode_batches(self, seq_of_parameters: Iterable[Sequence] | AsyncIterable[Sequence],
+                        encode: Callable[[Sequence], bytes]) -> AsyncGenerator[List[bytes], None]: ...
+
+    async def _prepare(self, operation: str, deadline: float | None) -> PreparedStatement: ...
+
+    def _release_statement(self) -> None: ...
+
+    async def _run_prepared(self, operation: str, request: Callable[[PreparedStatement], Awaitable[_T]],
+                            deadline: float | None) -> _T: ...
+
+    async def _run_unprepared(self, request: Callable[[], Awaitable[_T]], deadline: float | None) -> _T: ...
 
     async def get_sync_results(self, state) -> SyncResultsResponse: ...
 
     async def fetch(self, signature) -> None: ...
 
-    def transform_row(self, row: Row) -> List[Any]: ...
+    def transform_row(self, row: Tuple[Any, ...]) -> Any: ...
+
+    def transform_rows(self, rows: List[Tuple[Any, ...]]) -> List[Any]: ...
+
+    def _check_frame(self) -> None: ...
+
+    def _take_fetched(self, size: int | None) -> List[Tuple[Any, ...]]: ...
+
+    async def _next_rows(self, size: int | None, deadline: float | None, raw: bool = False,
+                         transform: bool = True) -> Any: ...
+
+    def _keep_fetched(self, rows: List[Tuple[Any, ...]]) -> None: ...
+
+    async def fetchone(self, timeout: float | None = None) -> Any: ...
 
-    async def fetchone(self) -> Any: ...
+    async def _fetchone(self, deadline: float | None) -> Any: ...
 
-    async def fetchmany(self, size=None) -> List[Any]: ...
+    async def fetchmany(self, size=None, timeout: float | None = None) -> List[Any]: ...
 
-    async def fetchall(self) -> List[Any]: ...
+    async def fetchall(self, timeout: float | None = None) -> List[Any]: ...
+
+    def iter_batches(self, size: int | None = None, timeout: float | None = None) -> AsyncIterator[List[Any]]: ...
+
+    def iter_frames(self, timeout: float | None = None) -> AsyncIterator[List[Any]]: ...
+
+    async def fetch_columns(self, size: int | None = None, timeout: float | None = None,
+                            categorical: Iterable[str] = ...) -> Dict[str, numpy.ma.MaskedArray | CategoricalArray]: ...
+
+    async def fetchall_columnar(self, timeout: float | None = None,
+                                categorical: Iterable[str] = ...) -> Dict[str, numpy.ma.MaskedArray | CategoricalArray]: ...
+
+    def fetch_arrow_batches(self, timeout: float | None = None) -> AsyncIterator[pyarrow.RecordBatch]: ...
+
+    async def fetch_arrow_table(self, timeout: float | None = None) -> pyarrow.Table: ...
+
+    async def fetch_dataframe(self, timeout: float | None = None) -> pandas.DataFrame: ...
+
+    async def _fetch_columnar(self, size: int | None, fetch_all: bool, deadline: float | None,
+                              categorical: Iterable[str] = ...) -> Dict[str, numpy.ma.MaskedArray | CategoricalArray]: ...
 
     def setinputsizes(self, sizes) -> None: ...
 
@@ -106,7 +304,33 @@ class Cursor(object):
     def ref(self,  callback: Callable[[CursorRef], Any] | None = ...) -> CursorRef: ...
 
 
+def get_row_class(names: Tuple[str, ...]) -> Type[NamedTuple]: ...
+
+
 class DictCursor(Cursor):
     """A cursor which returns results as a dictionary"""
 
-    def _transform_row(self, row) -> Dict[str, Any]: ...
\ No newline at end of file
+    _keys: List[str] | None
+
+    def _set_signature(self, signature: Signature | None) -> None: ...
+
+    def transform_row(self, row: Tuple[Any, ...]) -> Dict[str, Any]: ...
+
+    def transform_rows(self, rows: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]: ...
+
+
+class NamedTupleCursor(Cursor):
+    """A cursor which returns results as named tuples, see :func:`get_row_class`"""
+
+    _row_class: Type[NamedTuple] | None
+
+    def _set_signature(self, signature: Signature | None) -> None: ...
+
+    def transform_row(self, row: Tuple[Any, ...]) -> NamedTuple: ...
+
+    def transform_rows(self, rows: List[Tuple[Any, ...]]) -> List[NamedTuple]: ...
+
+class LazyCursor(Cursor):
+    """A cursor which returns :class:`~aiophoenixdb.avatica.decoder.LazyRow` objects"""
+
+    _ROW_DECODER: Type[LazyRowDecoder]
@@ -67,6 +67,11 @@ class OperationalError(DatabaseError):
     processing, etc."""
 
 
+class MissingStatementError(OperationalError):
+    """Raised when the query server does not know the statement anymore, e.g. it expired
+    from the server's statement cache or the server restarted."""
+
+
 class IntegrityError(DatabaseError):
     """Raised when the relational integrity of the database is affected, e.g. a foreign key check fails."""
 
@@ -0,0 +1,89 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Deque, Dict, Generator, List, Set, Tuple
+from aiophoenixdb.connection import Connection
+from aiophoenixdb.typeshed import Self
+
+__all__: List[str]
+
+logger: logging.Logger
+
+RESET_PROPERTIES: Tuple[str, ...]
+
+
+class Pool(object):
+    _connect: Callable[[], Awaitable[Connection]]
+    _minsize: int
+    _maxsize: int
+    _max_idle: float
+    _max_lifetime: float | None
+    _validate_interval: float | None
+    _free: Deque[Tuple[Connection, float]]
+    _used: Set[Connection]
+    _born: Dict[Connection, float]
+    _initial_props: Dict[Connection, Dict[str, Any]]
+    _size: int
+    _cond: asyncio.Condition
+    _closing: bool
+    _closed: bool
+
+    def __init__(self,
+                 connect: Callable[[], Awaitable[Connection]],
+                 minsize: int = 1,
+                 maxsize: int = 10,
+                 max_idle: float = 300.0,
+                 max_lifetime: float | None = 3600.0,
+                 validate_interval: float | None = 30.0): ...
+
+    @property
+    def minsize(self) -> int: ...
+    @property
+    def maxsize(self) -> int: ...
+    @property
+    def size(self) -> int: ...
+    @property
+    def freesize(self) -> int: ...
+    @property
+    def closed(self) -> bool: ...
+
+    async def fill(self) -> None: ...
+    def acquire(self, timeout: float | None = None) -> _PoolConnectionContextManager: ...
+    async def _acquire(self) -> Connection: ...
+    async def _open(self) -> Connection: ...
+    async def _check(self, conn: Connection, idle_since: float) -> bool: ...
+    def _expired(self, conn: Connection, now: float) -> bool: ...
+    async def release(self, conn: Connection) -> None: ...
+    async def _discard(self, conn: Connection) -> None: ...
+    async def _forget(self, conn: Connection | None) -> None: ...
+    async def _notify(self) -> None: ...
+    def _check_closing(self) -> None: ...
+    async def clear(self) -> None: ...
+    async def close(self) -> None: ...
+    async def wait_closed(self) -> None: ...
+    async def __aenter__(self: Self) -> Self: ...
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+
+class _PoolConnectionContextManager(object):
+    _coro: Awaitable[Connection]
+    _pool: Pool
+    _conn: Connection | None
+
+    def __init__(self, coro: Awaitable[Connection], pool: Pool): ...
+    def __await__(self) -> Generator[Any, None, Connection]: ...
+    async def __aenter__(self) -> Connection: ...
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
@@ -0,0 +1,80 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import datetime
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from aiophoenixdb.connection import Connection
+from aiophoenixdb.pool import Pool
+
+__all__: List[str]
+
+logger: logging.Logger
+
+SORT_ORDER_DESC: int
+
+_INTEGER_WIDTHS: Dict[int, Tuple[int, bool]]
+
+_TEMPORAL_TYPES: Dict[int, bool]
+
+_STRING_TYPES: Tuple[int, ...]
+
+_EPOCH: datetime.datetime
+
+_LITERALS: re.Pattern
+
+_UNSUPPORTED_CLAUSES: re.Pattern
+
+_DONE: object
+
+
+def _decode_long(data: bytes, signed: bool) -> int: ...
+
+
+def decode_key_column(key: bytes, data_type: int, descending: bool = False, salted: bool = False,
+                      column_size: int | None = None) -> Any: ...
+
+
+def _quantiles(values: Sequence[Any], count: int) -> List[Any]: ...
+
+
+async def _query(connection: Connection, sql: str, parameters: Sequence[Any]) -> List[Any]: ...
+
+
+async def get_split_points(connection: Connection, table: str, column: str, count: int) -> List[Any]: ...
+
+
+def _check_splittable(sql: str, split_by: str, ordered: bool) -> None: ...
+
+
+def _range_queries(sql: str, column: str, parameters: Sequence[Any] | None,
+                   points: Sequence[Any]) -> List[Tuple[str, Tuple[Any, ...]]]: ...
+
+
+async def _scan_range(connection: Connection, pool: Pool | None, sql: str, parameters: Tuple[Any, ...],
+                      queue: asyncio.Queue, semaphore: asyncio.Semaphore, timeout: float | None) -> None: ...
+
+
+async def _fetch_range(connection: Connection, sql: str, parameters: Tuple[Any, ...], queue: asyncio.Queue,
+                       timeout: float | None) -> None: ...
+
+
+def parallel_scan(connection: Connection, sql: str, split_by: str, parallelism: int = 4,
+                  parameters: Sequence[Any] | None = None, table: str | None = None,
+                  splits: Sequence[Any] | None = None, ordered: bool = False, pool: Pool | None = None,
+                  buffer_frames: int = 2, timeout: float | None = None) -> AsyncIterator[Any]: ...
@@ -0,0 +1,40 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import List
+
+__all__: List[str]
+
+
+class AdaptiveFrameSize(object):
+    target_bytes: int
+    target_latency: float
+    first_frame_size: int
+    initial_size: int
+    min_size: int
+    max_size: int
+    _size: int
+
+    def __init__(self, target_bytes: int = ..., target_latency: float = ..., first_frame_size: int = ...,
+                 initial_size: int = ..., min_size: int = ..., max_size: int = ...): ...
+
+    @property
+    def frame_size(self) -> int: ...
+
+    def reset(self) -> None: ...
+
+    def _clamp(self, size: float) -> int: ...
+
+    def record(self, rows: int, nbytes: int, elapsed: float | None = None) -> None: ...
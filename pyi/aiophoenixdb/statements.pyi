@@ -0,0 +1,81 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from typing import List
+
+from aiophoenixdb.avatica.proto.common_pb import Signature, StatementHandle
+from aiophoenixdb.connection import Connection
+
+__all__: List[str]
+
+
+class PreparedStatement(object):
+    sql: str
+    handle: StatementHandle
+    _signature_bytes: bytes | None
+
+    def __init__(self, sql: str, handle: StatementHandle): ...
+
+    @property
+    def id(self) -> int: ...
+
+    @property
+    def signature(self) -> Signature: ...
+
+    @property
+    def signature_bytes(self) -> bytes: ...
+
+
+class StatementCache(object):
+    _connection: Connection
+    max_size: int
+    _idle: OrderedDict[str, List[PreparedStatement]]
+    _size: int
+    hits: int
+    misses: int
+
+    def __init__(self, connection: Connection, max_size: int = 32): ...
+
+    def __len__(self) -> int: ...
+
+    async def acquire(self, sql: str, timeout: float | None = None) -> PreparedStatement: ...
+
+    def release(self, statement: PreparedStatement) -> None: ...
+
+    def discard(self, sql: str | None = None) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class StatementPool(object):
+    _connection: Connection
+    max_size: int
+    _idle: List[int]
+    hits: int
+    misses: int
+
+    def __init__(self, connection: Connection, max_size: int = 16): ...
+
+    def __len__(self) -> int: ...
+
+    async def acquire(self, timeout: float | None = None) -> int: ...
+
+    def release(self, statement_id: int) -> None: ...
+
+    def discard(self) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def _close(self, statement: PreparedStatement) -> None: ...
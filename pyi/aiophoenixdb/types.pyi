@@ -14,7 +14,7 @@
 
 import datetime
 import sys
-from typing import Dict, Any, List, Tuple, Set
+from typing import Dict, Any, List, Tuple, Set, Callable, Mapping
 
 from aiophoenixdb.avatica.proto import common_pb
 
@@ -41,6 +41,15 @@ def to_timestamp_from_ticks(ticks) -> datetime.datetime: ...
 def to_binary(value) -> bytes: ...
 
 
+_EPOCH: datetime.datetime
+
+_EPOCH_UTC: datetime.datetime
+
+_EPOCH_ORDINAL: int
+
+MS_PER_DAY: int
+
+
 def time_from_java_sql_time(n) -> datetime.time: ...
 
 
@@ -53,12 +62,18 @@ def date_from_java_sql_date(n) -> datetime.date: ...
 def date_to_java_sql_date(d) -> int: ...
 
 
-def datetime_from_java_sql_timestamp(n) -> datetime: ...
+def datetime_from_java_sql_timestamp(n) -> datetime.datetime: ...
+
+
+def datetime_from_java_sql_timestamp_utc(n) -> datetime.datetime: ...
 
 
 def datetime_to_java_sql_timestamp(d) -> int: ...
 
 
+def timestamp_converter(tz: datetime.tzinfo | None = None) -> Callable[[int], datetime.datetime]: ...
+
+
 # FIXME This doesn't seem to be used anywhere in the code
 class ColumnType(object):
 
@@ -93,6 +108,9 @@ FIELD_MAP: Dict[str, Any]
 
 REP_MAP: Dict[common_pb.Rep, Any]
 
+
+NUMPY_DTYPES: Dict[common_pb.Rep, str]
+
 JDBC_TO_REP: Dict[int, common_pb.Rep]
 
 JDBC_MAP: Dict[int, Any]
@@ -107,4 +125,36 @@ class TypeHelper(object):
     def from_column(column) -> Any: ...
 
     @staticmethod
-    def _from_jdbc(jdbc_code) -> Any: ...
\ No newline at end of file
+    def numpy_dtype(column) -> str | None: ...
+
+    @staticmethod
+    def _from_jdbc(jdbc_code) -> Any: ...
+
+class Converters(object):
+    _by_jdbc: Dict[int, Callable[[Any], Any] | None]
+    _by_rep: Dict[common_pb.Rep, Callable[[Any], Any] | None]
+
+    def __init__(self, converters: Mapping[int | common_pb.Rep, Callable[[Any], Any] | None] | Converters | None = None): ...
+
+    @classmethod
+    def raw(cls) -> Converters: ...
+
+    def __setitem__(self, key: int | common_pb.Rep, cast_from: Callable[[Any], Any] | None) -> None: ...
+
+    def __delitem__(self, key: int | common_pb.Rep) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def items(self) -> List[Tuple[int | common_pb.Rep, Callable[[Any], Any] | None]]: ...
+
+    def update(self, converters: Mapping[int | common_pb.Rep, Callable[[Any], Any] | None] | Converters) -> None: ...
+
+    def copy(self) -> Converters: ...
+
+    def apply(self, column: common_pb.ColumnMetaData, column_type: Tuple[str, Any, Any, Any]) -> Tuple[str, Any, Any, Any]: ...
+
+
+PROFILES: Dict[str, Callable[[], Converters]]
+
+
+def get_converters(converters: Converters | str | Mapping[Any, Any] | None) -> Converters | None: ...
@@ -31,6 +31,11 @@ setup(
         "requests~=2.31.0",
         "gssapi"
     ]
+    , extras_require={
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+        "pandas": ["pyarrow", "pandas"],
+    }
     , classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
@@ -12,11 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import aiohttp
+import functools
 import gssapi
 
 from aiophoenixdb import errors, types
+from aiophoenixdb.avatica.balancer import EndpointBalancer, get_balancer
 from aiophoenixdb.avatica.client import AvaticaClient
+from aiophoenixdb.avatica.connector import SharedSession, set_default_session, close_default_session
+from aiophoenixdb.avatica.retry import RetryPolicy, RetryBudget
 from aiophoenixdb.connection import Connection
+from aiophoenixdb.pool import Pool
+from aiophoenixdb.sizing import AdaptiveFrameSize
 from aiophoenixdb.errors import *  # noqa: F401,F403
 from aiophoenixdb.types import *  # noqa: F401,F403
 
@@ -24,7 +31,9 @@ from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 from requests_gssapi import HTTPSPNEGOAuth
 from urllib.parse import urlencode, urlparse, urlunparse, parse_qs
 
-__all__ = ['connect', 'apilevel', 'threadsafety', 'paramstyle'] + types.__all__ + errors.__all__
+__all__ = ['connect', 'create_pool', 'EndpointBalancer', 'SharedSession', 'RetryPolicy', 'RetryBudget',
+           'AdaptiveFrameSize', 'set_default_session', 'close_default_session',
+           'apilevel', 'threadsafety', 'paramstyle'] + types.__all__ + errors.__all__
 
 apilevel = "2.0"
 """
@@ -47,11 +56,16 @@ For example::
 
 
 async def connect(url, max_retries=None, auth=None, authentication=None, avatica_user=None, avatica_password=None,
-                  truststore=None, verify=None, do_as=None, user=None, password=None, extra_headers=None, **kwargs):
+                  truststore=None, verify=None, do_as=None, user=None, password=None, extra_headers=None, session=None,
+                  balance_strategy='least_outstanding', retry_policy=None, retry_budget=None, timeout=None,
+                  **kwargs):
     """Connects to a Phoenix query server.
 
     :param url:
-        URL to the Phoenix query server, e.g. ``http://localhost:8765/``
+        URL to the Phoenix query server, e.g. ``http://localhost:8765/``.
+        A list of URLs (or ``(url, weight)`` pairs) or an
+        :class:`~aiophoenixdb.avatica.balancer.EndpointBalancer` spreads connections over several
+        query servers; each connection stays on the server it was opened on.
 
     :param autocommit:
         Switch the connection to autocommit mode.
@@ -60,12 +74,34 @@ async def connect(url, max_retries=None, auth=None, authentication=None, avatica
         Switch the connection to readonly mode.
 
     :param max_retries:
-        The maximum number of retries in case there is a connection error.
+        The maximum number of attempts in case there is a connection error, ignored when
+        ``retry_policy`` is given.
+
+    :param retry_policy:
+        A :class:`~aiophoenixdb.avatica.retry.RetryPolicy` controlling backoff, jitter and
+        which requests are retried.
+
+    :param retry_budget:
+        A :class:`~aiophoenixdb.avatica.retry.RetryBudget` limiting retries, defaults to the
+        process-wide budget.
 
     :param cursor_factory:
         If specified, the connection's :attr:`~aiophoenixdb.connection.Connection.cursor_factory`
         is set to it.
 
+    :param converters:
+        If specified, the connection's :attr:`~aiophoenixdb.connection.Connection.converters`
+        are set to it, e.g. ``'raw'`` to leave the values as they come on the wire.
+
+    :param statement_cache_size:
+        Number of idle prepared statements kept by the connection's
+        :attr:`~aiophoenixdb.connection.Connection.statement_cache`, 32 by default, 0 disables it.
+
+    :param statement_pool_size:
+        Number of idle statements kept by the connection's
+        :attr:`~aiophoenixdb.connection.Connection.statement_pool` for the cursors to reuse,
+        16 by default, 0 disables it.
+
     :param auth:
         Authentication configuration object as expected by the underlying python_requests and
         python_requests_gssapi library
@@ -103,21 +139,89 @@ async def connect(url, max_retries=None, auth=None, authentication=None, avatica
     :param extra_headers:
         Additional HTTP headers as a dictionary
 
+    :param timeout:
+        Seconds allowed for opening the connection, ``None`` waits forever.
+
+    :param session:
+        A :class:`~aiophoenixdb.avatica.connector.SharedSession` or :class:`aiohttp.ClientSession`
+        to send requests through. Defaults to the module-level shared session, so that HTTP
+        connections are reused across the logical connections open at the same time.
+
+    :param balance_strategy:
+        How a query server is picked when several are given, ``'least_outstanding'``
+        or ``'round_robin'`` (weighted).
+
     :returns:
         :class:`~aiophoenixdb.connection.Connection` object.
     """
 
+    endpoint = None
+    if not isinstance(url, str):
+        endpoint = get_balancer(url, balance_strategy).select()
+        url = endpoint.url
+
     (url, auth, verify) = _process_args(
         url, auth=auth, authentication=authentication,
         avatica_user=avatica_user, avatica_password=avatica_password,
         truststore=truststore, verify=verify, do_as=do_as, user=user, password=password)
 
-    client = AvaticaClient(url, max_retries=max_retries, auth=auth, verify=verify, extra_headers=extra_headers)
+    if isinstance(session, aiohttp.ClientSession):
+        session = SharedSession(session=session)
+
+    client = AvaticaClient(url, max_retries=max_retries, auth=auth, verify=verify, extra_headers=extra_headers,
+                           session=session, endpoint=endpoint, retry_policy=retry_policy,
+                           retry_budget=retry_budget)
     conn = Connection(client, **kwargs)
-    await conn.connect()
+    try:
+        await conn.connect(timeout=timeout)
+    except BaseException:
+        await client.close()
+        raise
     return conn
 
 
+async def create_pool(url, minsize=1, maxsize=10, max_idle=300.0, max_lifetime=3600.0, validate_interval=30.0,
+                      **kwargs):
+    """Creates a pool of connections to a Phoenix query server.
+
+    Connections handed out by :meth:`~aiophoenixdb.pool.Pool.acquire` are already opened and
+    synchronized, so the ``OpenConnectionRequest`` and ``ConnectionSyncRequest`` round trips are
+    only paid when the pool grows.
+
+    :param url:
+        URL to the Phoenix query server, e.g. ``http://localhost:8765/``, or several of them
+        as accepted by :func:`connect`.
+
+    :param minsize:
+        Number of connections opened when the pool is created.
+
+    :param maxsize:
+        Maximum number of connections opened by the pool.
+
+    :param max_idle:
+        Seconds a connection may stay unused in the pool before it is closed.
+
+    :param max_lifetime:
+        Seconds after which a connection is recycled, ``None`` for no limit.
+
+    :param validate_interval:
+        Idle time in seconds after which a connection is validated before being handed out.
+
+    Every other keyword argument is passed to :func:`connect` for each new connection.
+
+    :returns:
+        :class:`~aiophoenixdb.pool.Pool` object.
+    """
+    pool = Pool(functools.partial(connect, url, **kwargs), minsize=minsize, maxsize=maxsize, max_idle=max_idle,
+                max_lifetime=max_lifetime, validate_interval=validate_interval)
+    try:
+        await pool.fill()
+    except BaseException:
+        await pool.close()
+        raise
+    return pool
+
+
 def _get_SPNEGOAuth():
     try:
         spnego = gssapi.mechs.Mechanism.from_sasl_name("SPNEGO")
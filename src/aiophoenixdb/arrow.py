@@ -0,0 +1,156 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aiophoenixdb.types import MS_PER_DAY
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+__all__ = ['RecordBatchConverter', 'arrow_type', 'arrow_schema']
+
+ARROW_TYPES = {
+    -6: lambda p, s: pyarrow.int8(),  # TINYINT
+    5: lambda p, s: pyarrow.int16(),  # SMALLINT
+    4: lambda p, s: pyarrow.int32(),  # INTEGER
+    -5: lambda p, s: pyarrow.int64(),  # BIGINT
+    6: lambda p, s: pyarrow.float32(),  # FLOAT
+    7: lambda p, s: pyarrow.float32(),  # REAL
+    8: lambda p, s: pyarrow.float64(),  # DOUBLE
+    2: lambda p, s: _decimal(p, s),  # NUMERIC
+    3: lambda p, s: _decimal(p, s),  # DECIMAL
+    16: lambda p, s: pyarrow.bool_(),  # BOOLEAN
+    -7: lambda p, s: pyarrow.bool_(),  # BIT
+    1: lambda p, s: pyarrow.string(),  # CHAR
+    12: lambda p, s: pyarrow.string(),  # VARCHAR
+    -1: lambda p, s: pyarrow.string(),  # LONGVARCHAR
+    -15: lambda p, s: pyarrow.string(),  # NCHAR
+    -9: lambda p, s: pyarrow.string(),  # NVARCHAR
+    -16: lambda p, s: pyarrow.string(),  # LONGNVARCHAR
+    2005: lambda p, s: pyarrow.string(),  # CLOB
+    2011: lambda p, s: pyarrow.string(),  # NCLOB
+    2009: lambda p, s: pyarrow.string(),  # SQLXML
+    -2: lambda p, s: pyarrow.binary(),  # BINARY
+    -3: lambda p, s: pyarrow.binary(),  # VARBINARY
+    -4: lambda p, s: pyarrow.binary(),  # LONGVARBINARY
+    2004: lambda p, s: pyarrow.binary(),  # BLOB
+    2000: lambda p, s: pyarrow.binary(),  # JAVA_OBJECT
+    91: lambda p, s: pyarrow.date32(),  # DATE
+    92: lambda p, s: pyarrow.time32('ms'),  # TIME
+    93: lambda p, s: pyarrow.timestamp('ms'),  # TIMESTAMP
+    # Phoenix unsigned types, whose range fits in the signed type of the same width
+    11: lambda p, s: pyarrow.int8(),  # UNSIGNED_TINYINT
+    13: lambda p, s: pyarrow.int16(),  # UNSIGNED_SMALLINT
+    9: lambda p, s: pyarrow.int32(),  # UNSIGNED_INT
+    10: lambda p, s: pyarrow.int64(),  # UNSIGNED_LONG
+    14: lambda p, s: pyarrow.float32(),  # UNSIGNED_FLOAT
+    15: lambda p, s: pyarrow.float64(),  # UNSIGNED_DOUBLE
+    19: lambda p, s: pyarrow.date32(),  # UNSIGNED_DATE
+    20: lambda p, s: pyarrow.timestamp('ms'),  # UNSIGNED_TIMESTAMP
+}
+"""Arrow types of the JDBC type IDs, built from the column's precision and scale"""
+
+_ARROW_TYPES = dict((k & 0xffffffff, v) for k, v in ARROW_TYPES.items())
+"""Same as ARROW_TYPES, keyed by the unsigned type IDs found in ``AvaticaType.id``"""
+
+
+def _decimal(precision, scale):
+    if 0 < precision <= 38 and 0 <= scale <= precision:
+        return pyarrow.decimal128(precision, scale)
+    # DECIMAL declared without precision, wide enough for any Phoenix value
+    return pyarrow.decimal256(76, 38)
+
+
+def require_pyarrow():
+    if pyarrow is None:
+        raise ImportError('PyArrow is required for Arrow results, install it with "pip install pyarrow"')
+    return pyarrow
+
+
+def arrow_type(column):
+    """Retrieves the Arrow type of a column
+
+    :param column:
+        Protobuf ColumnMetaData object
+
+    :raises:
+        NotImplementedError
+    """
+    if column.type.id == 2003:
+        # Array elements carry no precision or scale of their own
+        return pyarrow.list_(_arrow_type(column.type.component.id, 0, 0))
+    return _arrow_type(column.type.id, column.precision, column.scale)
+
+
+def _arrow_type(jdbc_code, precision, scale):
+    if jdbc_code not in _ARROW_TYPES:
+        raise NotImplementedError('JDBC TYPE CODE {} is not supported'.format(jdbc_code))
+    return _ARROW_TYPES[jdbc_code](precision, scale)
+
+
+def arrow_schema(columns, names):
+    """Builds the Arrow schema of a result set
+
+    :param columns:
+        Protobuf ColumnMetaData objects of the signature.
+
+    :param names:
+        Field name of each column.
+    """
+    require_pyarrow()
+    # ColumnMetaData.nullable is 0 for columnNoNulls, 1 for columnNullable and 2 for unknown
+    return pyarrow.schema([pyarrow.field(name, arrow_type(column), nullable=column.nullable != 0)
+                           for column, name in zip(columns, names)])
+
+
+class RecordBatchConverter(object):
+    """Converts the rows of a frame into a :class:`pyarrow.RecordBatch`.
+
+    :param schema:
+        Schema returned by :func:`arrow_schema`.
+
+    :param time_columns:
+        Indexes of the TIME columns, whose wire values are normalized to the time of day
+        when the rows were decoded without conversion.
+    """
+
+    def __init__(self, schema, time_columns=()):
+        require_pyarrow()
+        self.schema = schema
+        self._time_columns = frozenset(time_columns)
+
+    def convert(self, rows, raw):
+        """Transposes the rows and builds one Arrow array per column.
+
+        :param rows:
+            Decoded rows, either Python values or, with ``raw``, the wire values of the
+            numeric, boolean and temporal columns.
+        """
+        count = len(rows)
+        if count:
+            columns = list(zip(*rows))
+        else:
+            columns = [()] * len(self.schema)
+        arrays = []
+        for i, field in enumerate(self.schema):
+            values = columns[i]
+            if raw and i in self._time_columns:
+                values = [None if v is None else v % MS_PER_DAY for v in values]
+            arrays.append(pyarrow.array(values, type=field.type, size=count))
+        return pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def to_table(self, batches):
+        """Concatenates batches returned by :meth:`convert` into a :class:`pyarrow.Table`."""
+        return pyarrow.Table.from_batches(batches, schema=self.schema)
@@ -0,0 +1,135 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aiophoenixdb.avatica.retry import get_circuit_breaker
+
+__all__ = ['Endpoint', 'EndpointBalancer', 'get_balancer']
+
+LEAST_OUTSTANDING = 'least_outstanding'
+ROUND_ROBIN = 'round_robin'
+STRATEGIES = (LEAST_OUTSTANDING, ROUND_ROBIN)
+
+
+class Endpoint(object):
+    """A Phoenix query server that connections can be opened on.
+
+    Avatica connection and statement IDs only exist on the server that created them,
+    so every connection stays on the endpoint it was opened on.
+    """
+
+    def __init__(self, url, weight=1):
+        if weight <= 0:
+            raise ValueError('weight should be greater than zero')
+        self.url = url
+        self.weight = weight
+        # Requests currently in flight and clients currently bound to this endpoint
+        self.outstanding = 0
+        self.connections = 0
+        self._current_weight = 0
+        self.circuit_breaker = get_circuit_breaker(url)
+
+    def __repr__(self):
+        return 'Endpoint({!r}, weight={})'.format(self.url, self.weight)
+
+
+class EndpointBalancer(object):
+    """Distributes new connections over several Phoenix query servers.
+
+    :param endpoints:
+        List of URLs, ``(url, weight)`` pairs or :class:`Endpoint` objects.
+
+    :param strategy:
+        ``'least_outstanding'`` picks the endpoint with the fewest in-flight requests
+        (then open connections) relative to its weight, ``'round_robin'`` does a smooth
+        weighted round-robin.
+    """
+
+    def __init__(self, endpoints, strategy=LEAST_OUTSTANDING):
+        if strategy not in STRATEGIES:
+            raise ValueError('Unknown balancing strategy {!r}, expected one of {}'.format(strategy, STRATEGIES))
+        self._endpoints = [self._to_endpoint(e) for e in endpoints]
+        if not self._endpoints:
+            raise ValueError('At least one endpoint is required')
+        self._strategy = strategy
+        self._next = 0
+
+    @staticmethod
+    def _to_endpoint(endpoint):
+        if isinstance(endpoint, Endpoint):
+            return endpoint
+        if isinstance(endpoint, str):
+            return Endpoint(endpoint)
+        return Endpoint(*endpoint)
+
+    @property
+    def endpoints(self):
+        return list(self._endpoints)
+
+    @property
+    def strategy(self):
+        return self._strategy
+
+    def select(self):
+        """Returns the :class:`Endpoint` the next connection should be opened on.
+
+        Endpoints whose circuit breaker is open are skipped, unless all of them are.
+        """
+        endpoints = [e for e in self._endpoints if e.circuit_breaker.available] or self._endpoints
+        if self._strategy == ROUND_ROBIN:
+            return self._select_round_robin(endpoints)
+        return self._select_least_outstanding(endpoints)
+
+    def _select_least_outstanding(self, endpoints):
+        # Rotate the starting point so that ties do not always go to the first endpoint
+        count = len(endpoints)
+        start = self._next % count
+        self._next = start + 1
+        best = None
+        best_key = None
+        for i in range(count):
+            endpoint = endpoints[(start + i) % count]
+            key = (endpoint.outstanding / endpoint.weight, endpoint.connections / endpoint.weight)
+            if best_key is None or key < best_key:
+                best, best_key = endpoint, key
+        return best
+
+    def _select_round_robin(self, endpoints):
+        # Smooth weighted round-robin, spreads heavy endpoints instead of bursting them
+        total = 0
+        best = None
+        for endpoint in endpoints:
+            endpoint._current_weight += endpoint.weight
+            total += endpoint.weight
+            if best is None or endpoint._current_weight > best._current_weight:
+                best = endpoint
+        best._current_weight -= total
+        return best
+
+
+_balancers = {}
+
+
+def get_balancer(endpoints, strategy=LEAST_OUTSTANDING):
+    """Returns the :class:`EndpointBalancer` for a list of endpoints.
+
+    The same balancer is returned for equal lists, so that repeated
+    :func:`~aiophoenixdb.connect` calls share the in-flight request counters.
+    """
+    if isinstance(endpoints, EndpointBalancer):
+        return endpoints
+    key = (tuple(e if isinstance(e, (str, Endpoint)) else tuple(e) for e in endpoints), strategy)
+    balancer = _balancers.get(key)
+    if balancer is None:
+        balancer = _balancers[key] = EndpointBalancer(endpoints, strategy)
+    return balancer
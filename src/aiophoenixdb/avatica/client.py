@@ -1,12 +1,20 @@
 import re
+import ssl
 import asyncio
+import functools
 import aiohttp
 import urllib.parse as urlparse
 import betterproto
 from aiophoenixdb import errors
+from aiophoenixdb.avatica.balancer import Endpoint
+from aiophoenixdb.avatica.connector import SharedSession, get_default_session
+from aiophoenixdb.avatica.decoder import decode_wire_message, decode_execute_response, decode_fetch_response
+from aiophoenixdb.avatica.encoder import (encode_wire_message, encode_execute_request, encode_statement_handle,
+                                          encode_execute_batch_request, encode_parameter_values)
+from aiophoenixdb.avatica.retry import RetryPolicy, RetryBudget, get_default_retry_budget, get_circuit_breaker
 from aiophoenixdb.avatica.proto import common_pb, requests_pb, responses_pb
 from html.parser import HTMLParser
-from aiohttp import BasicAuth, ClientError
+from aiohttp import BasicAuth, ClientError, ClientConnectorError
 from typing import Optional, Dict, TypeVar
 
 _RESPONSE_MSG_JAVA_CLS_NAME = "org.apache.calcite.avatica.proto.Responses${cls_name}"
@@ -103,48 +111,172 @@ def parse_error_protobuf(text):
 _MESSAGE_TYPE = TypeVar("_MESSAGE_TYPE", bound=betterproto.Message)
 
 
+def deadline_after(timeout):
+    """Converts a timeout in seconds into an absolute event loop time, ``None`` stays ``None``."""
+    if timeout is None:
+        return None
+    return asyncio.get_running_loop().time() + timeout
+
+
+def time_left(deadline):
+    """Returns the seconds left until ``deadline``.
+
+    :raises:
+        asyncio.TimeoutError if the deadline has passed.
+    """
+    if deadline is None:
+        return None
+    left = deadline - asyncio.get_running_loop().time()
+    if left <= 0:
+        raise asyncio.TimeoutError('Deadline exceeded')
+    return left
+
+
+def _ssl_option(verify):
+    """Maps the requests style ``verify`` argument to the aiohttp ``ssl`` request argument."""
+    if verify is None or verify is True:
+        return None
+    if verify is False:
+        return False
+    return ssl.create_default_context(cafile=verify)
+
+
 class AvaticaClient(object):
+    """Sends Avatica protobuf RPCs to a Phoenix query server.
+
+    Every RPC method accepts a ``timeout`` in seconds bounding the whole call, retries included.
+    On expiry :class:`asyncio.TimeoutError` is raised.
+
+    A client serves a single connection, whose requests are sent one at a time: a request
+    made while another is running, e.g. by a cursor reading ahead, waits for it to complete.
+    """
 
-    def __init__(self, url: str, max_retries: int, verify, extra_headers: Dict, auth: Optional[BasicAuth]):
+    def __init__(self, url: str, max_retries: int, verify, extra_headers: Dict, auth: Optional[BasicAuth],
+                 session: Optional[SharedSession] = None, endpoint: Optional[Endpoint] = None,
+                 retry_policy: Optional[RetryPolicy] = None, retry_budget: Optional[RetryBudget] = None):
         self._url = url
+        self._endpoint = endpoint
+        self._server_address = None
+        if endpoint is not None:
+            endpoint.connections += 1
         self._headers = {'content-type': 'application/x-google-protobuf'}
         self._verify = verify
+        self._ssl = _ssl_option(verify)
+        self._auth = auth
         self._max_retries = max_retries or 3
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_attempts=self._max_retries)
+        self._retry_budget = retry_budget if retry_budget is not None else get_default_retry_budget()
+        self._circuit_breaker = get_circuit_breaker(url)
         if extra_headers:
             self._headers.update(extra_headers)
 
-        self._session = aiohttp.ClientSession(
-            headers=self._headers,
-            auth=auth
-        )
-
-    async def __post_request(self, body, retry_delay=1):
-        for _ in range(self._max_retries):
-            request_args = {'data': body}
-            if self._verify is not None:
-                request_args.update(verify=self._verify)
+        self._shared_session = session if session is not None else get_default_session()
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def server_address(self):
+        """Address of the query server reported in the ``RpcMetadata`` of the first response."""
+        return self._server_address
+
+    def _check_server_address(self, metadata):
+        """Verifies that the response was served by the query server the connection lives on."""
+        if metadata is None or not metadata.server_address:
+            return
+        if self._server_address is None:
+            self._server_address = metadata.server_address
+        elif metadata.server_address != self._server_address:
+            raise errors.OperationalError(
+                'Request for {} was served by {} instead of {}, connection and statement IDs are only '
+                'valid on the server that created them'.format(
+                    self._url, metadata.server_address, self._server_address))
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = self._shared_session.acquire()
+        return self._session
+
+    async def __post_request(self, body, request_name, deadline=None):
+        session = self._get_session()
+        policy = self._retry_policy
+        request_args = {'data': body, 'headers': self._headers, 'auth': self._auth}
+        if self._ssl is not None:
+            request_args.update(ssl=self._ssl)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self._retry_budget.record_request()
+        attempt = 0
+        while True:
+            if not self._circuit_breaker.allow():
+                raise errors.OperationalError('Circuit breaker is open for {}, not sending {}'.format(
+                    self._url, request_name))
+            attempt += 1
+            if deadline is not None:
+                request_args.update(timeout=aiohttp.ClientTimeout(total=time_left(deadline)))
             try:
-                response = await self._session.post(self._url, **request_args)
-            except ClientError:
-                await asyncio.sleep(retry_delay)
+                response = await session.post(self._url, **request_args)
+            except (ClientError, asyncio.TimeoutError) as e:
+                if deadline is not None and loop.time() >= deadline:
+                    # The caller's deadline, not a sign of an unhealthy endpoint
+                    raise asyncio.TimeoutError('{} did not complete before its deadline'.format(request_name)) from e
+                self._circuit_breaker.record_failure()
+                if not isinstance(e, ClientConnectorError) and not policy.is_idempotent(request_name):
+                    # The request may have reached the server, sending it again is not safe
+                    raise errors.OperationalError('{} failed: {}'.format(request_name, e), cause=e) from e
             else:
                 if response.status != 503:
+                    self._circuit_breaker.record_success()
                     return response
-                else:
-                    await asyncio.sleep(retry_delay)
-        else:
-            raise errors.MasRetriesError("Request retry more than the maximum number of attempts")
+                self._circuit_breaker.record_failure()
+                # Hand the connection back to the shared pool before retrying
+                response.release()
+
+            delay = policy.backoff(attempt)
+            if attempt >= policy.max_attempts or loop.time() - started + delay > policy.max_elapsed:
+                raise errors.MasRetriesError("Request retry more than the maximum number of attempts")
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise asyncio.TimeoutError('{} did not succeed before its deadline'.format(request_name))
+            if not self._retry_budget.try_withdraw():
+                raise errors.MasRetriesError("Retry budget exhausted, not retrying {}".format(request_name))
+            await asyncio.sleep(delay)
 
     async def _request(self, request_data,
-                       expected_response_cls=None):
-        request_name = request_data.__class__.__name__
-        message = common_pb.WireMessage()
-        message.name = _REQUEST_MSG_JAVA_CLS_NAME.format(cls_name=request_name)
-        message.wrapped_message = request_data.SerializeToString()
-        request_body = message.SerializeToString()
+                       expected_response_cls=None, timeout=None, decode=None, request_name=None):
+        """Sends a request and parses the response.
 
-        response = await self.__post_request(request_body)
-        response_body = await response.read()
+        :param decode:
+            Function ``(body, start, end)`` decoding the response message found between
+            ``start`` and ``end`` of the body, instead of parsing it with ``expected_response_cls``.
+
+        :param request_name:
+            Name of the request message when ``request_data`` holds it already serialized.
+        """
+        if request_name is None:
+            request_name = request_data.__class__.__name__
+            request_data = request_data.SerializeToString()
+        request_body = encode_wire_message(_REQUEST_MSG_JAVA_CLS_NAME.format(cls_name=request_name), request_data)
+
+        # The deadline bounds waiting for the previous requests, the retries and reading the response body
+        deadline = deadline_after(timeout)
+        if deadline is None:
+            await self._lock.acquire()
+        else:
+            await asyncio.wait_for(self._lock.acquire(), time_left(deadline))
+        # Kept, as close() forgets the endpoint while the request may still be running
+        endpoint = self._endpoint
+        if endpoint is not None:
+            endpoint.outstanding += 1
+        try:
+            response = await self.__post_request(request_body, request_name, deadline)
+            response_body = await response.read()
+        finally:
+            self._lock.release()
+            if endpoint is not None:
+                endpoint.outstanding -= 1
 
         if response.status != 200:
             # logger.debug("Received response\n%s", response_body)
@@ -155,10 +287,8 @@ class AvaticaClient(object):
                 parse_error_protobuf(response_body)
             raise errors.InterfaceError('RPC request returned invalid status code', response.status)
 
-        message = common_pb.WireMessage()
-        message.parse(response_body)
-
-        # logger.debug("Received response\n%s", message)
+        # Locates the wrapped message without copying it out of the body
+        name, start, end = decode_wire_message(response_body)
 
         if expected_response_cls is None:
             expected_response_type = request_name.replace('Request', 'Response')
@@ -166,35 +296,39 @@ class AvaticaClient(object):
             expected_response_type = expected_response_cls.__name__
 
         expected_response_type = _RESPONSE_MSG_JAVA_CLS_NAME.format(cls_name=expected_response_type)
-        if message.name != expected_response_type:
+        if name != expected_response_type:
             raise errors.InterfaceError(
-                'unexpected response type "{}" expected "{}"'.format(message.name, expected_response_type))
-        res: _MESSAGE_TYPE = expected_response_cls()
-        res.parse(message.wrapped_message)
+                'unexpected response type "{}" expected "{}"'.format(name, expected_response_type))
+        if decode is not None:
+            res = decode(response_body, start, end)
+        else:
+            res: _MESSAGE_TYPE = expected_response_cls()
+            res.parse(response_body[start:end])
+        self._check_server_address(getattr(res, 'metadata', None))
         return res
 
-    async def get_catalogs(self, connection_id):
+    async def get_catalogs(self, connection_id, timeout=None):
         request = requests_pb.CatalogsRequest()
         request.connection_id = connection_id
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
     async def get_schemas(self, connection_id,
                           catalog=None,
-                          schema_pattern=None):
+                          schema_pattern=None, timeout=None):
         request = requests_pb.SchemasRequest()
         request.connection_id = connection_id
         if catalog is not None:
             request.catalog = catalog
         if schema_pattern is not None:
             request.schema_pattern = schema_pattern
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
     async def get_tables(self, connection_id, catalog=None,
                          schema_pattern=None,
                          table_name_pattern=None,
-                         type_list=None):
+                         type_list=None, timeout=None):
         request = requests_pb.TablesRequest()
         request.connection_id = connection_id
         if catalog is not None:
@@ -206,13 +340,13 @@ class AvaticaClient(object):
         if type_list is not None:
             request.type_list.extend(type_list)
         request.has_type_list = type_list is not None
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
     async def get_columns(self, connection_id,
                           catalog=None, schema_pattern=None,
                           table_name_pattern=None,
-                          column_name_pattern=None):
+                          column_name_pattern=None, timeout=None):
         request = requests_pb.ColumnsRequest()
         request.connection_id = connection_id
         if catalog is not None:
@@ -223,32 +357,32 @@ class AvaticaClient(object):
             request.table_name_pattern = table_name_pattern
         if column_name_pattern is not None:
             request.column_name_pattern = column_name_pattern
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
-    async def get_table_types(self, connection_id):
+    async def get_table_types(self, connection_id, timeout=None):
         request = requests_pb.TableTypesRequest()
         request.connection_id = connection_id
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
-    async def get_type_info(self, connection_id):
+    async def get_type_info(self, connection_id, timeout=None):
         request = requests_pb.TypeInfoRequest()
         request.connection_id = connection_id
-        response = await self._request(request, responses_pb.ResultSetResponse)
+        response = await self._request(request, responses_pb.ResultSetResponse, timeout=timeout)
         return response
 
-    async def get_sync_results(self, connection_id, statement_id, state):
+    async def get_sync_results(self, connection_id, statement_id, state, timeout=None):
         request = requests_pb.SyncResultsRequest()
         request.connection_id = connection_id
         request.statement_id = statement_id
         # todo copyFrom
         request.state.parse(state)
-        response = await self._request(request, responses_pb.SyncResultsResponse)
+        response = await self._request(request, responses_pb.SyncResultsResponse, timeout=timeout)
         return response
 
-    async def connection_sync_dict(self, connection_id, conn_props=None):
-        conn_props = await self.connection_sync(connection_id, conn_props)
+    async def connection_sync_dict(self, connection_id, conn_props=None, timeout=None):
+        conn_props = await self.connection_sync(connection_id, conn_props, timeout=timeout)
         return {
             'autoCommit': conn_props.auto_commit,
             'readOnly': conn_props.read_only,
@@ -256,7 +390,7 @@ class AvaticaClient(object):
             'catalog': conn_props.catalog,
             'schema': conn_props.schema}
 
-    async def connection_sync(self, connection_id, conn_props=None):
+    async def connection_sync(self, connection_id, conn_props=None, timeout=None):
         """Synchronizes connection properties with the server.
 
         :param connection_id:
@@ -295,10 +429,10 @@ class AvaticaClient(object):
         # response = ConnectionSyncResponse()
         # response.parse(response_data)
 
-        response = await self._request(request, responses_pb.ConnectionSyncResponse)
+        response = await self._request(request, responses_pb.ConnectionSyncResponse, timeout=timeout)
         return response.conn_props
 
-    async def open_connection(self, connection_id, info=None):
+    async def open_connection(self, connection_id, info=None, timeout=None):
         """Opens a new connection.
 
         :param info:
@@ -315,9 +449,9 @@ class AvaticaClient(object):
         # response_data = await self._apply(request)
         # response = responses_pb.OpenConnectionResponse()
         # response.parse(response_data)
-        return await self._request(request, responses_pb.OpenConnectionResponse)
+        return await self._request(request, responses_pb.OpenConnectionResponse, timeout=timeout)
 
-    async def close_connection(self, connection_id):
+    async def close_connection(self, connection_id, timeout=None):
         """Closes a connection.
 
         :param connection_id:
@@ -325,9 +459,9 @@ class AvaticaClient(object):
         """
         request = requests_pb.CloseConnectionRequest()
         request.connection_id = connection_id
-        return await self._request(request, responses_pb.CloseConnectionResponse)
+        return await self._request(request, responses_pb.CloseConnectionResponse, timeout=timeout)
 
-    async def create_statement(self, connection_id):
+    async def create_statement(self, connection_id, timeout=None):
         """Creates a new statement.
 
         :param connection_id:
@@ -339,10 +473,10 @@ class AvaticaClient(object):
         request = requests_pb.CreateStatementRequest()
         request.connection_id = connection_id
 
-        response = await self._request(request, responses_pb.CreateStatementResponse)
+        response = await self._request(request, responses_pb.CreateStatementResponse, timeout=timeout)
         return response.statement_id
 
-    async def close_statement(self, connection_id, statement_id):
+    async def close_statement(self, connection_id, statement_id, timeout=None):
         """Closes a statement.
 
         :param connection_id:
@@ -355,10 +489,10 @@ class AvaticaClient(object):
         request.connection_id = connection_id
         request.statement_id = statement_id
 
-        return await self._request(request, responses_pb.CloseStatementResponse)
+        return await self._request(request, responses_pb.CloseStatementResponse, timeout=timeout)
 
     async def prepare_and_execute(self, connection_id, statement_id, sql, max_rows_total=None,
-                                  first_frame_max_size=None):
+                                  first_frame_max_size=None, timeout=None, row_decoder_factory=None):
         """Prepares and immediately executes a statement.
 
         :param connection_id:
@@ -376,6 +510,11 @@ class AvaticaClient(object):
         :param first_frame_max_size:
             The maximum number of rows that will be returned in the first Frame returned for this query.
 
+        :param row_decoder_factory:
+            Callable returning a :class:`~aiophoenixdb.avatica.decoder.RowDecoder` for a signature.
+            When given, the response is decoded into :class:`~aiophoenixdb.avatica.decoder.ResultSet`
+            objects whose frames hold rows of Python values.
+
         :returns:
             Result set with the signature of the prepared statement and the first frame data.
         """
@@ -388,10 +527,39 @@ class AvaticaClient(object):
         if first_frame_max_size is not None:
             request.first_frame_max_size = first_frame_max_size
         # 提交request, 发起请求
-        response = await self._request(request, responses_pb.ExecuteResponse)
+        decode = None if row_decoder_factory is None else functools.partial(
+            decode_execute_response, row_decoder_factory=row_decoder_factory)
+        response = await self._request(request, responses_pb.ExecuteResponse, timeout=timeout, decode=decode)
+        if response.missing_statement:
+            raise errors.MissingStatementError('PrepareAndExecute reported missing statement', -1)
         return response.results
 
-    async def prepare(self, connection_id, sql, max_rows_total=None):
+    async def prepare_and_execute_batch(self, connection_id, statement_id, sql_commands, timeout=None):
+        """Prepares and executes several SQL commands in a single round trip.
+
+        :param connection_id:
+            ID of the current connection.
+
+        :param statement_id:
+            ID of the statement to execute the commands on.
+
+        :param sql_commands:
+            List of SQL commands, which should not return a result set.
+
+        :returns:
+            Update counts of the commands.
+        """
+        request = requests_pb.PrepareAndExecuteBatchRequest()
+        request.connection_id = connection_id
+        request.statement_id = statement_id
+        request.sql_commands = list(sql_commands)
+
+        response = await self._request(request, responses_pb.ExecuteBatchResponse, timeout=timeout)
+        if response.missing_statement:
+            raise errors.MissingStatementError('PrepareAndExecuteBatch reported missing statement', -1)
+        return response.update_counts
+
+    async def prepare(self, connection_id, sql, max_rows_total=None, timeout=None):
         """Prepares a statement.
 
         :param connection_id:
@@ -412,14 +580,16 @@ class AvaticaClient(object):
         if max_rows_total is not None:
             request.max_rows_total = max_rows_total
 
-        response = await self._request(request, responses_pb.PrepareResponse)
+        response = await self._request(request, responses_pb.PrepareResponse, timeout=timeout)
         return response.statement
 
     async def execute(self, connection_id,
                       statement_id,
                       signature,
                       parameter_values=None,
-                      first_frame_max_size=None):
+                      first_frame_max_size=None,
+                      timeout=None,
+                      row_decoder_factory=None):
         """Returns a frame of rows.
 
         The frame describes whether there may be another frame. If there is not
@@ -433,33 +603,41 @@ class AvaticaClient(object):
             ID of the statement to fetch rows from.
 
         :param signature:
-            common_pb2.Signature object
+            common_pb2.Signature object, or its serialized bytes.
 
         :param parameter_values:
             A list of parameter values, if statement is to be executed; otherwise ``None``.
+            Either ``common_pb2.TypedValue`` objects or the bytes returned by
+            :meth:`ParameterEncoder.encode_execute() <aiophoenixdb.avatica.encoder.ParameterEncoder.encode_execute>`.
 
         :param first_frame_max_size:
             The maximum number of rows that will be returned in the first Frame returned for this query.
 
+        :param row_decoder_factory:
+            See :meth:`prepare_and_execute`.
+
         :returns:
             Frame data, or ``None`` if there are no more.
-        """
-        request = requests_pb.ExecuteRequest()
-        request.statement_handle.id = statement_id
-        request.statement_handle.connection_id = connection_id
-        # todo copy from
-        request.statement_handle.signature = signature
-        if parameter_values is not None:
-            request.parameter_values.extend(parameter_values)
-            request.has_parameter_values = True
-        if first_frame_max_size is not None:
-            request.deprecated_first_frame_max_size = first_frame_max_size
-            request.first_frame_max_size = first_frame_max_size
 
-        response = await self._request(request, responses_pb.ExecuteResponse)
+        :raises:
+            MissingStatementError if the server does not know the statement.
+        """
+        if not isinstance(signature, bytes):
+            signature = bytes(signature)
+        if parameter_values is not None and not isinstance(parameter_values, bytes):
+            parameter_values = encode_parameter_values(parameter_values)
+        request = encode_execute_request(encode_statement_handle(connection_id, statement_id, signature),
+                                         parameter_values, first_frame_max_size)
+
+        decode = None if row_decoder_factory is None else functools.partial(
+            decode_execute_response, row_decoder_factory=row_decoder_factory)
+        response = await self._request(request, responses_pb.ExecuteResponse, timeout=timeout, decode=decode,
+                                       request_name='ExecuteRequest')
+        if response.missing_statement:
+            raise errors.MissingStatementError('Execute reported missing statement', -1)
         return response.results
 
-    async def execute_batch(self, connection_id, statement_id, rows):
+    async def execute_batch(self, connection_id, statement_id, rows, timeout=None):
         """Returns an array of update counts corresponding to each row written.
 
         :param connection_id:
@@ -470,27 +648,24 @@ class AvaticaClient(object):
 
         :param rows:
             A list of lists corresponding to the columns to bind to the statement
-            for many rows.
+            for many rows, or of the bytes returned by
+            :meth:`ParameterEncoder.encode_update() <aiophoenixdb.avatica.encoder.ParameterEncoder.encode_update>`.
 
         :returns:
             Update counts for the writes.
         """
-        request = requests_pb.ExecuteBatchRequest()
-        request.statement_id = statement_id
-        request.connection_id = connection_id
-        if rows is not None:
-            for row in rows:
-                batch = requests_pb.UpdateBatch()
-                for col in row:
-                    batch.parameter_values.append(col)
-                request.updates.append(batch)
-
-        response = await self._request(request, responses_pb.ExecuteBatchResponse)
+        updates = [row if isinstance(row, bytes) else bytes(requests_pb.UpdateBatch(parameter_values=list(row)))
+                   for row in rows or ()]
+        request = encode_execute_batch_request(connection_id, statement_id, updates)
+
+        response = await self._request(request, responses_pb.ExecuteBatchResponse, timeout=timeout,
+                                       request_name='ExecuteBatchRequest')
         if response.missing_statement:
-            raise errors.DatabaseError('ExecuteBatch reported missing statement', -1)
+            raise errors.MissingStatementError('ExecuteBatch reported missing statement', -1)
         return response.update_counts
 
-    async def fetch(self, connection_id, statement_id, offset=0, frame_max_size=None):
+    async def fetch(self, connection_id, statement_id, offset=0, frame_max_size=None, timeout=None,
+                    row_decoder=None):
         """Returns a frame of rows.
 
         The frame describes whether there may be another frame. If there is not
@@ -509,6 +684,10 @@ class AvaticaClient(object):
         :param frame_max_size:
             Maximum number of rows to return; negative means no limit.
 
+        :param row_decoder:
+            A :class:`~aiophoenixdb.avatica.decoder.RowDecoder` for the statement's signature.
+            When given, a :class:`~aiophoenixdb.avatica.decoder.Frame` of Python values is returned.
+
         :returns:
             Frame data, or ``None`` if there are no more.
         """
@@ -519,10 +698,11 @@ class AvaticaClient(object):
         if frame_max_size is not None:
             request.frame_max_size = frame_max_size
 
-        response = await self._request(request, responses_pb.FetchResponse)
+        decode = None if row_decoder is None else functools.partial(decode_fetch_response, row_decoder=row_decoder)
+        response = await self._request(request, responses_pb.FetchResponse, timeout=timeout, decode=decode)
         return response.frame
 
-    async def commit(self, connection_id):
+    async def commit(self, connection_id, timeout=None):
         """TODO Commits the transaction
 
         :param connection_id:
@@ -530,9 +710,9 @@ class AvaticaClient(object):
         """
         request = requests_pb.CommitRequest()
         request.connection_id = connection_id
-        return await self._request(request)
+        return await self._request(request, responses_pb.CommitResponse, timeout=timeout)
 
-    async def rollback(self, connection_id):
+    async def rollback(self, connection_id, timeout=None):
         """TODO Rolls back the transaction
 
         :param connection_id:
@@ -540,10 +720,16 @@ class AvaticaClient(object):
         """
         request = requests_pb.RollbackRequest()
         request.connection_id = connection_id
-        return await self._request(request)
+        return await self._request(request, responses_pb.RollbackResponse, timeout=timeout)
 
     async def close(self):
-        await self._session.close()
+        """Releases this client's share of the HTTP session."""
+        if self._endpoint is not None:
+            self._endpoint.connections -= 1
+            self._endpoint = None
+        if self._session is not None:
+            session, self._session = self._session, None
+            await self._shared_session.release(session)
 
     def __enter__(self):
         raise TypeError("Use async with instead")
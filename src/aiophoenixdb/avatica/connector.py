@@ -0,0 +1,147 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import aiohttp
+from typing import Optional
+
+__all__ = ['SharedSession', 'get_default_session', 'set_default_session', 'close_default_session']
+
+
+class SharedSession(object):
+    """Reference-counted :class:`aiohttp.ClientSession` shared by many Avatica clients.
+
+    Every :class:`~aiophoenixdb.avatica.client.AvaticaClient` acquires a share of the session
+    on its first request and releases it when the connection is closed, so TCP (and TLS)
+    connections to the query server are kept alive and reused across logical connections.
+
+    Clients running on different event loops get a session of their own loop. Each session
+    is closed once the last client of its loop has released its share, so keep a connection
+    or a :class:`~aiophoenixdb.pool.Pool` open to keep the HTTP connections alive in between.
+
+    :param limit:
+        Total number of simultaneous HTTP connections, ``0`` means no limit.
+
+    :param limit_per_host:
+        Number of simultaneous HTTP connections to the same endpoint, ``0`` means no limit.
+
+    :param keepalive_timeout:
+        Seconds an idle HTTP connection is kept open for reuse.
+
+    :param ttl_dns_cache:
+        Seconds resolved addresses are cached, ``None`` caches them forever.
+
+    :param session:
+        An existing :class:`aiohttp.ClientSession` to share instead of creating one.
+        A user-supplied session is never closed by this object.
+
+    Any other keyword argument is passed to :class:`aiohttp.TCPConnector`.
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15.0, ttl_dns_cache=10,
+                 session: Optional[aiohttp.ClientSession] = None, **connector_kwargs):
+        self._connector_kwargs = dict(connector_kwargs,
+                                      limit=limit,
+                                      limit_per_host=limit_per_host,
+                                      keepalive_timeout=keepalive_timeout,
+                                      ttl_dns_cache=ttl_dns_cache)
+        self._session = session
+        self._owned = session is None
+        # Session and number of shares of each event loop
+        self._shares = {}
+        self._closing = False
+
+    @property
+    def refcount(self):
+        """Number of clients currently holding a share of the session."""
+        return sum(count for _, count in self._shares.values())
+
+    @property
+    def closed(self):
+        return self._closing
+
+    def acquire(self):
+        """Takes a share of the session of the running event loop, creating it on first use.
+
+        :returns:
+            The shared :class:`aiohttp.ClientSession`.
+        """
+        if self._closing:
+            raise RuntimeError('The shared session is closed.')
+        loop = asyncio.get_running_loop()
+        share = self._shares.get(loop)
+        if share is None or (self._owned and share[0].closed):
+            session = self._session
+            if self._owned:
+                session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**self._connector_kwargs))
+            share = self._shares[loop] = [session, 0]
+        share[1] += 1
+        return share[0]
+
+    async def release(self, session):
+        """Gives back a share taken with :meth:`acquire`, closing the session once the last
+        share of its event loop is released."""
+        for loop, share in self._shares.items():
+            if share[0] is session and share[1] > 0:
+                break
+        else:
+            # Share of a session that has already been replaced
+            return
+        share[1] -= 1
+        if share[1] == 0:
+            del self._shares[loop]
+            if self._owned and not session.closed:
+                await session.close()
+
+    async def close(self):
+        """Refuses new shares, the sessions are closed once every client has released its share."""
+        self._closing = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+_default_session = None
+
+
+def get_default_session():
+    """Returns the module-level :class:`SharedSession` used by :func:`~aiophoenixdb.connect`
+    when no session is given, creating it with the default limits if needed."""
+    global _default_session
+    if _default_session is None or _default_session.closed:
+        _default_session = SharedSession()
+    return _default_session
+
+
+def set_default_session(session):
+    """Replaces the module-level :class:`SharedSession`, e.g. to tune its connector limits.
+
+    :param session:
+        A :class:`SharedSession` or an :class:`aiohttp.ClientSession` to wrap.
+    """
+    global _default_session
+    if isinstance(session, aiohttp.ClientSession):
+        session = SharedSession(session=session)
+    _default_session = session
+
+
+async def close_default_session():
+    """Closes the module-level :class:`SharedSession`, call it on application shutdown."""
+    global _default_session
+    if _default_session is not None:
+        await _default_session.close()
+        _default_session = None
@@ -0,0 +1,698 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Decoder for the responses that carry result rows.
+
+Parsing a ``FetchResponse`` with betterproto builds a dataclass for every ``Row``,
+``ColumnValue`` and ``TypedValue`` before the cursor converts them into Python values.
+The functions below walk the protobuf wire format of the response body instead and
+produce the converted rows directly, without any intermediate message object.
+"""
+
+import functools
+import struct
+
+from aiophoenixdb import errors
+from aiophoenixdb.avatica.proto import common_pb, responses_pb
+from aiophoenixdb.types import TypeHelper
+
+__all__ = ['Frame', 'ResultSet', 'ExecuteResult', 'FetchResult', 'RowDecoder', 'get_row_decoder',
+           'row_decoder_for', 'LazyRow', 'LazyRowDecoder', 'get_lazy_row_decoder', 'StringInterner',
+           'decode_wire_message', 'decode_execute_response', 'decode_fetch_response']
+
+FIELD_NUMBERS = {
+    'bool_value': 2,
+    'string_value': 3,
+    'number_value': 4,
+    'bytes_value': 5,
+    'double_value': 6,
+}
+"""Field numbers of the ``common_pb.TypedValue`` value fields, keyed by field name"""
+
+FIELD_DEFAULTS = {
+    2: False,
+    3: '',
+    4: 0,
+    5: b'',
+    6: 0.0,
+}
+"""Values of the ``common_pb.TypedValue`` fields when they are absent from the wire"""
+
+_TYPED_VALUE_NULL = 7
+
+_NULL = object()
+_MISSING = object()
+
+_unpack_double = struct.Struct('<d').unpack_from
+
+
+class Frame(object):
+    """A frame of rows already converted into Python values.
+
+    Mirrors ``common_pb.Frame`` with ``rows`` holding tuples of values instead of ``Row`` messages,
+    ``nbytes`` is the size of the serialized frame.
+    """
+
+    __slots__ = ('offset', 'done', 'rows', 'nbytes')
+
+    def __init__(self, offset=0, done=False, rows=None, nbytes=0):
+        self.offset = offset
+        self.done = done
+        self.rows = rows if rows is not None else []
+        self.nbytes = nbytes
+
+    def __repr__(self):
+        return 'Frame(offset={}, done={}, rows=<{} rows>)'.format(self.offset, self.done, len(self.rows))
+
+
+class ResultSet(object):
+    """Decoded ``ResultSetResponse``, ``signature`` and ``first_frame`` are ``None`` when absent."""
+
+    __slots__ = ('connection_id', 'statement_id', 'own_statement', 'signature', 'first_frame',
+                 'update_count', 'metadata')
+
+    def __init__(self):
+        self.connection_id = ''
+        self.statement_id = 0
+        self.own_statement = False
+        self.signature = None
+        self.first_frame = None
+        self.update_count = 0
+        self.metadata = None
+
+
+class ExecuteResult(object):
+    """Decoded ``ExecuteResponse``."""
+
+    __slots__ = ('results', 'missing_statement', 'metadata')
+
+    def __init__(self):
+        self.results = []
+        self.missing_statement = False
+        self.metadata = None
+
+
+class FetchResult(object):
+    """Decoded ``FetchResponse``."""
+
+    __slots__ = ('frame', 'missing_statement', 'missing_results', 'metadata')
+
+    def __init__(self):
+        self.frame = None
+        self.missing_statement = False
+        self.missing_results = False
+        self.metadata = None
+
+
+def _read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_tag(buf, pos):
+    # Every field decoded here has a number below 16, so its tag fits in a single byte
+    tag = buf[pos]
+    if tag < 0x80:
+        return tag, pos + 1
+    return _read_varint(buf, pos)
+
+
+def _skip_field(buf, pos, tag):
+    wire_type = tag & 7
+    if wire_type == 0:
+        while buf[pos] & 0x80:
+            pos += 1
+        return pos + 1
+    if wire_type == 1:
+        return pos + 8
+    if wire_type == 2:
+        length, pos = _read_varint(buf, pos)
+        return pos + length
+    if wire_type == 5:
+        return pos + 4
+    raise errors.InterfaceError('Unsupported protobuf wire type {}'.format(wire_type))
+
+
+def _read_string(buf, pos):
+    length, pos = _read_varint(buf, pos)
+    end = pos + length
+    return str(buf[pos:end], 'utf-8'), end
+
+
+def _decode_typed_value(buf, pos, end, field):
+    """Returns the raw value of ``field`` of a ``TypedValue``, or ``_NULL``."""
+    value = _MISSING
+    while pos < end:
+        tag = buf[pos]
+        if tag < 0x80:
+            pos += 1
+        else:
+            tag, pos = _read_varint(buf, pos)
+        number = tag >> 3
+        wire_type = tag & 7
+        if wire_type == 0:
+            b = buf[pos]
+            if b < 0x80:
+                v = b
+                pos += 1
+            else:
+                v, pos = _read_varint(buf, pos)
+            if number == field:
+                value = v
+            elif number == _TYPED_VALUE_NULL and v:
+                return _NULL
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            if number == field:
+                value = buf[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            if number == field:
+                value = _unpack_double(buf, pos)[0]
+            pos += 8
+        else:
+            pos = _skip_field(buf, pos, tag)
+
+    if value is _MISSING:
+        return FIELD_DEFAULTS[field]
+    if field == 4:
+        # sint64 is zigzag encoded
+        return (value >> 1) ^ -(value & 1)
+    if field == 3:
+        return str(value, 'utf-8')
+    if field == 2:
+        return value != 0
+    if field == 5:
+        return bytes(value)
+    return value
+
+
+def _decode_column_value(buf, pos, end, field, cast_from):
+    scalar = _MISSING
+    legacy = _MISSING
+    array = None
+    while pos < end:
+        tag = buf[pos]
+        pos += 1
+        if tag == 0x22:
+            # scalar_value
+            length, pos = _read_varint(buf, pos)
+            scalar = _decode_typed_value(buf, pos, pos + length, field)
+            pos += length
+        elif tag == 0x12:
+            # array_value
+            length, pos = _read_varint(buf, pos)
+            if array is None:
+                array = []
+            array.append(_decode_typed_value(buf, pos, pos + length, field))
+            pos += length
+        elif tag == 0x18:
+            # has_array_value
+            has_array, pos = _read_varint(buf, pos)
+            if has_array and array is None:
+                array = []
+        elif tag == 0x0a and legacy is _MISSING:
+            # The deprecated repeated value field, written by old servers instead of scalar_value
+            length, pos = _read_varint(buf, pos)
+            legacy = _decode_typed_value(buf, pos, pos + length, field)
+            pos += length
+        else:
+            if tag & 0x80:
+                tag, pos = _read_varint(buf, pos - 1)
+            pos = _skip_field(buf, pos, tag)
+
+    if scalar is _NULL:
+        return None
+    if array is not None:
+        if cast_from is None:
+            return [None if v is _NULL else v for v in array]
+        return [None if v is _NULL else cast_from(v) for v in array]
+    if scalar is _MISSING:
+        scalar = FIELD_DEFAULTS[field] if legacy is _MISSING else legacy
+        if scalar is _NULL:
+            return None
+    if cast_from is not None:
+        return cast_from(scalar)
+    return scalar
+
+
+def _decode_row(buf, pos, end, columns):
+    count = len(columns)
+    row = []
+    i = 0
+    while pos < end:
+        tag = buf[pos]
+        pos += 1
+        if tag != 0x0a:
+            if tag & 0x80:
+                tag, pos = _read_varint(buf, pos - 1)
+            pos = _skip_field(buf, pos, tag)
+            continue
+        length, pos = _read_varint(buf, pos)
+        if i >= count:
+            raise errors.InterfaceError('Row has more values than the {} columns of the signature'.format(count))
+        field, cast_from = columns[i]
+        row.append(_decode_column_value(buf, pos, pos + length, field, cast_from))
+        pos += length
+        i += 1
+    return tuple(row)
+
+
+# Code generated for each column of a row. The fast path handles the layout written by
+# Avatica, a ColumnValue holding only a scalar_value whose TypedValue holds the type and
+# either the value or the null flag. Anything else goes through _decode_column_value.
+_CELL_TEMPLATE = """\
+    if pos >= end or buf[pos] != 10:
+        return slow(buf, start, end, columns)
+    n = buf[pos + 1]
+    if n < 128:
+        s = pos + 2
+    else:
+        n, s = read_varint(buf, pos + 1)
+    pos = s + n
+    v{i} = MISSING
+    if s < pos and buf[s] == 34:
+        m = buf[s + 1]
+        if m < 128:
+            q = s + 2
+        else:
+            m, q = read_varint(buf, s + 1)
+        if q + m == pos:
+            if q < pos and buf[q] == 8:
+                q += 2
+            if q == pos:
+                v{i} = {default}
+            else:
+                t = buf[q]
+{value}
+                elif t == 56 and q + 2 == pos and buf[q + 1]:
+                    v{i} = None
+    if v{i} is MISSING:
+        v{i} = column_value(buf, s, pos, {field}, cast{i})
+"""
+
+_LENGTH_DELIMITED_TEMPLATE = """\
+                if t == {tag}:
+                    x = buf[q + 1]
+                    if x < 128:
+                        q += 2
+                    else:
+                        x, q = read_varint(buf, q + 1)
+                    if q + x == pos:
+                        v{i} = {convert}
+"""
+
+_VALUE_TEMPLATES = {
+    2: """\
+                if t == 16 and q + 2 == pos:
+                    v{i} = {convert}
+""",
+    3: _LENGTH_DELIMITED_TEMPLATE,
+    4: """\
+                if t == 32:
+                    x = buf[q + 1]
+                    if x < 128:
+                        q += 2
+                    else:
+                        x, q = read_varint(buf, q + 1)
+                    if q == pos:
+                        v{i} = {convert}
+""",
+    5: _LENGTH_DELIMITED_TEMPLATE,
+    6: """\
+                if t == 49 and q + 9 == pos:
+                    v{i} = {convert}
+""",
+}
+
+_RAW_VALUES = {
+    2: 'buf[q + 1] != 0',
+    3: "str(buf[q:pos], 'utf-8')",
+    4: '(x >> 1) ^ -(x & 1)',
+    5: 'bytes(buf[q:pos])',
+    6: 'unpack_double(buf, q + 1)[0]',
+}
+
+
+def _cast(i, cast_from, expression):
+    if cast_from is None:
+        return expression
+    return 'cast{}({})'.format(i, expression)
+
+
+def _compile_row_decoder(columns):
+    """Generates a function decoding the rows of the given columns without per-cell dispatch."""
+    namespace = {
+        'slow': _decode_row,
+        'columns': columns,
+        'read_varint': _read_varint,
+        'unpack_double': _unpack_double,
+        'column_value': _decode_column_value,
+        'MISSING': _MISSING,
+    }
+    lines = ['def decode_row(buf, pos, end):\n', '    start = pos\n']
+    for i, (field, cast_from) in enumerate(columns):
+        namespace['cast{}'.format(i)] = cast_from
+        value = _VALUE_TEMPLATES[field].format(
+            i=i, tag=(field << 3) | 2, convert=_cast(i, cast_from, _RAW_VALUES[field]))
+        lines.append(_CELL_TEMPLATE.format(
+            i=i, field=field, value=value.rstrip('\n'),
+            default=_cast(i, cast_from, repr(FIELD_DEFAULTS[field]))))
+    lines.append('    if pos != end:\n')
+    lines.append('        return slow(buf, start, end, columns)\n')
+    lines.append('    return ({})\n'.format(''.join('v{}, '.format(i) for i in range(len(columns)))))
+    exec(compile(''.join(lines), '<row decoder>', 'exec'), namespace)
+    return namespace['decode_row']
+
+
+class RowDecoder(object):
+    """Decodes the frames of a result set into rows of Python values.
+
+    The row decoding function is generated for the column types, use :func:`get_row_decoder`
+    to share decoders between statements returning the same types.
+
+    :param column_types:
+        The ``(field_name, rep, mutate_to, cast_from)`` tuples of the columns,
+        as returned by :meth:`TypeHelper.from_column() <aiophoenixdb.types.TypeHelper.from_column>`.
+    """
+
+    def __init__(self, column_types):
+        self.columns = tuple((FIELD_NUMBERS[field_name], cast_from)
+                             for field_name, rep, mutate_to, cast_from in column_types)
+        self.decode_row = _compile_row_decoder(self.columns)
+
+    def decode_frame(self, buf, pos=0, end=None):
+        """Decodes a serialized ``common_pb.Frame`` found between ``pos`` and ``end`` of ``buf``."""
+        if end is None:
+            end = len(buf)
+        decode_row = self.decode_row
+        frame = Frame(nbytes=end - pos)
+        rows = frame.rows
+        while pos < end:
+            tag = buf[pos]
+            pos += 1
+            if tag == 0x1a:
+                length, pos = _read_varint(buf, pos)
+                rows.append(decode_row(buf, pos, pos + length))
+                pos += length
+            elif tag == 0x08:
+                frame.offset, pos = _read_varint(buf, pos)
+            elif tag == 0x10:
+                done, pos = _read_varint(buf, pos)
+                frame.done = done != 0
+            else:
+                if tag & 0x80:
+                    tag, pos = _read_varint(buf, pos - 1)
+                pos = _skip_field(buf, pos, tag)
+        return frame
+
+    def decode_message(self, frame):
+        """Converts a ``common_pb.Frame`` parsed by betterproto, e.g. from the metadata requests."""
+        if frame is None:
+            return None
+        return self.decode_frame(bytes(frame))
+
+
+class LazyRow(object):
+    """A row whose cells are decoded on first access and then kept.
+
+    Behaves like a tuple of the converted values. The row references the whole response
+    body it was read from until every cell was accessed, so that nothing is copied.
+    """
+
+    __slots__ = ('_buf', '_start', '_end', '_columns', '_spans', '_values', '_remaining')
+
+    def __init__(self, buf, pos, end, columns):
+        self._buf = buf
+        self._start = pos
+        self._end = end
+        self._columns = columns
+        self._spans = None
+        self._values = [_MISSING] * len(columns)
+        self._remaining = len(columns)
+
+    def _index(self):
+        """Finds where each ColumnValue of the row starts and ends, without decoding them."""
+        buf = self._buf
+        pos = self._start
+        end = self._end
+        spans = []
+        while pos < end:
+            tag = buf[pos]
+            pos += 1
+            if tag != 0x0a:
+                if tag & 0x80:
+                    tag, pos = _read_varint(buf, pos - 1)
+                pos = _skip_field(buf, pos, tag)
+                continue
+            length, pos = _read_varint(buf, pos)
+            spans.append((pos, pos + length))
+            pos += length
+        if len(spans) > len(self._columns):
+            raise errors.InterfaceError('Row has more values than the {} columns of the signature'
+                                        .format(len(self._columns)))
+        self._spans = spans
+        return spans
+
+    def _get(self, i):
+        value = self._values[i]
+        if value is _MISSING:
+            spans = self._spans
+            if spans is None:
+                spans = self._index()
+            if i < len(spans):
+                field, cast_from = self._columns[i]
+                pos, end = spans[i]
+                value = _decode_column_value(self._buf, pos, end, field, cast_from)
+            else:
+                value = None
+            self._values[i] = value
+            self._remaining -= 1
+            if not self._remaining:
+                # Every cell is converted, release the response body
+                self._buf = None
+        return value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._get(i) for i in range(*index.indices(len(self._values))))
+        if index < 0:
+            index += len(self._values)
+        if not 0 <= index < len(self._values):
+            raise IndexError('row index out of range')
+        return self._get(index)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        for i in range(len(self._values)):
+            yield self._get(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LazyRow)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return 'LazyRow{!r}'.format(tuple(self))
+
+
+class LazyRowDecoder(RowDecoder):
+    """Decodes the frames of a result set into :class:`LazyRow` objects.
+
+    Only the boundaries of each row are read when the frame is decoded, a cell is converted
+    the first time it is accessed. Pays off on wide rows of which a few cells are used.
+    """
+
+    def __init__(self, column_types):
+        self.columns = tuple((FIELD_NUMBERS[field_name], cast_from)
+                             for field_name, rep, mutate_to, cast_from in column_types)
+
+    def decode_row(self, buf, pos, end):
+        return LazyRow(buf, pos, end, self.columns)
+
+
+class StringInterner(dict):
+    """Bounded dictionary returning one shared ``str`` object for equal strings.
+
+    Used as the ``cast_from`` of string columns with many repeated values, so that a result
+    set holds each distinct value once. Once ``max_size`` distinct strings are known, new
+    strings are returned as they are.
+    """
+
+    def __init__(self, max_size=65536):
+        super().__init__()
+        self.max_size = max_size
+
+    def __missing__(self, key):
+        if len(self) < self.max_size:
+            self[key] = key
+        return key
+
+
+@functools.lru_cache(maxsize=256)
+def _get_row_decoder(column_types, decoder_class):
+    return decoder_class(column_types)
+
+
+def get_row_decoder(column_types, decoder_class=RowDecoder):
+    """Returns the :class:`RowDecoder` for the given column types, from a process-wide LRU cache.
+
+    :param decoder_class:
+        :class:`RowDecoder` or a subclass, e.g. :class:`LazyRowDecoder`.
+    """
+    return _get_row_decoder(tuple(column_types), decoder_class)
+
+
+def get_lazy_row_decoder(column_types):
+    """Returns the :class:`LazyRowDecoder` for the given column types, from a process-wide LRU cache."""
+    return get_row_decoder(column_types, LazyRowDecoder)
+
+
+def row_decoder_for(signature):
+    """Returns the cached :class:`RowDecoder` of a ``common_pb.Signature``."""
+    return get_row_decoder(TypeHelper.from_column(column) for column in signature.columns)
+
+
+def decode_wire_message(buf):
+    """Splits a serialized ``common_pb.WireMessage`` without copying the wrapped message.
+
+    :returns: tuple ``(name, start, end)``
+        where the wrapped message is found between ``start`` and ``end`` of ``buf``.
+    """
+    name = ''
+    start = end = 0
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        tag, pos = _read_tag(buf, pos)
+        if tag == 0x0a:
+            name, pos = _read_string(buf, pos)
+        elif tag == 0x12:
+            length, pos = _read_varint(buf, pos)
+            start, end = pos, pos + length
+            pos = end
+        else:
+            pos = _skip_field(buf, pos, tag)
+    return name, start, end
+
+
+def _decode_metadata(buf, pos, end):
+    return responses_pb.RpcMetadata().parse(bytes(buf[pos:end]))
+
+
+def _decode_result_set(buf, pos, end, row_decoder_factory):
+    result = ResultSet()
+    frame = None
+    while pos < end:
+        tag, pos = _read_tag(buf, pos)
+        if tag == 0x2a:
+            length, pos = _read_varint(buf, pos)
+            # The signature precedes the frame on the wire, but do not rely on it
+            frame = (pos, pos + length)
+            pos += length
+        elif tag == 0x0a:
+            result.connection_id, pos = _read_string(buf, pos)
+        elif tag == 0x10:
+            result.statement_id, pos = _read_varint(buf, pos)
+        elif tag == 0x18:
+            own_statement, pos = _read_varint(buf, pos)
+            result.own_statement = own_statement != 0
+        elif tag == 0x22:
+            length, pos = _read_varint(buf, pos)
+            result.signature = common_pb.Signature().parse(bytes(buf[pos:pos + length]))
+            pos += length
+        elif tag == 0x30:
+            result.update_count, pos = _read_varint(buf, pos)
+        elif tag == 0x3a:
+            length, pos = _read_varint(buf, pos)
+            result.metadata = _decode_metadata(buf, pos, pos + length)
+            pos += length
+        else:
+            pos = _skip_field(buf, pos, tag)
+    if frame is not None:
+        if result.signature is None:
+            raise errors.InterfaceError('Result set has a frame but no signature')
+        result.first_frame = row_decoder_factory(result.signature).decode_frame(buf, *frame)
+    return result
+
+
+def decode_execute_response(buf, pos, end, row_decoder_factory=row_decoder_for):
+    """Decodes a serialized ``responses_pb.ExecuteResponse``.
+
+    :param row_decoder_factory:
+        Callable returning the :class:`RowDecoder` for the signature of a result set.
+
+    :returns:
+        An :class:`ExecuteResult` object.
+    """
+    response = ExecuteResult()
+    while pos < end:
+        tag, pos = _read_tag(buf, pos)
+        if tag == 0x0a:
+            length, pos = _read_varint(buf, pos)
+            response.results.append(_decode_result_set(buf, pos, pos + length, row_decoder_factory))
+            pos += length
+        elif tag == 0x10:
+            missing_statement, pos = _read_varint(buf, pos)
+            response.missing_statement = missing_statement != 0
+        elif tag == 0x1a:
+            length, pos = _read_varint(buf, pos)
+            response.metadata = _decode_metadata(buf, pos, pos + length)
+            pos += length
+        else:
+            pos = _skip_field(buf, pos, tag)
+    return response
+
+
+def decode_fetch_response(buf, pos, end, row_decoder):
+    """Decodes a serialized ``responses_pb.FetchResponse``.
+
+    :param row_decoder:
+        The :class:`RowDecoder` of the statement's signature.
+
+    :returns:
+        A :class:`FetchResult` object.
+    """
+    response = FetchResult()
+    while pos < end:
+        tag, pos = _read_tag(buf, pos)
+        if tag == 0x0a:
+            length, pos = _read_varint(buf, pos)
+            response.frame = row_decoder.decode_frame(buf, pos, pos + length)
+            pos += length
+        elif tag == 0x10:
+            missing_statement, pos = _read_varint(buf, pos)
+            response.missing_statement = missing_statement != 0
+        elif tag == 0x18:
+            missing_results, pos = _read_varint(buf, pos)
+            response.missing_results = missing_results != 0
+        elif tag == 0x22:
+            length, pos = _read_varint(buf, pos)
+            response.metadata = _decode_metadata(buf, pos, pos + length)
+            pos += length
+        else:
+            pos = _skip_field(buf, pos, tag)
+    return response
@@ -0,0 +1,322 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encoder for the requests that carry parameter values.
+
+Building a betterproto ``TypedValue`` per parameter and serializing the request walks
+every message again through the dataclass machinery. The encoders below are generated
+for the parameter types of a statement and write the ``TypedValue`` wire bytes of a row
+of parameters directly, the same bytes betterproto produces.
+"""
+
+import functools
+import struct
+
+from aiophoenixdb import errors
+from aiophoenixdb.avatica.proto import common_pb
+
+__all__ = ['ParameterEncoder', 'get_parameter_encoder', 'encode_wire_message', 'encode_execute_request',
+           'encode_statement_handle', 'encode_parameter_values', 'encode_execute_batch_request']
+
+_SMALL_VARINTS = [bytes((n, )) for n in range(128)]
+
+_pack_double = struct.Struct('<d').pack
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _varint(n):
+    """Encodes a varint, negative values as their 64 bits two's complement."""
+    if 0 <= n < 128:
+        return _SMALL_VARINTS[n]
+    if n < 0:
+        n += 1 << 64
+    out = bytearray()
+    while n >= 128:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _zigzag(n):
+    if not _INT64_MIN <= n <= _INT64_MAX:
+        raise OverflowError('{} does not fit in a signed 64 bits integer'.format(n))
+    return (n << 1) ^ (n >> 63)
+
+
+def _field(number, data):
+    """Encodes a length-delimited field."""
+    return _varint(number << 3 | 2) + _varint(len(data)) + data
+
+
+def _enum_field(number, value):
+    # proto3 leaves out the fields holding their default value
+    return b'' if value == 0 else _varint(number << 3) + _varint(value)
+
+
+def _encode_bool(v):
+    return b'\x10\x01' if v else b''
+
+
+def _encode_string(v):
+    data = v.encode('utf-8')
+    return b'\x1a' + _varint(len(data)) + data if data else b''
+
+
+def _encode_number(v):
+    return b'\x20' + _varint(_zigzag(v)) if v else b''
+
+
+def _encode_bytes(v):
+    if not isinstance(v, (bytes, bytearray)):
+        raise TypeError('expected bytes, got {}'.format(type(v).__name__))
+    return b'\x2a' + _varint(len(v)) + v if v else b''
+
+
+def _encode_double(v):
+    return b'\x31' + _pack_double(v) if v else b''
+
+
+_VALUE_ENCODERS = {
+    'bool_value': _encode_bool,
+    'string_value': _encode_string,
+    'number_value': _encode_number,
+    'bytes_value': _encode_bytes,
+    'double_value': _encode_double,
+}
+"""Functions encoding a Python value into the ``common_pb.TypedValue`` field of its type"""
+
+_NULL_VALUE = _enum_field(1, common_pb.Rep.NULL) + b'\x38\x01'
+"""``TypedValue`` of a NULL parameter"""
+
+_NULL_ELEMENT = b'\x38\x01'
+"""``TypedValue`` of a NULL array element, which has no type"""
+
+# Inlined value encoders of the generated functions, ``v`` holds the value and ``body`` the
+# bytes of the TypedValue type field
+_VALUE_TEMPLATES = {
+    'bool_value': """\
+            if v:
+                body += b'\\x10\\x01'
+""",
+    'string_value': """\
+            v = v.encode('utf-8')
+            if v:
+                body += b'\\x1a' + varint(len(v)) + v
+""",
+    'number_value': """\
+            if v:
+                body += b'\\x20' + varint(zigzag(v))
+""",
+    'bytes_value': """\
+            if v:
+                body += b'\\x2a' + varint(len(v)) + v
+""",
+    'double_value': """\
+            if v:
+                body += b'\\x31' + pack_double(v)
+""",
+}
+
+_PARAMETER_TEMPLATE = """\
+    v = values[{i}]
+    if v is None:
+        append(NULL_FIELD)
+    else:
+        try:
+{mutate}            body = TYPE{i}
+{value}        except (TypeError, ValueError, AttributeError, OverflowError) as e:
+            raise invalid({i}, values[{i}], e)
+        append(tag + varint(len(body)) + body)
+"""
+
+_ARRAY_TEMPLATE = """\
+    v = values[{i}]
+    if v is None:
+        append(NULL_FIELD)
+    elif type(v) is not list and type(v) is not tuple:
+        raise errors.ProgrammingError('Scalar value specified for array parameter.')
+    else:
+        try:
+            body = array{i}(v)
+        except (TypeError, ValueError, AttributeError, OverflowError) as e:
+            raise invalid({i}, values[{i}], e)
+        append(tag + varint(len(body)) + body)
+"""
+
+
+def _invalid(i, value, error):
+    return errors.ProgrammingError('Cannot encode parameter {} ({!r}): {}'.format(i + 1, value, error))
+
+
+def _array_encoder(field_name, rep, mutate_to):
+    """Returns the function encoding the ``TypedValue`` of an array of ``rep`` elements."""
+    encode_value = _VALUE_ENCODERS[field_name]
+    element_type = _enum_field(1, rep)
+    array_type = _enum_field(1, common_pb.Rep.ARRAY)
+    component_type = _enum_field(9, rep)
+
+    def encode_array(values):
+        parts = [array_type]
+        for element in values:
+            if element is None:
+                parts.append(b'\x42\x02' + _NULL_ELEMENT)
+                continue
+            if mutate_to is not None:
+                element = mutate_to(element)
+            data = element_type + encode_value(element)
+            parts.append(b'\x42' + _varint(len(data)) + data)
+        parts.append(component_type)
+        return b''.join(parts)
+    return encode_array
+
+
+def _compile_parameter_encoder(parameter_types, field_number):
+    """Generates a function encoding a row of parameters into repeated ``TypedValue`` fields."""
+    namespace = {
+        'errors': errors,
+        'varint': _varint,
+        'zigzag': _zigzag,
+        'pack_double': _pack_double,
+        'invalid': _invalid,
+        'NULL_FIELD': _field(field_number, _NULL_VALUE),
+        'tag': _varint(field_number << 3 | 2),
+    }
+    lines = ['def encode(values):\n', '    out = []\n', '    append = out.append\n']
+    for i, (field_name, rep, mutate_to, cast_from, is_array) in enumerate(parameter_types):
+        if is_array:
+            namespace['array{}'.format(i)] = _array_encoder(field_name, rep, mutate_to)
+            lines.append(_ARRAY_TEMPLATE.format(i=i))
+            continue
+        namespace['TYPE{}'.format(i)] = _enum_field(1, rep)
+        mutate = ''
+        if mutate_to is not None:
+            namespace['mutate{}'.format(i)] = mutate_to
+            mutate = '            v = mutate{}(v)\n'.format(i)
+        lines.append(_PARAMETER_TEMPLATE.format(i=i, mutate=mutate, value=_VALUE_TEMPLATES[field_name]))
+    lines.append("    return b''.join(out)\n")
+    exec(compile(''.join(lines), '<parameter encoder>', 'exec'), namespace)
+    return namespace['encode']
+
+
+class ParameterEncoder(object):
+    """Encodes rows of parameters into the wire bytes of their ``TypedValue`` messages.
+
+    :param parameter_types:
+        The ``(field_name, rep, mutate_to, cast_from, is_array)`` tuples of the parameters,
+        as returned by :meth:`TypeHelper.from_param() <aiophoenixdb.types.TypeHelper.from_param>`.
+    """
+
+    def __init__(self, parameter_types):
+        self.parameter_types = tuple(parameter_types)
+        # ExecuteRequest.parameter_values is field 2, UpdateBatch.parameter_values field 1
+        self._encode_execute = _compile_parameter_encoder(self.parameter_types, 2)
+        self._encode_update = _compile_parameter_encoder(self.parameter_types, 1)
+
+    def _check(self, values):
+        if len(values) != len(self.parameter_types):
+            raise errors.ProgrammingError('Number of placeholders (?) must match number of parameters.'
+                                          ' Number of placeholders: {0}. Number of parameters: {1}'
+                                          .format(len(self.parameter_types), len(values)))
+
+    def encode_execute(self, values):
+        """Returns the ``parameter_values`` fields of an ``ExecuteRequest``.
+
+        :raises:
+            ProgrammingError if a value cannot be encoded for its parameter type.
+        """
+        self._check(values)
+        return self._encode_execute(values)
+
+    def encode_update(self, values):
+        """Returns the ``UpdateBatch`` message of a row of parameters of an ``ExecuteBatchRequest``."""
+        self._check(values)
+        return self._encode_update(values)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_parameter_encoder(parameter_types):
+    return ParameterEncoder(parameter_types)
+
+
+def get_parameter_encoder(parameter_types):
+    """Returns the :class:`ParameterEncoder` for the given parameter types, from a process-wide LRU cache."""
+    return _get_parameter_encoder(tuple(parameter_types))
+
+
+def encode_wire_message(name, data):
+    """Wraps a serialized request into a ``common_pb.WireMessage``."""
+    return _field(1, name.encode('utf-8')) + (_field(2, data) if data else b'')
+
+
+def encode_statement_handle(connection_id, statement_id, signature):
+    """Serializes a ``common_pb.StatementHandle``.
+
+    :param signature:
+        Serialized ``common_pb.Signature`` of the statement.
+    """
+    parts = []
+    if connection_id:
+        parts.append(_field(1, connection_id.encode('utf-8')))
+    if statement_id:
+        parts.append(b'\x10' + _varint(statement_id))
+    if signature:
+        parts.append(_field(3, signature))
+    return b''.join(parts)
+
+
+def encode_parameter_values(values):
+    """Serializes ``common_pb.TypedValue`` messages into the ``parameter_values`` field of an
+    ``ExecuteRequest``, as returned by :meth:`ParameterEncoder.encode_execute`."""
+    return b''.join(_field(2, bytes(value)) for value in values)
+
+
+def encode_execute_request(handle, parameters, first_frame_max_size=None):
+    """Serializes an ``ExecuteRequest``.
+
+    :param handle:
+        Serialized ``common_pb.StatementHandle`` of the statement.
+
+    :param parameters:
+        Parameters encoded by :meth:`ParameterEncoder.encode_execute`, or ``None`` to execute
+        the statement without parameter values.
+    """
+    parts = [_field(1, handle)]
+    if parameters is not None:
+        parts.append(parameters)
+    if first_frame_max_size:
+        parts.append(b'\x18' + _varint(first_frame_max_size))
+    if parameters is not None:
+        parts.append(b'\x20\x01')
+    if first_frame_max_size:
+        parts.append(b'\x28' + _varint(first_frame_max_size))
+    return b''.join(parts)
+
+
+def encode_execute_batch_request(connection_id, statement_id, updates):
+    """Serializes an ``ExecuteBatchRequest``.
+
+    :param updates:
+        ``UpdateBatch`` messages encoded by :meth:`ParameterEncoder.encode_update`.
+    """
+    parts = []
+    if connection_id:
+        parts.append(_field(1, connection_id.encode('utf-8')))
+    if statement_id:
+        parts.append(b'\x10' + _varint(statement_id))
+    for update in updates:
+        parts.append(b'\x1a' + _varint(len(update)) + update)
+    return b''.join(parts)
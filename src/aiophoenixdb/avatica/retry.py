@@ -0,0 +1,213 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import time
+import urllib.parse as urlparse
+
+__all__ = ['RetryPolicy', 'RetryBudget', 'CircuitBreaker', 'IDEMPOTENT_REQUESTS',
+           'get_default_retry_budget', 'get_circuit_breaker']
+
+IDEMPOTENT_REQUESTS = frozenset([
+    'CatalogsRequest',
+    'SchemasRequest',
+    'TablesRequest',
+    'TableTypesRequest',
+    'TypeInfoRequest',
+    'ColumnsRequest',
+    'DatabasePropertyRequest',
+    'ConnectionSyncRequest',
+    'PrepareRequest',
+    'FetchRequest',
+    'SyncResultsRequest',
+    'CloseStatementRequest',
+    'CloseConnectionRequest',
+])
+"""Requests that can safely be sent again after a connection error.
+
+Requests that execute SQL or change transactions are only retried when the connection
+could not be established or on HTTP 503, which the query server returns before
+processing the request.
+"""
+
+
+class RetryPolicy(object):
+    """Decides whether and when a failed RPC is sent again.
+
+    Delays use exponential backoff with full jitter, so that clients which failed at
+    the same moment do not retry in lockstep.
+
+    :param max_attempts:
+        Maximum number of times a request is sent, including the first one.
+
+    :param base_delay:
+        Upper bound in seconds of the delay before the first retry.
+
+    :param max_delay:
+        Upper bound in seconds of any single delay.
+
+    :param max_elapsed:
+        No retry is started once this many seconds passed since the first attempt.
+
+    :param idempotent_requests:
+        Names of the request messages that are retried after connection errors.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.1, max_delay=5.0, max_elapsed=30.0,
+                 idempotent_requests=IDEMPOTENT_REQUESTS):
+        if max_attempts < 1:
+            raise ValueError('max_attempts should be at least 1')
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.idempotent_requests = frozenset(idempotent_requests)
+
+    def is_idempotent(self, request_name):
+        return request_name in self.idempotent_requests
+
+    def backoff(self, attempt):
+        """Returns the delay before retry number ``attempt`` (starting at 1)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class RetryBudget(object):
+    """Caps retries to a fraction of the requests sent, shared by every client using it.
+
+    Each request deposits ``ratio`` tokens and each retry withdraws one, on top of
+    ``min_retries_per_second`` tokens that refill with time. When an endpoint is down
+    the budget runs dry and clients fail instead of multiplying the load with retries.
+
+    :param ratio:
+        Retries allowed per request sent.
+
+    :param min_retries_per_second:
+        Retries always allowed regardless of the request rate.
+
+    :param max_tokens:
+        Maximum number of retries that can be saved up.
+    """
+
+    def __init__(self, ratio=0.2, min_retries_per_second=10.0, max_tokens=100.0):
+        self._ratio = ratio
+        self._min_retries_per_second = min_retries_per_second
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+
+    @property
+    def tokens(self):
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + (now - self._updated) * self._min_retries_per_second)
+        self._updated = now
+
+    def record_request(self):
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_withdraw(self):
+        """Takes a token for a retry, returns ``False`` if the budget is exhausted."""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class CircuitBreaker(object):
+    """Fails requests fast while an endpoint is unhealthy.
+
+    The breaker opens after ``failure_threshold`` consecutive failures. Once
+    ``reset_timeout`` seconds passed a single probe request is let through, which
+    closes the breaker on success or opens it again on failure.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    @property
+    def state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def _probe_pending(self):
+        # A probe that never reported back (e.g. cancelled) does not block the breaker forever
+        return self._probing and time.monotonic() - self._probe_started < self.reset_timeout
+
+    @property
+    def available(self):
+        """Whether a request sent now would be let through."""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_pending())
+
+    def allow(self):
+        """Returns ``True`` if a request may be sent, reserving the probe when half open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_pending():
+            self._state = self.HALF_OPEN
+            self._probing = True
+            self._probe_started = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+_default_retry_budget = RetryBudget()
+
+
+def get_default_retry_budget():
+    """Returns the process-wide :class:`RetryBudget` used when none is given."""
+    return _default_retry_budget
+
+
+_circuit_breakers = {}
+
+
+def get_circuit_breaker(url):
+    """Returns the process-wide :class:`CircuitBreaker` of a query server URL.
+
+    URLs that only differ in their query string (e.g. ``doAs``) share a breaker.
+    """
+    key = urlparse.urlparse(url)._replace(query='', fragment='').geturl()
+    breaker = _circuit_breakers.get(key)
+    if breaker is None:
+        breaker = _circuit_breakers[key] = CircuitBreaker()
+    return breaker
@@ -0,0 +1,295 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import csv
+import datetime
+import decimal
+import logging
+import os
+
+from aiophoenixdb.errors import ProgrammingError
+
+__all__ = ['Loader', 'upsert_statement']
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_bool(value):
+    return value.lower() in ('true', 't', '1', 'yes', 'y')
+
+
+def _parse_datetime(value):
+    return datetime.datetime.fromisoformat(value)
+
+
+def _parse_time(value):
+    return datetime.time.fromisoformat(value)
+
+
+_CSV_PARSERS = {
+    -6: int,  # TINYINT
+    5: int,  # SMALLINT
+    4: int,  # INTEGER
+    -5: int,  # BIGINT
+    11: int,  # UNSIGNED_TINYINT
+    13: int,  # UNSIGNED_SMALLINT
+    9: int,  # UNSIGNED_INT
+    10: int,  # UNSIGNED_LONG
+    6: float,  # FLOAT
+    7: float,  # REAL
+    8: float,  # DOUBLE
+    14: float,  # UNSIGNED_FLOAT
+    15: float,  # UNSIGNED_DOUBLE
+    2: decimal.Decimal,  # NUMERIC
+    3: decimal.Decimal,  # DECIMAL
+    16: _parse_bool,  # BOOLEAN
+    -7: _parse_bool,  # BIT
+    91: _parse_datetime,  # DATE
+    93: _parse_datetime,  # TIMESTAMP
+    19: _parse_datetime,  # UNSIGNED_DATE
+    20: _parse_datetime,  # UNSIGNED_TIMESTAMP
+    92: _parse_time,  # TIME
+    18: _parse_time,  # UNSIGNED_TIME
+}
+"""Functions parsing a CSV field into the parameter value of each JDBC type, strings are kept as they are"""
+
+_DONE = object()
+
+
+def _quote(name):
+    return '.'.join('"{}"'.format(part.replace('"', '""')) for part in name.split('.'))
+
+
+def upsert_statement(table, columns):
+    """Returns the ``UPSERT INTO table (columns) VALUES (?, ...)`` statement of a table.
+
+    :param table:
+        Name of the table, ``SCHEMA.TABLE`` or ``TABLE``, as stored in the catalog.
+
+    :param columns:
+        Names of the columns as stored in the catalog, ``FAMILY.COLUMN`` for the columns
+        of an explicit column family.
+    """
+    return 'UPSERT INTO {} ({}) VALUES ({})'.format(
+        _quote(table), ', '.join(_quote(c) for c in columns), ', '.join('?' * len(columns)))
+
+
+async def _get_column_types(connection, table):
+    """Returns the JDBC type of each column of ``table``, keyed by name and by ``FAMILY.NAME``,
+    in the order of the table."""
+    schema, _, name = table.rpartition('.')
+    rows = await connection.meta().get_columns(schema_pattern=schema, table_name_pattern=name)
+    # The names are LIKE patterns
+    rows = sorted((r for r in rows if r['TABLE_NAME'] == name and r['TABLE_SCHEM'] == schema),
+                  key=lambda r: r['ORDINAL_POSITION'])
+    if not rows:
+        raise ProgrammingError('Table {} was not found in SYSTEM.CATALOG.'.format(table))
+    column_types = {}
+    for row in rows:
+        column_types.setdefault(row['COLUMN_NAME'], row['DATA_TYPE'])
+        if row['COLUMN_FAMILY']:
+            column_types['{}.{}'.format(row['COLUMN_FAMILY'], row['COLUMN_NAME'])] = row['DATA_TYPE']
+    return column_types, [r['COLUMN_NAME'] for r in rows]
+
+
+def _csv_rows(source, parsers, skip_header, encoding, fmtparams):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='', encoding=encoding) as f:
+            yield from _csv_rows(f, parsers, skip_header, encoding, fmtparams)
+        return
+    reader = csv.reader(source, **fmtparams)
+    if skip_header:
+        next(reader, None)
+    for fields in reader:
+        if len(fields) != len(parsers):
+            raise ProgrammingError('CSV line {} has {} fields, expected {}.'
+                                   .format(reader.line_num, len(fields), len(parsers)))
+        yield tuple(None if v == '' else v if p is None else p(v) for v, p in zip(fields, parsers))
+
+
+def _frame_rows(frame):
+    # Boxes the NumPy scalars into Python values and the NaN and NaT into None
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.itertuples(index=False, name=None)
+
+
+class Loader(object):
+    """Writes rows into a table with ``UPSERT`` batches executed by concurrent workers.
+
+    The rows are read from the source into batches of ``batch_size`` rows, queued up to
+    ``queue_size`` batches ahead of the workers, so that reading a large source waits for the
+    query servers rather than filling the memory. Each worker writes the batches with
+    :meth:`Cursor.executemany() <aiophoenixdb.cursors.Cursor.executemany>` on its own connection
+    of ``pool``, and commits every ``commit_every`` rows unless the connection is in autocommit
+    mode. A connection runs one request at a time, so without ``pool`` a single worker writes
+    the batches on this connection::
+
+        loader = Loader(conn, 'SCHEMA.T', workers=8, pool=pool)
+        count = await loader.load('rows.csv', skip_header=True)
+
+    :param connection:
+        An open :class:`~aiophoenixdb.connection.Connection`, which reads the columns of the table.
+
+    :param table:
+        Name of the table, ``SCHEMA.TABLE`` or ``TABLE``, as stored in the catalog.
+
+    :param columns:
+        Names of the columns the values of a row are written to, as stored in the catalog.
+        Defaults to the columns of a DataFrame source, or to all the columns of the table.
+
+    :param workers:
+        Number of batches written at the same time, each on a connection of ``pool``.
+        Ignored without ``pool``, the batches are then written one at a time.
+
+    :param batch_size:
+        Number of rows per batch.
+
+    :param commit_every:
+        Number of rows a worker writes between two commits, ``None`` commits once at the end.
+
+    :param queue_size:
+        Number of batches read ahead of the workers, twice the number of workers by default.
+
+    :param pool:
+        A :class:`~aiophoenixdb.pool.Pool` the batches are written on, instead of this connection.
+
+    :param timeout:
+        Seconds allowed for writing each batch, ``None`` waits forever.
+    """
+
+    def __init__(self, connection, table, columns=None, workers=4, batch_size=10000, commit_every=100000,
+                 queue_size=None, pool=None, timeout=None):
+        if workers < 1:
+            raise ProgrammingError('workers should be at least 1')
+        if batch_size < 1:
+            raise ProgrammingError('batch_size should be at least 1')
+        self._connection = connection
+        self._table = table
+        self._columns = list(columns) if columns is not None else None
+        # Concurrent requests on one connection would interleave their statements and commits
+        self._workers = workers if pool is not None else 1
+        self._batch_size = batch_size
+        self._commit_every = commit_every
+        self._queue_size = queue_size if queue_size is not None else 2 * self._workers
+        self._pool = pool
+        self._timeout = timeout
+        self.rows = 0
+        self.batches = 0
+        self.commits = 0
+
+    async def load(self, source, skip_header=False, encoding='utf-8', **fmtparams):
+        """Writes all the rows of ``source`` into the table.
+
+        :param source:
+            An iterable or an asynchronous iterable of rows, a :class:`pandas.DataFrame`, or the
+            path or text file object of a CSV file whose fields are parsed after the column types.
+
+        :param skip_header:
+            Whether the first line of a CSV file holds the column names.
+
+        :param encoding:
+            Encoding of a CSV file given by its path.
+
+        :param fmtparams:
+            Formatting parameters of :func:`csv.reader`, e.g. ``delimiter='|'``.
+
+        :returns:
+            The number of rows written.
+        """
+        columns = self._columns
+        if columns is None and hasattr(source, 'itertuples'):
+            columns = [str(c) for c in source.columns]
+        column_types, table_columns = await _get_column_types(self._connection, self._table)
+        if columns is None:
+            columns = table_columns
+        unknown = [c for c in columns if c not in column_types]
+        if unknown:
+            raise ProgrammingError('Table {} has no column {}.'.format(self._table, ', '.join(unknown)))
+        sql = upsert_statement(self._table, columns)
+
+        if hasattr(source, 'itertuples'):
+            rows = _frame_rows(source)
+        elif isinstance(source, (str, os.PathLike)) or hasattr(source, 'read'):
+            parsers = [_CSV_PARSERS.get(column_types[c]) for c in columns]
+            rows = _csv_rows(source, parsers, skip_header, encoding, fmtparams)
+        else:
+            rows = source
+
+        queue = asyncio.Queue(self._queue_size)
+        tasks = [asyncio.ensure_future(self._work(sql, queue)) for _ in range(self._workers)]
+        producer = asyncio.ensure_future(self._produce(rows, queue))
+        try:
+            # A failed worker stops the others instead of leaving the producer blocked on a full queue
+            done, _ = await asyncio.wait(tasks + [producer], return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks + [producer]:
+                task.cancel()
+            await asyncio.gather(*tasks, producer, return_exceptions=True)
+        return self.rows
+
+    async def _produce(self, rows, queue):
+        batch_size = self._batch_size
+        batch = []
+        if hasattr(rows, '__aiter__'):
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    await queue.put(batch)
+                    batch = []
+        else:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    await queue.put(batch)
+                    batch = []
+        if batch:
+            await queue.put(batch)
+        for _ in range(self._workers):
+            await queue.put(_DONE)
+
+    async def _work(self, sql, queue):
+        if self._pool is not None:
+            async with self._pool.acquire() as connection:
+                await self._write(connection, sql, queue)
+        else:
+            await self._write(self._connection, sql, queue)
+
+    async def _write(self, connection, sql, queue):
+        uncommitted = 0
+        async with connection.cursor() as cursor:
+            cursor.batch_size = self._batch_size
+            while True:
+                batch = await queue.get()
+                if batch is _DONE:
+                    break
+                await cursor.executemany(sql, batch, timeout=self._timeout)
+                self.rows += len(batch)
+                self.batches += 1
+                uncommitted += len(batch)
+                if self._commit_every is not None and uncommitted >= self._commit_every:
+                    await self._commit(connection, uncommitted)
+                    uncommitted = 0
+        if uncommitted:
+            await self._commit(connection, uncommitted)
+
+    async def _commit(self, connection, uncommitted):
+        if connection.autocommit:
+            return
+        logger.debug('Committing %s rows into %s', uncommitted, self._table)
+        await connection.commit()
+        self.commits += 1
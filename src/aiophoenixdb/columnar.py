@@ -0,0 +1,129 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['ColumnBuilder', 'CategoricalArray']
+
+CategoricalArray = collections.namedtuple('CategoricalArray', ['codes', 'categories'])
+"""Dictionary encoded column of columnar results.
+
+``codes`` is an ``int32`` array of indexes into ``categories``, ``-1`` where the value is NULL,
+and ``categories`` an object array of the distinct values in order of appearance. Convert it
+with ``pandas.Categorical.from_codes(codes, categories)``.
+"""
+
+_STORAGE_DTYPES = {
+    'bool': 'bool',
+    'int64': 'int64',
+    'float64': 'float64',
+    'datetime64[ms]': 'int64',
+    'datetime64[D]': 'int64',
+    'timedelta64[ms]': 'int64',
+}
+"""Dtype of the wire values behind each NumPy dtype of ``types.NUMPY_DTYPES``"""
+
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError('NumPy is required for columnar results, install it with "pip install numpy"')
+    return numpy
+
+
+class ColumnBuilder(object):
+    """Accumulates rows, one frame at a time, into per-column NumPy arrays.
+
+    :param column_types:
+        ``(dtype, mutate_to)`` pairs of the columns, where ``dtype`` is the name returned by
+        :meth:`TypeHelper.numpy_dtype() <aiophoenixdb.types.TypeHelper.numpy_dtype>`
+        (``None`` for object arrays) and ``mutate_to`` converts a Python value back into
+        its wire value.
+
+    :param categorical:
+        Indexes of the object columns built as a :class:`CategoricalArray`.
+    """
+
+    def __init__(self, column_types, categorical=()):
+        require_numpy()
+        self._column_types = column_types
+        self._chunks = [[] for _ in column_types]
+        self._masks = [[] for _ in column_types]
+        # Code of each distinct value of the categorical columns, kept across slices
+        self._categories = dict((i, {}) for i in categorical)
+
+    def add(self, rows, raw):
+        """Transposes a slice of a frame and converts each column into an array.
+
+        :param rows:
+            Decoded rows of the slice.
+
+        :param raw:
+            Whether the columns with a NumPy dtype hold wire values rather than Python values.
+        """
+        count = len(rows)
+        if count:
+            columns = list(zip(*rows))
+        else:
+            columns = [()] * len(self._column_types)
+        for i, (dtype, mutate_to) in enumerate(self._column_types):
+            values = columns[i]
+            categories = self._categories.get(i)
+            if categories is not None:
+                setdefault = categories.setdefault
+                self._chunks[i].append(numpy.fromiter(
+                    (-1 if v is None else setdefault(v, len(categories)) for v in values),
+                    dtype='int32', count=count))
+                continue
+            mask = numpy.fromiter((v is None for v in values), dtype='bool', count=count)
+            has_nulls = mask.any()
+            if dtype is None:
+                array = numpy.empty(count, dtype='object')
+                array[:] = values
+            else:
+                if not raw and mutate_to is not None:
+                    values = [None if v is None else mutate_to(v) for v in values]
+                if has_nulls:
+                    values = [0 if v is None else v for v in values]
+                array = numpy.array(values, dtype=_STORAGE_DTYPES[dtype])
+                if array.dtype != dtype:
+                    array = array.view(dtype)
+            self._chunks[i].append(array)
+            self._masks[i].append(mask)
+
+    def build(self):
+        """Returns one :class:`numpy.ma.MaskedArray` per column, masked where the value is NULL,
+        or a :class:`CategoricalArray` for the categorical columns."""
+        arrays = []
+        for i, (dtype, mutate_to) in enumerate(self._column_types):
+            chunks = self._chunks[i]
+            categories = self._categories.get(i)
+            if categories is not None:
+                codes = numpy.concatenate(chunks) if chunks else numpy.empty(0, dtype='int32')
+                values = numpy.empty(len(categories), dtype='object')
+                values[:] = list(categories)
+                arrays.append(CategoricalArray(codes, values))
+                continue
+            if len(chunks) == 1:
+                data, mask = chunks[0], self._masks[i][0]
+            elif chunks:
+                data, mask = numpy.concatenate(chunks), numpy.concatenate(self._masks[i])
+            else:
+                data, mask = numpy.empty(0, dtype=dtype or 'object'), numpy.empty(0, dtype='bool')
+            arrays.append(numpy.ma.MaskedArray(data, mask=mask))
+        return arrays
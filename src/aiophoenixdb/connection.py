@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
 import uuid
 from aiophoenixdb import errors
+from aiophoenixdb.avatica.client import deadline_after, time_left
+from aiophoenixdb.bulk import Loader
 from aiophoenixdb.errors import ProgrammingError
 from aiophoenixdb.meta import Meta
+from aiophoenixdb.scan import parallel_scan
+from aiophoenixdb.statements import StatementCache, StatementPool
+from aiophoenixdb.types import get_converters
 
 
 __all__ = ['Connection']
@@ -37,7 +43,8 @@ class Connection(object):
     The default cursor factory used by :meth:`cursor` if the parameter is not specified.
     """
 
-    def __init__(self, client, cursor_factory=None, **kwargs):
+    def __init__(self, client, cursor_factory=None, converters=None, statement_cache_size=32,
+                 statement_pool_size=16, **kwargs):
         self._client = client
         self._closed = False
         if cursor_factory is not None:
@@ -45,14 +52,27 @@ class Connection(object):
         else:
             from aiophoenixdb.cursors import Cursor
             self.cursor_factory = Cursor
+        self._converters = get_converters(converters)
+        self._statement_cache = StatementCache(self, statement_cache_size)
+        self._statement_pool = StatementPool(self, statement_pool_size)
         self._cursors = []
         self._phoenix_props, self.avatica_props_init = Connection._map_conn_props(kwargs)
         self._conn_id = str(uuid.uuid4())
         self._avatica_props = dict()
+        self._background_tasks = set()
+        # Statements waiting for the background close task
+        self._pending_closes = []
+        self._close_task = None
 
-    async def connect(self):
-        await self.open()
-        await self.set_session(**self.avatica_props_init)
+    async def connect(self, timeout=None):
+        """Opens the connection and synchronizes its properties.
+
+        :param timeout:
+            Seconds allowed for both round trips, ``None`` waits forever.
+        """
+        deadline = deadline_after(timeout)
+        await self.open(timeout=time_left(deadline))
+        await self.set_session(timeout=time_left(deadline), **self.avatica_props_init)
 
     # def __del__(self):
     #     asyncio.get_running_loop().run_until_complete(self.close())
@@ -80,6 +100,32 @@ class Connection(object):
     def connect_id(self):
         return self._conn_id
 
+    @property
+    def statement_cache(self):
+        """The :class:`~aiophoenixdb.statements.StatementCache` of the statements prepared by the
+        cursors of this connection, so that executing the same parameterized SQL again skips
+        the ``PrepareRequest``. Its ``max_size`` may be changed, 0 disables caching.
+        """
+        return self._statement_cache
+
+    @property
+    def statement_pool(self):
+        """The :class:`~aiophoenixdb.statements.StatementPool` of the statements the cursors
+        execute SQL without parameters on."""
+        return self._statement_pool
+
+    @property
+    def converters(self):
+        """Read/write attribute holding the :class:`~aiophoenixdb.types.Converters` given to the
+        cursors created afterwards, ``None`` for the default conversions. Accepts a profile
+        name such as ``'raw'`` or a mapping too.
+        """
+        return self._converters
+
+    @converters.setter
+    def converters(self, value):
+        self._converters = get_converters(value)
+
     @property
     def _default_avatica_props(self):
         return {'autoCommit': False,
@@ -106,9 +152,42 @@ class Connection(object):
             props['readOnly'] = bool(props.pop('readonly'))
         return props
 
-    async def open(self):
+    async def open(self, timeout=None):
         """Opens the connection."""
-        await self._client.open_connection(self._conn_id, info=self._phoenix_props)
+        await self._client.open_connection(self._conn_id, info=self._phoenix_props, timeout=timeout)
+
+    def _close_statement_later(self, statement_id):
+        """Closes a statement without waiting for the result.
+
+        Used when a request on the statement was cancelled or timed out, so that the
+        query server releases its scanners even though nobody awaits the cleanup, and when
+        a cursor is closed. The statements dropped meanwhile are closed one after the
+        other by a single background task.
+        """
+        if self._closed:
+            return
+        self._pending_closes.append(statement_id)
+        if self._close_task is None:
+            task = self._close_task = asyncio.ensure_future(self._close_pending_statements())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_task_done)
+
+    async def _close_pending_statements(self):
+        try:
+            # One at a time, as a connection runs one request at a time
+            while self._pending_closes:
+                statement_id = self._pending_closes.pop(0)
+                try:
+                    await self._client.close_statement(self._conn_id, statement_id)
+                except Exception as e:
+                    logger.warning('Background close of statement %s failed: %s', statement_id, e)
+        finally:
+            self._close_task = None
+
+    def _background_task_done(self, task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning('Background close of a statement failed: %s', task.exception())
 
     async def close(self):
         """Closes the connection.
@@ -120,12 +199,27 @@ class Connection(object):
         """
         if self._closed:
             raise ProgrammingError('The connection is already closed.')
+        prefetches = []
         for cursor_ref in self._cursors:
             cursor = cursor_ref()
             if cursor is not None and not cursor.closed:
+                if cursor._prefetch_task is not None:
+                    prefetches.append(cursor._prefetch_task)
                 await cursor.close()
-        await self._client.close_connection(self._conn_id)
-        await self._client.close()
+        # Cancelled by the cursors, none of their read-ahead fetches outlives the connection
+        if prefetches:
+            await asyncio.gather(*prefetches, return_exceptions=True)
+        # Closed by the server along with the connection
+        del self._pending_closes[:]
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._statement_cache.discard()
+        self._statement_pool.discard()
+        try:
+            await self._client.close_connection(self._conn_id)
+        finally:
+            # Only gives back this connection's share of the HTTP session
+            await self._client.close()
         self._closed = True
 
     async def commit(self):
@@ -157,7 +251,7 @@ class Connection(object):
         self._cursors.append(cursor.ref(self._cursors.remove))
         return cursor
 
-    async def set_session(self, **props):
+    async def set_session(self, timeout=None, **props):
         """Sets one or more parameters in the current connection.
 
         :param autocommit:
@@ -165,9 +259,12 @@ class Connection(object):
 
         :param readonly:
             Switch the connection to read-only mode.
+
+        :param timeout:
+            Seconds allowed for the round trip, ``None`` waits forever.
         """
         props = Connection._map_legacy_avatica_props(props)
-        self._avatica_props = await self._client.connection_sync_dict(self._conn_id, props)
+        self._avatica_props = await self._client.connection_sync_dict(self._conn_id, props, timeout=timeout)
 
     @property
     def autocommit(self):
@@ -199,6 +296,102 @@ class Connection(object):
         self._avatica_props = await self._client.connection_sync_dict(
             self._conn_id, {'transactionIsolation': bool(value)})
 
+    def parallel_scan(self, sql, split_by, parallelism=4, parameters=None, table=None, splits=None,
+                      ordered=False, pool=None, buffer_frames=2, timeout=None):
+        """Runs a SELECT as several queries on ranges of its leading primary key column,
+        fetched concurrently, and streams their rows.
+
+        A single statement is fetched frame after frame from one query server thread,
+        the ranges are scanned in parallel, e.g. by different region servers. Each range
+        runs on its own connection of ``pool``. Without ``pool`` the ranges are scanned one
+        after the other on this connection, which runs one request at a time, and a warning
+        is logged when ``parallelism`` is greater than 1::
+
+            async for row in conn.parallel_scan('SELECT * FROM T', 'ID', parallelism=8, table='T', pool=pool):
+                ...
+
+        :param sql:
+            The query, wrapped in ``SELECT * FROM (sql) WHERE split_by >= ? AND split_by < ?``.
+            Phoenix flattens the derived table, so each range becomes a scan range of the table.
+            Queries with ``LIMIT``, ``OFFSET``, ``ORDER BY``, ``GROUP BY``, ``DISTINCT``, ``UNION``
+            or an aggregate function are rejected, as each range would be limited, sorted or
+            aggregated on its own; only a trailing ``ORDER BY split_by`` is allowed, with ``ordered``.
+
+        :param split_by:
+            The column the ranges are taken on, usually the leading primary key column. It is
+            quoted in the range conditions, so the name is case sensitive, as stored in the catalog.
+
+        :param parallelism:
+            Maximum number of ranges scanned at the same time with ``pool``, and number of ranges
+            computed from the statistics.
+
+        :param parameters:
+            Parameters of the query.
+
+        :param table:
+            Table whose ``SYSTEM.STATS`` guideposts give the range boundaries when ``splits`` is
+            not given, see :func:`~aiophoenixdb.scan.get_split_points`.
+
+        :param splits:
+            Increasing boundary values of the ranges.
+
+        :param ordered:
+            Yield the ranges one after the other in increasing order, so that the rows of a query
+            ordered by ``split_by`` stay ordered. Otherwise rows are yielded as frames arrive.
+
+        :param pool:
+            A :class:`~aiophoenixdb.pool.Pool` the ranges are scanned on, instead of this connection.
+
+        :param buffer_frames:
+            Frames buffered per range scanned ahead of the consumer.
+
+        :param timeout:
+            Seconds allowed for each execution and each frame fetch, ``None`` waits forever.
+
+        :returns:
+            An async iterator over the rows.
+        """
+        if self._closed:
+            raise ProgrammingError('The connection is already closed.')
+        return parallel_scan(self, sql, split_by, parallelism=parallelism, parameters=parameters, table=table,
+                             splits=splits, ordered=ordered, pool=pool, buffer_frames=buffer_frames,
+                             timeout=timeout)
+
+    async def bulk_upsert(self, table, columns, source, workers=4, batch_size=10000, commit_every=100000,
+                          queue_size=None, pool=None, timeout=None, **csv_options):
+        """Writes the rows of ``source`` into a table with ``UPSERT`` batches executed by
+        concurrent workers, see :class:`~aiophoenixdb.bulk.Loader`::
+
+            count = await conn.bulk_upsert('SCHEMA.T', ['ID', 'NAME'], rows, workers=8, pool=pool)
+
+        :param table:
+            Name of the table, ``SCHEMA.TABLE`` or ``TABLE``, as stored in the catalog.
+
+        :param columns:
+            Names of the columns written, ``None`` for the columns of a DataFrame source or
+            all the columns of the table.
+
+        :param source:
+            An iterable or an asynchronous iterable of rows, a :class:`pandas.DataFrame`, or the
+            path or text file object of a CSV file.
+
+        :param workers:
+            Number of batches written at the same time, each on a connection of ``pool``.
+            Without ``pool`` the batches are written one at a time on this connection.
+
+        :param csv_options:
+            ``skip_header``, ``encoding`` and the :func:`csv.reader` formatting parameters of a
+            CSV source.
+
+        :returns:
+            The number of rows written.
+        """
+        if self._closed:
+            raise ProgrammingError('The connection is already closed.')
+        loader = Loader(self, table, columns, workers=workers, batch_size=batch_size, commit_every=commit_every,
+                        queue_size=queue_size, pool=pool, timeout=timeout)
+        return await loader.load(source, **csv_options)
+
     def meta(self):
         """Creates a new meta.
 
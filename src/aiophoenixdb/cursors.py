@@ -14,18 +14,35 @@
 
 import asyncio
 import collections
+import functools
 import logging
+import time
 import weakref
 
+from aiophoenixdb.avatica.client import deadline_after, time_left
+from aiophoenixdb.avatica.decoder import LazyRowDecoder, RowDecoder, StringInterner, get_row_decoder
+from aiophoenixdb.avatica.encoder import get_parameter_encoder
 from aiophoenixdb.avatica.proto.responses_pb import ResultSetResponse
 from aiophoenixdb.avatica.proto import common_pb
-from aiophoenixdb.errors import InternalError, ProgrammingError
-from aiophoenixdb.types import TypeHelper
+from aiophoenixdb.arrow import RecordBatchConverter, arrow_schema
+from aiophoenixdb.columnar import ColumnBuilder
+from aiophoenixdb.errors import InternalError, MissingStatementError, ProgrammingError
+from aiophoenixdb.types import (TypeHelper, datetime_from_java_sql_timestamp, get_converters,
+                                timestamp_converter)
 
-__all__ = ['Cursor', 'ColumnDescription', 'DictCursor']
+__all__ = ['Cursor', 'ColumnDescription', 'DictCursor', 'NamedTupleCursor', 'LazyCursor', 'get_row_class']
 
 logger = logging.getLogger(__name__)
 
+_ENCODE_SLICE = 1000
+"""Number of rows :meth:`Cursor.executemany` encodes before yielding to the event loop"""
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
 # TODO see note in Cursor.rowcount()
 MAX_INT = 2 ** 64 - 1
 
@@ -71,16 +88,73 @@ class Cursor(object):
     on the cursor. The default is 2000.
     """
 
-    def __init__(self, connection, _id=-1):
+    _PREFETCH = 0
+    """
+    Read/write attribute specifying the number of frames fetched
+    ahead in the background while the current one is consumed.
+    The default 0 fetches the next frame only once it is needed.
+    """
+
+    _BATCH_SIZE = 10000
+    """
+    Read/write attribute specifying the maximum number of rows
+    :meth:`executemany` sends in one request. The default is 10000.
+    """
+
+    _BATCH_BYTES = 4 * 1024 * 1024
+    """
+    Read/write attribute specifying the size in bytes of the encoded
+    rows from which :meth:`executemany` sends a request. The default
+    is 4 MiB.
+    """
+
+    _INTERN_SIZE = 65536
+    """
+    Maximum number of distinct strings kept by a cursor when
+    :attr:`interning` is enabled.
+    """
+
+    _ROW_DECODER = RowDecoder
+    """
+    The :class:`~aiophoenixdb.avatica.decoder.RowDecoder` class
+    decoding the rows of the frames.
+    """
+
+    def __init__(self, connection, _id=None):
         self._connection = connection
         self._id = _id
+        # Whether _id was checked out from the connection's statement pool
+        self._id_pooled = False
+        # Whether a result set not fetched to the end may still be open on _id
+        self._result_open = False
+        self._statement = None
         self._signature = None
         self._column_data_types = []
+        self._interning = None
+        self._interner = None
+        self._interned_decoders = {}
+        self._timezone = None
+        self._converters = connection.converters
+        self._row_decoder = None
+        self._raw_row_decoder = None
+        self._builtin_data_types = None
+        self._numpy_types = None
+        self._raw_casts = None
+        self._columnar_casts = None
+        self._arrow_converter = None
         self._frame = None
+        self._frame_raw = False
         self._pos = 0
+        self._fetched = []
         self._closed = False
         self._array_size = self.__class__._ARRAY_SIZE
         self._iter_size = self.__class__._ITER_SIZE
+        self._prefetch = self.__class__._PREFETCH
+        self._batch_size = self.__class__._BATCH_SIZE
+        self._batch_bytes = self.__class__._BATCH_BYTES
+        self._prefetch_task = None
+        self._prefetch_queue = None
+        self._frame_sizing = None
         self._update_count = -1
 
     def __del__(self):
@@ -94,13 +168,13 @@ class Cursor(object):
         if not self._closed:
             await self.close()
 
-    async def __aiter__(self):
+    def __aiter__(self):
         return self
 
     async def __anext__(self):
         row = await self.fetchone()
         if row is None:
-            raise StopIteration
+            raise StopAsyncIteration
         return row
 
     async def close(self):
@@ -112,13 +186,16 @@ class Cursor(object):
         """
         if self._closed:
             raise ProgrammingError('The cursor is already closed.')
-        if self._id is not None:
-            await self._connection.client.close_statement(self._connection.connect_id, self._id)
-            self._id = -1
+        self._stop_prefetch()
+        # Left open for the next cursor executing the same SQL, or closed in the background
+        self._release_statement()
+        self._release_id()
         self._signature = None
         self._column_data_types = []
+        self._row_decoder = None
         self._frame = None
         self._pos = 0
+        self._fetched = []
         self._closed = True
 
     @property
@@ -126,6 +203,88 @@ class Cursor(object):
         """Read-only attribute specifying if the cursor is closed or not."""
         return self._closed
 
+    @property
+    def arraysize(self):
+        """Read/write attribute specifying the number of rows :meth:`fetchmany` returns by default."""
+        return self._array_size
+
+    @arraysize.setter
+    def arraysize(self, value):
+        if value < 1:
+            raise ProgrammingError('arraysize should be at least 1')
+        self._array_size = value
+
+    @property
+    def prefetch(self):
+        """Read/write attribute specifying the number of frames fetched ahead in the
+        background while the current one is consumed, ``0`` disables the read-ahead.
+
+        Hides the query server round trip behind the processing of the rows on long scans,
+        at the cost of holding up to this many extra frames in memory.
+        """
+        return self._prefetch
+
+    @prefetch.setter
+    def prefetch(self, value):
+        if value < 0:
+            raise ProgrammingError('prefetch should be zero or greater')
+        self._prefetch = value
+
+    @property
+    def batch_size(self):
+        """Read/write attribute specifying the maximum number of rows :meth:`executemany`
+        sends in one ``ExecuteBatchRequest``."""
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, value):
+        if value < 1:
+            raise ProgrammingError('batch_size should be at least 1')
+        self._batch_size = value
+
+    @property
+    def batch_bytes(self):
+        """Read/write attribute specifying the size in bytes of the encoded rows from which
+        :meth:`executemany` sends an ``ExecuteBatchRequest``, a single larger row being sent
+        on its own."""
+        return self._batch_bytes
+
+    @batch_bytes.setter
+    def batch_bytes(self, value):
+        if value < 1:
+            raise ProgrammingError('batch_bytes should be at least 1')
+        self._batch_bytes = value
+
+    @property
+    def frame_sizing(self):
+        """Read/write attribute holding an :class:`~aiophoenixdb.sizing.AdaptiveFrameSize`
+        which sizes the frames from the rows of each query, ``None`` requests a fixed number
+        of rows per frame.
+
+        Usage::
+
+            cursor.frame_sizing = AdaptiveFrameSize(target_bytes=8 * 1024 * 1024)
+        """
+        return self._frame_sizing
+
+    @frame_sizing.setter
+    def frame_sizing(self, value):
+        self._frame_sizing = value
+
+    def _first_frame_size(self):
+        if self._frame_sizing is None:
+            return self._iter_size
+        return self._frame_sizing.first_frame_size
+
+    def _frame_size(self):
+        if self._frame_sizing is None:
+            return self._iter_size
+        return self._frame_sizing.frame_size
+
+    def _record_frame(self, frame, elapsed=None):
+        if self._frame_sizing is not None and frame is not None:
+            self._frame_sizing.record(len(frame.rows), frame.nbytes, elapsed)
+
     @property
     def description(self):
         if self._signature is None:
@@ -152,222 +311,910 @@ class Cursor(object):
             return column.column_name
 
     async def _set_id(self, _id):
-        if self._id is not None and self._id != _id:
-            await self._connection.client.close_statement(self._connection.connect_id, self._id)
-        self._id = _id
+        if self._statement is not None and self._statement.id != _id:
+            self._release_statement()
+        if self._id != _id:
+            self._release_id()
+            self._id = _id
+
+    async def _acquire_id(self, deadline):
+        """Checks out a statement from the connection's
+        :attr:`~aiophoenixdb.connection.Connection.statement_pool`, unless the cursor holds one."""
+        if self._id is None:
+            self._id = await self._connection.statement_pool.acquire(timeout=time_left(deadline))
+            self._id_pooled = True
+
+    def _release_id(self):
+        """Gives the statement held by the cursor back to the connection's pool, or closes it
+        in the background when it did not come from the pool or a result set is still open on it."""
+        if self._id is None:
+            return
+        if self._id_pooled and not self._result_open:
+            self._connection.statement_pool.release(self._id)
+        else:
+            self._connection._close_statement_later(self._id)
+        self._id = None
+        self._id_pooled = False
+        self._result_open = False
 
     def _set_signature(self, signature):
         self._signature = signature
         self._column_data_types = []
         self._parameter_data_types = []
+        self._parameter_encoder = None
+        self._row_decoder = None
+        self._raw_row_decoder = None
+        self._builtin_data_types = None
+        self._numpy_types = None
+        self._raw_casts = None
+        self._columnar_casts = None
+        self._arrow_converter = None
         if signature is None:
             return
 
-        for column in signature.columns:
-            dtype = TypeHelper.from_column(column)
-            self._column_data_types.append(dtype)
+        self._column_data_types = self._get_column_data_types(signature)
+        self._row_decoder = self._make_row_decoder(self._column_data_types)
 
         for parameter in signature.parameters:
             dtype = TypeHelper.from_param(parameter)
             self._parameter_data_types.append(dtype)
 
-    def _set_frame(self, frame):
+    @property
+    def interning(self):
+        """Read/write attribute selecting the string columns whose values are interned:
+        ``True`` for all of them, a collection of column names, or ``None`` to disable it.
+
+        Equal strings are then decoded into a single ``str`` object, shared across the frames
+        and result sets of the cursor, up to :attr:`_INTERN_SIZE` distinct values. Saves memory
+        on columns such as status codes or tenant IDs repeated over many rows. Takes effect
+        from the next execution.
+        """
+        return self._interning
+
+    @interning.setter
+    def interning(self, value):
+        if value is False:
+            value = None
+        elif value is not None and value is not True:
+            value = frozenset(value)
+        self._interning = value
+        self._interned_decoders.clear()
+
+    @property
+    def timezone(self):
+        """Read/write attribute holding the :class:`datetime.tzinfo` of the TIMESTAMP values,
+        ``None`` by default for naive datetimes.
+
+        When set, the wire values are read as UTC and returned as aware datetimes converted
+        to this timezone. Takes effect from the next execution.
+        """
+        return self._timezone
+
+    @timezone.setter
+    def timezone(self, value):
+        self._timezone = value
+
+    @property
+    def converters(self):
+        """Read/write attribute holding the :class:`~aiophoenixdb.types.Converters` overriding the
+        conversion of the column values, by default those of the connection. Accepts a profile
+        name such as ``'raw'``, a mapping, or ``None`` for the default conversions. Takes effect
+        from the next execution. Columnar and Arrow results keep the built-in conversions, and
+        raise :exc:`~aiophoenixdb.errors.ProgrammingError` for a column with a custom converter.
+        """
+        return self._converters
+
+    @converters.setter
+    def converters(self, value):
+        self._converters = get_converters(value)
+
+    def _get_column_data_types(self, signature, converters=True):
+        column_data_types = [TypeHelper.from_column(column) for column in signature.columns]
+        if self._timezone is not None:
+            cast_tz = timestamp_converter(self._timezone)
+            column_data_types = [(field_name, rep, mutate_to, cast_tz)
+                                 if cast_from is datetime_from_java_sql_timestamp else
+                                 (field_name, rep, mutate_to, cast_from)
+                                 for field_name, rep, mutate_to, cast_from in column_data_types]
+        if converters and self._converters:
+            column_data_types = [self._converters.apply(column, column_type)
+                                 for column, column_type in zip(signature.columns, column_data_types)]
+        if self._interning is not None:
+            for i, column in enumerate(signature.columns):
+                field_name, rep, mutate_to, cast_from = column_data_types[i]
+                if field_name == 'string_value' and cast_from is None and (
+                        self._interning is True or self._get_column_name(column) in self._interning):
+                    if self._interner is None:
+                        self._interner = StringInterner(self._INTERN_SIZE)
+                    column_data_types[i] = (field_name, rep, mutate_to, self._interner.__getitem__)
+        return column_data_types
+
+    def _make_row_decoder(self, column_types, decoder_class=None):
+        """Returns the decoder of the rows of the given column types, by default a :attr:`_ROW_DECODER`."""
+        if decoder_class is None:
+            decoder_class = self._ROW_DECODER
+        if self._interner is None:
+            # Shared by every cursor reading the same column types
+            return get_row_decoder(column_types, decoder_class)
+        # Not shared, as the decoder holds the interner of this cursor
+        key = (tuple(column_types), decoder_class)
+        decoder = self._interned_decoders.get(key)
+        if decoder is None:
+            if len(self._interned_decoders) >= 64:
+                self._interned_decoders.clear()
+            decoder = self._interned_decoders[key] = decoder_class(key[0])
+        return decoder
+
+    def _row_decoder_for(self, signature):
+        return self._make_row_decoder(self._get_column_data_types(signature))
+
+    def _get_builtin_data_types(self):
+        """Returns the column types of the columnar results, which ignore the converters."""
+        if self._builtin_data_types is None:
+            if self._converters:
+                self._builtin_data_types = self._get_column_data_types(self._signature, converters=False)
+            else:
+                self._builtin_data_types = self._column_data_types
+        return self._builtin_data_types
+
+    def _get_numpy_types(self):
+        """Returns the ``(dtype, mutate_to)`` pairs of the columns for columnar results."""
+        if self._numpy_types is None:
+            self._numpy_types = [(TypeHelper.numpy_dtype(column), None if cast_from is None else mutate_to)
+                                 for column, (field_name, rep, mutate_to, cast_from) in zip(
+                                     self._signature.columns, self._get_builtin_data_types())]
+        return self._numpy_types
+
+    def _get_raw_row_decoder(self):
+        """Returns a decoder leaving unconverted the wire value of the columns with a NumPy dtype,
+        and of the columns whose converter is overridden."""
+        if self._raw_row_decoder is None:
+            self._raw_row_decoder = self._make_row_decoder(
+                ((field_name, rep, mutate_to, None if dtype is not None or cast_from != builtin[3] else cast_from)
+                 for (field_name, rep, mutate_to, cast_from), builtin, (dtype, _) in zip(
+                    self._column_data_types, self._get_builtin_data_types(), self._get_numpy_types())),
+                RowDecoder)
+        return self._raw_row_decoder
+
+    def _get_arrow_converter(self):
+        if self._arrow_converter is None:
+            columns = self._signature.columns
+            schema = arrow_schema(columns, [self._get_column_name(column) for column in columns])
+            time_columns = [i for i, (dtype, _) in enumerate(self._get_numpy_types()) if dtype == 'timedelta64[ms]']
+            self._arrow_converter = RecordBatchConverter(schema, time_columns)
+        return self._arrow_converter
+
+    def _get_raw_casts(self):
+        """Returns the ``(index, cast_from)`` pairs of the columns left unconverted by the raw decoder."""
+        if self._raw_casts is None:
+            self._raw_casts = [(i, data_type[3]) for i, (data_type, builtin, (dtype, _)) in enumerate(
+                zip(self._column_data_types, self._get_builtin_data_types(), self._get_numpy_types()))
+                if (dtype is not None or data_type[3] != builtin[3]) and data_type[3] is not None]
+        return self._raw_casts
+
+    def _get_columnar_casts(self, raw):
+        """Returns the ``(index, cast_from)`` pairs of the columns whose wire values, kept by the
+        converters, are converted by the built-in casts for columnar results.
+
+        :param raw:
+            Casts of the rows of the raw decoder rather than of the row decoder.
+
+        :raises:
+            ProgrammingError if a column has a custom converter, whose values cannot be converted back.
+        """
+        if self._columnar_casts is None:
+            casts = {False: [], True: []}
+            for i, (column, data_type, builtin, (dtype, _)) in enumerate(zip(
+                    self._signature.columns, self._column_data_types, self._get_builtin_data_types(),
+                    self._get_numpy_types())):
+                if data_type[3] == builtin[3]:
+                    continue
+                if data_type[3] is not None:
+                    raise ProgrammingError('Column {} has a custom converter, columnar and Arrow results '
+                                           'require the built-in or raw conversions.'
+                                           .format(self._get_column_name(column)))
+                if builtin[3] is not None:
+                    casts[False].append((i, builtin[3]))
+                    if dtype is None:
+                        casts[True].append((i, builtin[3]))
+            self._columnar_casts = casts
+        return self._columnar_casts[raw]
+
+    def _cook_row(self, row):
+        """Converts the wire values left in a row decoded by the raw decoder."""
+        casts = self._get_raw_casts()
+        if not casts:
+            return row
+        row = list(row)
+        for i, cast_from in casts:
+            value = row[i]
+            if value is not None:
+                row[i] = cast_from(value)
+        return tuple(row)
+
+    def _cook_rows(self, rows):
+        """Converts the wire values left in rows decoded by the raw decoder, one column at a time."""
+        return self._cast_columns(rows, self._get_raw_casts())
+
+    def _columnar_rows(self, rows, raw):
+        """Converts the wire values kept by the converters in rows going to columnar results."""
+        return self._cast_columns(rows, self._get_columnar_casts(raw))
+
+    @staticmethod
+    def _cast_columns(rows, casts):
+        if not casts or not rows:
+            return rows
+        columns = list(zip(*rows))
+        for i, cast_from in casts:
+            columns[i] = [None if v is None else cast_from(v) for v in columns[i]]
+        return list(zip(*columns))
+
+    def _set_frame(self, frame, raw=False):
         self._frame = frame
-        self._pos = 0
+        self._frame_raw = raw
+        self._pos = None
+        if frame is None or frame.offset == 0:
+            self._fetched = []
 
         if frame is not None:
+            # Kept when the frame is cleared, until the statement is executed again or released
+            self._result_open = not frame.done
             if frame.rows:
                 self._pos = 0
             elif not frame.done:
                 raise InternalError('Got an empty frame, but the statement is not done yet.')
 
-    async def _fetch_next_frame(self):
-        offset = self._frame.offset + len(self._frame.rows)
-        frame = await self._connection.client.fetch(
-            self._connection.connect_id, self._id,
-            offset=offset, frame_max_size=self._iter_size)
-        self._set_frame(frame)
+    def _abandon_statement(self):
+        """Drops the statement after an interrupted request and closes it in the background,
+        so that the query server does not keep its scanners open."""
+        self._stop_prefetch()
+        self._drop_statement()
+        self._set_signature(None)
+        self._frame = None
+        self._pos = 0
+        self._fetched = []
+
+    def _drop_statement(self):
+        # A statement of the cache is not given back, the request interrupted on it may still run
+        self._statement = None
+        if self._id is not None:
+            self._connection._close_statement_later(self._id)
+        self._id = None
+        self._id_pooled = False
+        self._result_open = False
+
+    def _start_prefetch(self):
+        if self._prefetch <= 0 or self._prefetch_task is not None or self._frame is None or self._frame.done:
+            return
+        self._prefetch_queue = asyncio.Queue(self._prefetch)
+        self._prefetch_task = asyncio.ensure_future(self._prefetch_frames(
+            self._frame.offset + len(self._frame.rows), self._prefetch_queue))
+
+    async def _prefetch_frames(self, offset, queue):
+        """Fetches the following frames one after the other until the queue is full."""
+        while True:
+            try:
+                started = time.monotonic()
+                frame = await self._connection.client.fetch(
+                    self._connection.connect_id, self._id,
+                    offset=offset, frame_max_size=self._frame_size(), row_decoder=self._row_decoder)
+            except Exception as e:
+                # Raised by the fetch method waiting for this frame
+                await queue.put(e)
+                return
+            self._record_frame(frame, time.monotonic() - started)
+            await queue.put(frame)
+            if frame is None or frame.done:
+                return
+            offset = frame.offset + len(frame.rows)
+
+    def _stop_prefetch(self):
+        task = self._prefetch_task
+        self._prefetch_task = None
+        self._prefetch_queue = None
+        if task is not None and not task.done():
+            task.cancel()
+            # The query server may still serve a cancelled fetch, so the statement is not reused
+            self._drop_statement()
+
+    async def _fetch_next_frame(self, deadline=None, raw=False):
+        """Replaces the consumed frame by the next one.
+
+        :param raw:
+            Decode the frame with :meth:`_get_raw_row_decoder`, unless it was read ahead already.
+        """
+        self._start_prefetch()
+        try:
+            if self._prefetch_task is not None:
+                raw = False
+                frame = await asyncio.wait_for(self._prefetch_queue.get(), time_left(deadline))
+                if isinstance(frame, Exception):
+                    self._stop_prefetch()
+                    raise frame
+            else:
+                offset = self._frame.offset + len(self._frame.rows)
+                started = time.monotonic()
+                frame = await self._connection.client.fetch(
+                    self._connection.connect_id, self._id,
+                    offset=offset, frame_max_size=self._frame_size(), timeout=time_left(deadline),
+                    row_decoder=self._get_raw_row_decoder() if raw else self._row_decoder)
+                self._record_frame(frame, time.monotonic() - started)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._abandon_statement()
+            raise
+        self._set_frame(frame, raw)
 
     async def process_result(self, result: ResultSetResponse):
         if result.own_statement:
             await self._set_id(result.statement_id)
         self._set_signature(result.signature)
-        self._set_frame(result.first_frame)
+        frame = result.first_frame
+        if isinstance(frame, common_pb.Frame):
+            # Result sets of the metadata requests are parsed by betterproto
+            frame = self._row_decoder.decode_message(frame)
+        self._record_frame(frame)
+        self._set_frame(frame)
         self._update_count = result.update_count
+        self._start_prefetch()
 
     async def _process_results(self, results):
         if results:
             await self.process_result(results[0])
 
-    def _transform_parameters(self, parameters):
-        if len(parameters) != len(self._parameter_data_types):
-            raise ProgrammingError('Number of placeholders (?) must match number of parameters.'
-                                   ' Number of placeholders: {0}. Number of parameters: {1}'
-                                   .format(len(self._parameter_data_types), len(parameters)))
-        typed_parameters = []
-        for value, data_type in zip(parameters, self._parameter_data_types):
-            field_name, rep, mutate_to, cast_from, is_array = data_type
-            typed_value = common_pb.TypedValue()
-
-            if value is None:
-                typed_value.null = True
-                typed_value.type = common_pb.Rep.NULL
-            else:
-                typed_value.null = False
-                if is_array:
-                    if type(value) in [list, tuple]:
-                        for element in value:
-                            if mutate_to is not None:
-                                element = mutate_to(element)
-                            typed_element = common_pb.TypedValue()
-                            if element is None:
-                                typed_element.null = True
-                            else:
-                                typed_element.type = rep
-                                setattr(typed_element, field_name, element)
-                            typed_value.array_value.append(typed_element)
-                        typed_value.type = common_pb.Rep.ARRAY
-                        typed_value.component_type = rep
-                    else:
-                        raise ProgrammingError('Scalar value specified for array parameter.')
-                else:
-                    if mutate_to is not None:
-                        value = mutate_to(value)
-                    typed_value.type = rep
-                    setattr(typed_value, field_name, value)
+    def _get_parameter_encoder(self):
+        if self._parameter_encoder is None:
+            self._parameter_encoder = get_parameter_encoder(self._parameter_data_types)
+        return self._parameter_encoder
 
-            typed_parameters.append(typed_value)
-        return typed_parameters
+    async def execute(self, operation, parameters=None, timeout=None):
+        """Executes a statement, preparing it first when parameters are given.
 
-    async def execute(self, operation, parameters=None):
+        :param timeout:
+            Seconds allowed for all round trips of the execution, ``None`` waits forever.
+            On timeout or cancellation the statement is closed in the background.
+        """
         if self._closed:
             raise ProgrammingError('The cursor is already closed.')
         self._update_count = -1
+        self._stop_prefetch()
         self._set_frame(None)
-        if parameters is None:
-            if self._id is None:
-                c_id = await self._connection.client.create_statement(self._connection.connect_id)
-                await self._set_id(c_id)
-            results = await self._connection.client.prepare_and_execute(
-                self._connection.connect_id, self._id,
-                operation, first_frame_max_size=self._iter_size)
-            await self._process_results(results)
-        else:
-            statement = await self._connection.client.prepare(
-                self._connection.connect_id, operation)
-            await self._set_id(statement.id)
-            self._set_signature(statement.signature)
-
-            results = await self._connection.client.execute(
-                self._connection.connect_id, self._id,
-                statement.signature, self._transform_parameters(parameters),
-                first_frame_max_size=self._iter_size)
-            await self._process_results(results)
-
-    async def executemany(self, operation, seq_of_parameters):
+        if self._frame_sizing is not None:
+            self._frame_sizing.reset()
+        deadline = deadline_after(timeout)
+        try:
+            if parameters is None:
+                def request():
+                    return self._connection.client.prepare_and_execute(
+                        self._connection.connect_id, self._id,
+                        operation, first_frame_max_size=self._first_frame_size(), timeout=time_left(deadline),
+                        row_decoder_factory=self._row_decoder_for)
+                results = await self._run_unprepared(request, deadline)
+                await self._process_results(results)
+            else:
+                async def request(statement):
+                    self._set_signature(statement.signature)
+                    return await self._connection.client.execute(
+                        self._connection.connect_id, self._id,
+                        statement.signature_bytes, self._get_parameter_encoder().encode_execute(parameters),
+                        first_frame_max_size=self._first_frame_size(), timeout=time_left(deadline),
+                        row_decoder_factory=self._row_decoder_for)
+                results = await self._run_prepared(operation, request, deadline)
+                await self._process_results(results)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._abandon_statement()
+            raise
+
+    async def executemany(self, operation, seq_of_parameters, timeout=None):
+        """Executes a statement once for each row of parameters.
+
+        The rows are sent in ``ExecuteBatchRequest`` chunks of up to :attr:`batch_size` rows
+        and about :attr:`batch_bytes` bytes, the next chunk being encoded while the previous
+        one is written by the server. When the execution fails, the chunks already sent may
+        have been written. A connection runs one request at a time, write on several
+        connections with :class:`~aiophoenixdb.bulk.Loader` to write chunks concurrently.
+
+        :param seq_of_parameters:
+            An iterable or an asynchronous iterable of parameter sequences, consumed chunk
+            by chunk.
+
+        :param timeout:
+            Seconds allowed for all round trips of the execution, ``None`` waits forever.
+
+        :returns:
+            The update counts of all the rows, in order.
+        """
         if self._closed:
             raise ProgrammingError('The cursor is already closed.')
         self._update_count = -1
+        self._stop_prefetch()
         self._set_frame(None)
-        statement = await self._connection.client.prepare(
-            self._connection.connect_id, operation, max_rows_total=0)
-        await self._set_id(statement.id)
+        deadline = deadline_after(timeout)
+        try:
+            return await self._execute_batches(operation, seq_of_parameters, deadline)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._abandon_statement()
+            raise
+
+    async def executebatch(self, sql_commands, timeout=None):
+        """Executes several SQL commands without parameters in a single round trip,
+        e.g. the ``UPSERT`` and ``DELETE`` statements of a maintenance job.
+
+        :param sql_commands:
+            List of SQL commands, none of which may return a result set.
+
+        :param timeout:
+            Seconds allowed for all round trips of the execution, ``None`` waits forever.
+
+        :returns:
+            The update counts of the commands, in order.
+        """
+        if self._closed:
+            raise ProgrammingError('The cursor is already closed.')
+        self._update_count = -1
+        self._stop_prefetch()
+        self._set_frame(None)
+        self._set_signature(None)
+        sql_commands = list(sql_commands)
+        deadline = deadline_after(timeout)
+        try:
+            def request():
+                return self._connection.client.prepare_and_execute_batch(
+                    self._connection.connect_id, self._id, sql_commands, timeout=time_left(deadline))
+            return await self._run_unprepared(request, deadline)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._abandon_statement()
+            raise
+
+    async def _execute_batches(self, operation, seq_of_parameters, deadline):
+        statement = await self._prepare(operation, deadline)
         self._set_signature(statement.signature)
-        return await self._connection.client.execute_batch(
-            self._connection.connect_id, self._id,
-            [self._transform_parameters(p) for p in seq_of_parameters])
+        batches = self._encode_batches(seq_of_parameters, self._get_parameter_encoder().encode_update)
+        update_counts = []
+        # The chunk in flight, while the next one is encoded
+        task = None
+
+        async def collect():
+            counts, statement = await task
+            if statement is not self._statement:
+                # Prepared again after the server lost it
+                self._statement = statement
+                self._id = statement.id
+            update_counts.extend(counts)
+
+        try:
+            async for updates in batches:
+                if task is not None:
+                    await collect()
+                task = asyncio.ensure_future(self._execute_batch(operation, self._statement, updates, deadline))
+            if task is not None:
+                await collect()
+        except BaseException:
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                # Not reused, the interrupted request may still run
+                self._drop_statement()
+            raise
+        finally:
+            await batches.aclose()
+        return update_counts
+
+    async def _execute_batch(self, operation, statement, updates, deadline):
+        """Sends a chunk of encoded rows on ``statement``, preparing it again if the server
+        lost it.
+
+        :returns:
+            The update counts and the statement the chunk was written on.
+        """
+        client = self._connection.client
+        try:
+            counts = await client.execute_batch(self._connection.connect_id, statement.id, updates,
+                                                timeout=time_left(deadline))
+        except MissingStatementError:
+            logger.debug('Statement %s is missing on the server, preparing it again', statement.id)
+            self._connection.statement_cache.discard(operation)
+            statement = await self._connection.statement_cache.acquire(operation, timeout=time_left(deadline))
+            counts = await client.execute_batch(self._connection.connect_id, statement.id, updates,
+                                                timeout=time_left(deadline))
+        return counts, statement
+
+    async def _encode_batches(self, seq_of_parameters, encode):
+        """Encodes the rows of parameters into chunks of ``UpdateBatch`` messages, lazily."""
+        batch_size = self._batch_size
+        batch_bytes = self._batch_bytes
+        if hasattr(seq_of_parameters, '__aiter__'):
+            rows = seq_of_parameters
+        else:
+            rows = _aiter(seq_of_parameters)
+        updates = []
+        size = 0
+        async for parameters in rows:
+            update = encode(parameters)
+            updates.append(update)
+            # Tag and length of the field
+            size += len(update) + 6
+            if len(updates) >= batch_size or size >= batch_bytes:
+                yield updates
+                updates = []
+                size = 0
+            elif len(updates) % _ENCODE_SLICE == 0:
+                # Lets the chunks in flight be sent and received while encoding
+                await asyncio.sleep(0)
+        if updates:
+            yield updates
+
+    async def _prepare(self, operation, deadline):
+        """Checks out the prepared statement of ``operation`` from the connection's
+        :attr:`~aiophoenixdb.connection.Connection.statement_cache`, unless the cursor
+        already holds it."""
+        statement = self._statement
+        if statement is not None and statement.sql == operation:
+            return statement
+        statement = await self._connection.statement_cache.acquire(operation, timeout=time_left(deadline))
+        self._release_statement()
+        # The statement of a query executed without parameters
+        self._release_id()
+        self._statement = statement
+        self._id = statement.id
+        return statement
+
+    def _release_statement(self):
+        """Gives the prepared statement held by the cursor back to the connection's cache,
+        or closes it in the background when a result set is still open on it."""
+        if self._statement is not None:
+            if self._result_open:
+                self._connection._close_statement_later(self._statement.id)
+            else:
+                self._connection.statement_cache.release(self._statement)
+            self._statement = None
+            self._id = None
+            self._result_open = False
+
+    async def _run_prepared(self, operation, request, deadline):
+        """Awaits ``request(statement)`` on the prepared statement of ``operation``,
+        preparing it again if the server lost it."""
+        statement = await self._prepare(operation, deadline)
+        try:
+            return await request(statement)
+        except MissingStatementError:
+            # Expired on the server, as have probably the other idle statements of this SQL
+            logger.debug('Statement %s is missing on the server, preparing it again', statement.id)
+            self._connection.statement_cache.discard(operation)
+            self._statement = None
+            self._id = None
+            statement = await self._prepare(operation, deadline)
+            return await request(statement)
+
+    async def _run_unprepared(self, request, deadline):
+        """Awaits ``request()`` on a statement of the connection's pool, taking another one if
+        the server lost it."""
+        self._release_statement()
+        await self._acquire_id(deadline)
+        try:
+            return await request()
+        except MissingStatementError:
+            # Only this statement is known to be gone, the idle ones of the pool are kept. The
+            # retry runs on a new statement, an idle one may have expired as well.
+            logger.debug('Statement %s is missing on the server, creating another one', self._id)
+            self._result_open = False
+            self._id = await self._connection.client.create_statement(
+                self._connection.connect_id, timeout=time_left(deadline))
+            self._id_pooled = True
+            return await request()
 
     async def get_sync_results(self, state):
         if self._closed:
             raise ProgrammingError('The cursor is already closed.')
-        if self._id is None:
-            c_id = await self._connection.client.create_statement(self._connection.connect_id)
-            await self._set_id(c_id)
+        await self._acquire_id(None)
         return self._connection.client.get_sync_results(self._connection.connect_id, self._id, state)
 
     async def fetch(self, signature):
         if self._closed:
             raise ProgrammingError('The cursor is already closed.')
         self._update_count = -1
+        self._stop_prefetch()
         self._set_signature(signature)
-        frame = await self._connection.client.fetch(self._connection.connect_id, self._id, 0, self._iter_size)
+        if self._frame_sizing is not None:
+            self._frame_sizing.reset()
+        frame = await self._connection.client.fetch(self._connection.connect_id, self._id, 0,
+                                                    self._first_frame_size(), row_decoder=self._row_decoder)
+        self._record_frame(frame)
         self._set_frame(frame)
+        self._start_prefetch()
 
     def transform_row(self, row):
-        """Transforms a Row into Python values.
+        """Transforms a decoded row into the object returned by the fetch methods.
 
         :param row:
-            A ``common_pb2.Row`` object.
+            A tuple of values already cast into the correct Python types.
 
         :returns:
-            A list of values cast into the correct Python types.
-
-        :raises:
-            NotImplementedError
+            The row itself, subclasses may return another representation.
         """
-        tmp_row = []
-
-        for i, column in enumerate(row.value):
-            if column.scalar_value.null:
-                tmp_row.append(None)
-            elif column.has_array_value:
-                field_name, rep, mutate_to, cast_from = self._column_data_types[i]
-
-                list_value = []
-                for j, typed_value in enumerate(column.array_value):
-                    value = getattr(typed_value, field_name)
-                    if cast_from is not None:
-                        value = cast_from(value)
-                    list_value.append(value)
-
-                tmp_row.append(list_value)
-            else:
-                field_name, rep, mutate_to, cast_from = self._column_data_types[i]
+        return row
 
-                # get the value from the field_name
-                value = getattr(column.scalar_value, field_name)
+    def transform_rows(self, rows):
+        """Transforms a slice of a frame with :meth:`transform_row`.
 
-                # cast the value
-                if cast_from is not None:
-                    value = cast_from(value)
+        The rows are returned as they are when :meth:`transform_row` is not overridden.
 
-                tmp_row.append(value)
-        return tmp_row
+        :param rows:
+            A list of decoded rows, owned by the caller.
 
-    async def fetchone(self):
+        :returns:
+            A list of transformed rows.
+        """
+        transform_row = self.transform_row
+        if transform_row.__func__ is Cursor.transform_row:
+            return rows
+        return [transform_row(row) for row in rows]
+
+    def _check_frame(self):
         if self._frame is None:
             raise ProgrammingError('No select statement was executed.')
+
+    def _take_fetched(self, size):
+        rows = self._fetched
+        if size is None or size >= len(rows):
+            self._fetched = []
+            return rows
+        self._fetched = rows[size:]
+        return rows[:size]
+
+    async def _next_rows(self, size, deadline, raw=False, transform=True):
+        """Takes up to ``size`` rows (all when ``None``) of the current frame,
+        fetching the next frame once the current one is consumed.
+
+        The rows kept by an interrupted :meth:`fetchmany` or :meth:`fetchall` are taken first.
+        If fetching the next frame fails, the rows taken from the current one are left to
+        the next call.
+
+        :param raw:
+            Return the rows untransformed, with the built-in conversions of the columnar results,
+            along with whether they hold wire values, and fetch the next frame with the raw decoder.
+
+        :param transform:
+            Return the rows untransformed, with Python values.
+        """
+        if self._fetched:
+            chunk = self._take_fetched(size)
+            if raw:
+                return self._columnar_rows(chunk, False), False
+            return self.transform_rows(chunk) if transform else chunk
+        frame = self._frame
+        rows = frame.rows
+        frame_raw = self._frame_raw
+        start = self._pos
+        count = len(rows)
+        end = count if size is None else min(count, start + size)
+        if start == 0 and end == count:
+            # The frame is not read again, hand over its list instead of copying it
+            chunk = rows
+        else:
+            chunk = rows[start:end]
+        if end < count:
+            self._pos = end
+        else:
+            self._pos = None
+            if not frame.done:
+                try:
+                    await self._fetch_next_frame(deadline, raw)
+                except BaseException:
+                    if self._frame is frame:
+                        self._pos = start
+                    raise
+        if raw:
+            return self._columnar_rows(chunk, frame_raw), frame_raw
+        if frame_raw:
+            chunk = self._cook_rows(chunk)
+        return self.transform_rows(chunk) if transform else chunk
+
+    async def fetchone(self, timeout=None):
+        """Fetches the next row, ``None`` when the result set is exhausted.
+
+        :param timeout:
+            Seconds allowed for fetching the next frame if one is needed, ``None`` waits forever.
+        """
+        return await self._fetchone(deadline_after(timeout))
+
+    async def _fetchone(self, deadline):
+        self._check_frame()
+        if self._fetched:
+            return self.transform_row(self._fetched.pop(0))
         if self._pos is None:
             return None
-        rows = self._frame.rows
-        row = self.transform_row(rows[self._pos])
+        frame = self._frame
+        rows = frame.rows
+        row = rows[self._pos]
+        if self._frame_raw:
+            row = self._cook_row(row)
+        row = self.transform_row(row)
         self._pos += 1
         if self._pos >= len(rows):
-            self._pos = 0
-            if not self._frame.done:
-                await self._fetch_next_frame()
+            self._pos = None
+            if not frame.done:
+                try:
+                    await self._fetch_next_frame(deadline)
+                except BaseException:
+                    if self._frame is frame:
+                        self._pos = len(rows) - 1
+                    raise
         return row
 
-    async def fetchmany(self, size=None):
+    async def fetchmany(self, size=None, timeout=None):
+        """Fetches up to ``size`` rows, by default :attr:`arraysize`.
+
+        Rows are taken from the current frame in bulk, round trips only happen at frame boundaries.
+        If a round trip fails, the rows already taken are returned by the next fetch.
+
+        :param timeout:
+            Seconds allowed for all the round trips needed, ``None`` waits forever.
+        """
         if size is None:
             size = self._array_size
+        self._check_frame()
+        deadline = deadline_after(timeout)
         rows = []
-        while size > 0:
-            row = await self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
-            size -= 1
-        return rows
-
-    async def fetchall(self):
+        try:
+            while size > 0 and (self._fetched or self._pos is not None):
+                chunk = await self._next_rows(size, deadline, transform=False)
+                rows.extend(chunk)
+                size -= len(chunk)
+        except BaseException:
+            self._keep_fetched(rows)
+            raise
+        return self.transform_rows(rows)
+
+    async def fetchall(self, timeout=None):
+        """Fetches all remaining rows.
+
+        If a round trip fails, the rows already taken are returned by the next fetch.
+
+        :param timeout:
+            Seconds allowed for all the round trips needed, ``None`` waits forever.
+        """
+        self._check_frame()
+        deadline = deadline_after(timeout)
         rows = []
-        while True:
-            row = await self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
-        return rows
+        try:
+            while self._fetched or self._pos is not None:
+                chunk = await self._next_rows(None, deadline, transform=False)
+                if rows:
+                    rows.extend(chunk)
+                else:
+                    rows = chunk
+        except BaseException:
+            self._keep_fetched(rows)
+            raise
+        return self.transform_rows(rows)
+
+    def _keep_fetched(self, rows):
+        # Rows of frames already replaced, handed out first by the next fetch unless the result set is gone
+        if rows and self._frame is not None:
+            self._fetched = rows + self._fetched
+
+    async def iter_batches(self, size=None, timeout=None):
+        """Iterates over the remaining rows in lists of up to ``size`` rows.
+
+        A list never spans two frames, so the rows held in memory are bounded by the
+        frame size whatever the size of the result set::
+
+            async for rows in cursor.iter_batches(500):
+                ...
+
+        :param size:
+            Maximum number of rows per list, by default the rest of the current frame.
+
+        :param timeout:
+            Seconds allowed for fetching each frame, ``None`` waits forever.
+        """
+        self._check_frame()
+        while self._fetched or self._pos is not None:
+            yield await self._next_rows(size, deadline_after(timeout))
+
+    def iter_frames(self, timeout=None):
+        """Iterates over the remaining rows one frame at a time, see :meth:`iter_batches`.
+
+        :param timeout:
+            Seconds allowed for fetching each frame, ``None`` waits forever.
+        """
+        return self.iter_batches(None, timeout)
+
+    async def fetch_columns(self, size=None, timeout=None, categorical=()):
+        """Fetches the next rows as NumPy arrays, one per column.
+
+        Integer, floating point, boolean and temporal columns are decoded straight into
+        ``int64``, ``float64``, ``bool``, ``datetime64`` and ``timedelta64`` arrays, the
+        other columns into object arrays. Requires NumPy.
+
+        :param size:
+            Maximum number of rows, by default the rest of the current frame.
+
+        :param timeout:
+            Seconds allowed for all the round trips needed, ``None`` waits forever.
+
+        :param categorical:
+            Names of low cardinality object columns, returned as a
+            :class:`~aiophoenixdb.columnar.CategoricalArray` of integer codes and the
+            distinct values instead of an array of Python objects.
+
+        :returns:
+            A dict of :class:`numpy.ma.MaskedArray` keyed by column name, masked where the
+            value is NULL. The arrays are empty once the result set is exhausted.
+        """
+        self._check_frame()
+        return await self._fetch_columnar(size, False, deadline_after(timeout), categorical)
+
+    async def fetchall_columnar(self, timeout=None, categorical=()):
+        """Fetches all remaining rows as NumPy arrays, see :meth:`fetch_columns`.
+
+        Only one frame is held as Python objects at any time.
+        """
+        self._check_frame()
+        return await self._fetch_columnar(None, True, deadline_after(timeout), categorical)
+
+    async def _fetch_columnar(self, size, fetch_all, deadline, categorical=()):
+        self._get_columnar_casts(False)
+        numpy_types = self._get_numpy_types()
+        categorical = frozenset(categorical)
+        indexes = [i for i, (column, (dtype, _)) in enumerate(zip(self._signature.columns, numpy_types))
+                   if dtype is None and self._get_column_name(column) in categorical]
+        builder = ColumnBuilder(numpy_types, indexes)
+        while self._fetched or self._pos is not None:
+            rows, raw = await self._next_rows(size, deadline, raw=True)
+            builder.add(rows, raw)
+            if not fetch_all:
+                if size is None:
+                    break
+                size -= len(rows)
+                if size <= 0:
+                    break
+        arrays = builder.build()
+        return dict((self._get_column_name(column), array)
+                    for column, array in zip(self._signature.columns, arrays))
+
+    async def fetch_arrow_batches(self, timeout=None):
+        """Fetches the remaining rows as :class:`pyarrow.RecordBatch` objects, one per frame.
+
+        The schema is derived from the column metadata of the result set, numeric, boolean
+        and temporal values are converted from their wire values without building Python
+        objects. Only the frame being converted is held in memory. Requires PyArrow.
+
+        Usage::
+
+            async for batch in cursor.fetch_arrow_batches():
+                writer.write_batch(batch)
+
+        :param timeout:
+            Seconds allowed for fetching each frame, ``None`` waits forever.
+        """
+        self._check_frame()
+        self._get_columnar_casts(False)
+        converter = self._get_arrow_converter()
+        while self._fetched or self._pos is not None:
+            rows, raw = await self._next_rows(None, deadline_after(timeout), raw=True)
+            yield converter.convert(rows, raw)
+
+    async def fetch_arrow_table(self, timeout=None):
+        """Fetches all remaining rows into a :class:`pyarrow.Table`, see :meth:`fetch_arrow_batches`.
+
+        :param timeout:
+            Seconds allowed for fetching each frame, ``None`` waits forever.
+        """
+        self._check_frame()
+        converter = self._get_arrow_converter()
+        batches = [batch async for batch in self.fetch_arrow_batches(timeout)]
+        return converter.to_table(batches)
+
+    async def fetch_dataframe(self, timeout=None):
+        """Fetches all remaining rows into a :class:`pandas.DataFrame`, converted from
+        :meth:`fetch_arrow_table`. Requires PyArrow and pandas.
+
+        :param timeout:
+            Seconds allowed for fetching each frame, ``None`` waits forever.
+        """
+        table = await self.fetch_arrow_table(timeout)
+        return table.to_pandas()
 
     def setinputsizes(self, sizes):
         pass
@@ -403,19 +1250,68 @@ class Cursor(object):
         row indexed by :attr:`rownumber` in that sequence.
         """
         if self._frame is not None and self._pos is not None:
-            return self._frame.offset + self._pos
+            return self._frame.offset + self._pos - len(self._fetched)
         return self._pos
 
     def ref(self, callback=None):
         return CursorRef(self, callback)
 
 
+@functools.lru_cache(maxsize=256)
+def get_row_class(names):
+    """Returns the named tuple class of rows with the given column names.
+
+    Names that are not valid identifiers, or repeated, are replaced by ``_<index>``.
+    """
+    return collections.namedtuple('Row', names, rename=True)
+
+
 class DictCursor(Cursor):
     """A cursor which returns results as a dictionary"""
 
+    def __init__(self, connection, _id=None):
+        super().__init__(connection, _id)
+        self._keys = None
+
+    def _set_signature(self, signature):
+        super()._set_signature(signature)
+        # Computed once per result set rather than for each row
+        self._keys = None if signature is None else [self._get_column_name(c) for c in signature.columns]
+
     def transform_row(self, row):
-        row = super(__class__).transform_row(row)
-        d = {}
-        for ind, val in enumerate(row):
-            d[self._get_column_name(self._signature.columns[ind])] = val
-        return d
+        return dict(zip(self._keys, row))
+
+    def transform_rows(self, rows):
+        keys = self._keys
+        return [dict(zip(keys, row)) for row in rows]
+
+
+class NamedTupleCursor(Cursor):
+    """A cursor which returns results as named tuples, see :func:`get_row_class`"""
+
+    def __init__(self, connection, _id=None):
+        super().__init__(connection, _id)
+        self._row_class = None
+
+    def _set_signature(self, signature):
+        super()._set_signature(signature)
+        self._row_class = None if signature is None else get_row_class(
+            tuple(self._get_column_name(c) for c in signature.columns))
+
+    def transform_row(self, row):
+        return self._row_class._make(row)
+
+    def transform_rows(self, rows):
+        return list(map(self._row_class._make, rows))
+
+
+class LazyCursor(Cursor):
+    """A cursor which returns :class:`~aiophoenixdb.avatica.decoder.LazyRow` objects,
+    converting each cell only when it is first read.
+
+    Suited to wide rows of which a few columns are used. Rows keep the response they
+    were read from alive until all their cells were read, so prefer a plain
+    :class:`Cursor` when rows are stored for long.
+    """
+
+    _ROW_DECODER = LazyRowDecoder
@@ -0,0 +1,307 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import collections
+import logging
+import time
+
+from aiohttp import ClientError
+from aiophoenixdb import errors
+from aiophoenixdb.errors import ProgrammingError
+
+__all__ = ['Pool']
+
+logger = logging.getLogger(__name__)
+
+RESET_PROPERTIES = ('autoCommit', 'readOnly', 'transactionIsolation', 'catalog', 'schema')
+"""Avatica connection properties restored when a connection goes back to the pool."""
+
+
+class Pool(object):
+    """Pool of open connections to a Phoenix query server.
+
+    You should not construct this object manually, use :func:`~aiophoenixdb.create_pool` instead.
+
+    :param connect:
+        Coroutine function without arguments that opens a new
+        :class:`~aiophoenixdb.connection.Connection`.
+
+    :param minsize:
+        Number of connections opened when the pool is created.
+
+    :param maxsize:
+        Maximum number of connections, :meth:`acquire` waits while all of them are in use.
+
+    :param max_idle:
+        Seconds a connection may stay unused in the pool before it is closed.
+        Keep it below the query server's ``avatica.connectioncache.expiryduration``.
+
+    :param max_lifetime:
+        Seconds after which a connection is closed instead of being reused, ``None`` for no limit.
+
+    :param validate_interval:
+        Connections idle for longer than this many seconds are checked with a
+        ``ConnectionSyncRequest`` before being handed out, ``None`` disables the check.
+    """
+
+    def __init__(self, connect, minsize=1, maxsize=10, max_idle=300.0, max_lifetime=3600.0,
+                 validate_interval=30.0):
+        if minsize < 0:
+            raise ValueError('minsize should be zero or greater')
+        if maxsize < minsize or maxsize < 1:
+            raise ValueError('maxsize should be not less than minsize and greater than zero')
+        self._connect = connect
+        self._minsize = minsize
+        self._maxsize = maxsize
+        self._max_idle = max_idle
+        self._max_lifetime = max_lifetime
+        self._validate_interval = validate_interval
+        # (connection, idle since) pairs, most recently released last
+        self._free = collections.deque()
+        self._used = set()
+        self._born = {}
+        self._initial_props = {}
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._closing = False
+        self._closed = False
+
+    @property
+    def minsize(self):
+        return self._minsize
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def size(self):
+        """Number of connections currently opened or being opened by the pool."""
+        return self._size
+
+    @property
+    def freesize(self):
+        """Number of idle connections."""
+        return len(self._free)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    async def fill(self):
+        """Opens connections until the pool holds :attr:`minsize` of them."""
+        while self._size < self._minsize:
+            self._size += 1
+            try:
+                conn = await self._open()
+            except BaseException:
+                self._size -= 1
+                raise
+            self._free.append((conn, time.monotonic()))
+
+    def acquire(self, timeout=None):
+        """Takes a connection from the pool, opening a new one if needed.
+
+        The result can be awaited or used as an async context manager, which gives the
+        connection back with :meth:`release` at the end of the block::
+
+            async with pool.acquire() as conn:
+                ...
+
+        :param timeout:
+            Seconds to wait for a free connection, ``None`` waits forever.
+
+        :returns:
+            An open :class:`~aiophoenixdb.connection.Connection` object.
+        """
+        coro = self._acquire()
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        return _PoolConnectionContextManager(coro, self)
+
+    async def _acquire(self):
+        while True:
+            conn = None
+            async with self._cond:
+                self._check_closing()
+                while not self._free and self._size >= self._maxsize:
+                    await self._cond.wait()
+                    self._check_closing()
+                if self._free:
+                    # LIFO keeps the busy connections warm and lets the others expire
+                    conn, idle_since = self._free.pop()
+                else:
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    conn = await self._open()
+                except BaseException:
+                    await self._forget(None)
+                    raise
+            else:
+                try:
+                    valid = await self._check(conn, idle_since)
+                except BaseException:
+                    # Cancelled or timed out while checking a connection which is in neither set
+                    await self._discard(conn)
+                    raise
+                if not valid:
+                    continue
+            self._used.add(conn)
+            return conn
+
+    async def _open(self):
+        conn = await self._connect()
+        self._born[conn] = time.monotonic()
+        self._initial_props[conn] = dict(conn._avatica_props)
+        return conn
+
+    async def _check(self, conn, idle_since):
+        """Validates an idle connection, closing it if it should not be reused."""
+        now = time.monotonic()
+        if conn.closed or self._expired(conn, now) or now - idle_since > self._max_idle:
+            await self._discard(conn)
+            return False
+        if self._validate_interval is not None and now - idle_since > self._validate_interval:
+            try:
+                await conn.set_session(**conn._avatica_props)
+            except (errors.Error, ClientError):
+                logger.warning('Dropping pooled connection %s which failed validation', conn.connect_id)
+                await self._discard(conn)
+                return False
+        return True
+
+    def _expired(self, conn, now):
+        return self._max_lifetime is not None and now - self._born[conn] > self._max_lifetime
+
+    async def release(self, conn):
+        """Gives a connection back to the pool.
+
+        Cursors left open are closed, and the Avatica connection properties are restored
+        if they were changed while the connection was in use.
+        """
+        if conn not in self._used:
+            raise ProgrammingError('The connection does not belong to this pool.')
+        self._used.remove(conn)
+        if conn.closed or self._closing or self._expired(conn, time.monotonic()):
+            await self._discard(conn)
+            return
+        try:
+            for cursor_ref in list(conn._cursors):
+                cursor = cursor_ref()
+                if cursor is not None and not cursor.closed:
+                    await cursor.close()
+            initial_props = self._initial_props[conn]
+            if any(conn._avatica_props.get(k) != initial_props.get(k) for k in RESET_PROPERTIES):
+                await conn.set_session(**initial_props)
+        except (errors.Error, ClientError):
+            logger.warning('Dropping pooled connection %s which could not be reset', conn.connect_id)
+            await self._discard(conn)
+            return
+        except BaseException:
+            # Cancelled or timed out while resetting a connection which is in neither set
+            await self._discard(conn)
+            raise
+        self._free.append((conn, time.monotonic()))
+        await self._notify()
+
+    async def _notify(self):
+        async def notify():
+            async with self._cond:
+                self._cond.notify()
+        # A cancellation while waiting for the lock must not lose the wakeup
+        await asyncio.shield(notify())
+
+    async def _discard(self, conn):
+        try:
+            if not conn.closed:
+                try:
+                    await conn.close()
+                except (errors.Error, ClientError):
+                    # The query server may already have expired it
+                    logger.debug('Failed to close pooled connection %s', conn.connect_id, exc_info=True)
+        finally:
+            await self._forget(conn)
+
+    async def _forget(self, conn):
+        """Gives back the slot of a connection, or of one that failed to open when ``conn`` is ``None``.
+        A connection is only forgotten once."""
+        if conn is not None:
+            if conn not in self._born:
+                return
+            del self._born[conn]
+            self._initial_props.pop(conn, None)
+        self._size -= 1
+        await self._notify()
+
+    def _check_closing(self):
+        if self._closing:
+            raise ProgrammingError('The pool is already closed.')
+
+    async def clear(self):
+        """Closes all idle connections."""
+        while self._free:
+            conn, _ = self._free.popleft()
+            await self._discard(conn)
+
+    async def close(self):
+        """Closes the idle connections, connections in use are closed when released.
+        No further connections can be acquired once the pool is closed."""
+        if self._closing:
+            return
+        self._closing = True
+        await self.clear()
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def wait_closed(self):
+        """Waits until every connection acquired from the pool has been released."""
+        if not self._closing:
+            raise ProgrammingError('Pool.close() should be called before wait_closed().')
+        async with self._cond:
+            while self._size > 0:
+                await self._cond.wait()
+        self._closed = True
+
+    def __enter__(self):
+        raise TypeError("Use async with instead")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        await self.wait_closed()
+
+
+class _PoolConnectionContextManager(object):
+    """Result of :meth:`Pool.acquire`, awaitable or usable with ``async with``."""
+
+    def __init__(self, coro, pool):
+        self._coro = coro
+        self._pool = pool
+        self._conn = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._coro
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
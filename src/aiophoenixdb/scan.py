@@ -0,0 +1,306 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import datetime
+import logging
+import re
+
+from aiophoenixdb.errors import ProgrammingError
+
+__all__ = ['parallel_scan', 'get_split_points', 'decode_key_column']
+
+logger = logging.getLogger(__name__)
+
+SORT_ORDER_DESC = 1
+"""``SORT_ORDER`` of the descending primary key columns in ``SYSTEM.CATALOG``"""
+
+_INTEGER_WIDTHS = {
+    -6: (1, True),  # TINYINT
+    5: (2, True),  # SMALLINT
+    4: (4, True),  # INTEGER
+    -5: (8, True),  # BIGINT
+    11: (1, False),  # UNSIGNED_TINYINT
+    13: (2, False),  # UNSIGNED_SMALLINT
+    9: (4, False),  # UNSIGNED_INT
+    10: (8, False),  # UNSIGNED_LONG
+}
+"""Byte width and signedness of the row key encoding of the integer types"""
+
+_TEMPORAL_TYPES = {
+    91: True,  # DATE
+    92: True,  # TIME
+    93: True,  # TIMESTAMP
+    19: False,  # UNSIGNED_DATE
+    18: False,  # UNSIGNED_TIME
+    20: False,  # UNSIGNED_TIMESTAMP
+}
+"""Signedness of the milliseconds since the epoch that start the row key encoding of the temporal types"""
+
+_STRING_TYPES = (12, 1)  # VARCHAR, CHAR
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+"""String literals and quoted identifiers, left out when looking for unsupported clauses"""
+
+_UNSUPPORTED_CLAUSES = re.compile(
+    r'\b(LIMIT|OFFSET|FETCH\s+FIRST|ORDER\s+BY|GROUP\s+BY|HAVING|DISTINCT|UNION|'
+    r'(?:COUNT|SUM|MIN|MAX|AVG|STDDEV_POP|STDDEV_SAMP|PERCENTILE_CONT|PERCENTILE_DISC|FIRST_VALUE|LAST_VALUE)\s*\()',
+    re.IGNORECASE)
+"""Clauses whose results change when the query is split into ranges"""
+
+
+def _decode_long(data, signed):
+    value = int.from_bytes(data, 'big')
+    if signed:
+        # The sign bit is flipped so that negative values sort first
+        bits = len(data) * 8
+        value ^= 1 << (bits - 1)
+        if value >> (bits - 1):
+            value -= 1 << bits
+    return value
+
+
+def decode_key_column(key, data_type, descending=False, salted=False, column_size=None):
+    """Decodes the leading primary key column of a row key, e.g. a guidepost of ``SYSTEM.STATS``.
+
+    :param key:
+        The row key bytes.
+
+    :param data_type:
+        JDBC type ID of the column, as found in ``SYSTEM.CATALOG.DATA_TYPE``.
+
+    :param descending:
+        Whether the column is declared ``DESC`` in the primary key, its bytes are then inverted.
+
+    :param salted:
+        Whether the row key starts with a salt byte.
+
+    :param column_size:
+        Length of a ``CHAR`` column.
+
+    :returns:
+        The Python value, or ``None`` if the key is too short to hold one.
+
+    :raises:
+        NotImplementedError
+    """
+    if salted:
+        key = key[1:]
+    if data_type in _INTEGER_WIDTHS:
+        width, signed = _INTEGER_WIDTHS[data_type]
+        data = key[:width]
+    elif data_type in _TEMPORAL_TYPES:
+        width, signed = 8, _TEMPORAL_TYPES[data_type]
+        data = key[:width]
+    elif data_type in _STRING_TYPES:
+        separator = b'\xff' if descending else b'\x00'
+        if data_type == 1 and column_size:
+            data = key[:column_size]
+        else:
+            data = key.split(separator, 1)[0]
+        if descending:
+            data = bytes(b ^ 0xff for b in data)
+        return data.decode('utf-8', 'replace')
+    else:
+        raise NotImplementedError('Cannot split on JDBC TYPE CODE {}'.format(data_type))
+
+    if len(data) < width:
+        return None
+    if descending:
+        data = bytes(b ^ 0xff for b in data)
+    value = _decode_long(data, signed)
+    if data_type in _TEMPORAL_TYPES:
+        return _EPOCH + datetime.timedelta(milliseconds=value)
+    return value
+
+
+def _quantiles(values, count):
+    values = sorted(set(v for v in values if v is not None))
+    points = []
+    for i in range(1, count):
+        if not values:
+            break
+        point = values[len(values) * i // count]
+        if not points or point > points[-1]:
+            points.append(point)
+    return points
+
+
+async def _query(connection, sql, parameters):
+    cursor = connection.cursor()
+    try:
+        await cursor.execute(sql, parameters=parameters)
+        return await cursor.fetchall()
+    finally:
+        await cursor.close()
+
+
+async def get_split_points(connection, table, column, count):
+    """Computes the values splitting a table into ``count`` ranges of its leading primary key column.
+
+    The guideposts collected by ``UPDATE STATISTICS`` in ``SYSTEM.STATS`` are used, so the ranges
+    hold about the same number of rows and match the regions of the table. The column type,
+    sort order and salting come from ``SYSTEM.CATALOG``.
+
+    :param connection:
+        An open :class:`~aiophoenixdb.connection.Connection`.
+
+    :param table:
+        Name of the table, ``SCHEMA.TABLE`` or ``TABLE``, as stored in the catalog.
+
+    :param column:
+        Name of the leading primary key column.
+
+    :param count:
+        Number of ranges.
+
+    :returns:
+        Up to ``count - 1`` increasing values, fewer when the table has too few guideposts.
+
+    :raises:
+        ProgrammingError if the column is not the leading primary key column.
+    """
+    schema, _, name = table.rpartition('.')
+    if schema:
+        condition, parameters = 'TABLE_SCHEM = ?', (schema, name)
+    else:
+        condition, parameters = 'TABLE_SCHEM IS NULL', (name, )
+    rows = await _query(
+        connection,
+        'SELECT COLUMN_NAME, KEY_SEQ, DATA_TYPE, SORT_ORDER, COLUMN_SIZE, SALT_BUCKETS FROM SYSTEM.CATALOG'
+        ' WHERE TENANT_ID IS NULL AND {} AND TABLE_NAME = ? AND COLUMN_FAMILY IS NULL'.format(condition),
+        parameters)
+    salted = any(r[0] is None and r[5] for r in rows)
+    keys = sorted((r for r in rows if r[0] is not None and r[1] is not None and r[0] != '_SALT'),
+                  key=lambda r: r[1])
+    if not keys:
+        raise ProgrammingError('Table {} was not found in SYSTEM.CATALOG.'.format(table))
+    column_name, _, data_type, sort_order, column_size, _ = keys[0]
+    if column_name != column:
+        raise ProgrammingError('{} is not the leading primary key column of {}, which is {}.'
+                               .format(column, table, column_name))
+
+    # Tables mapped to a namespace are stored as SCHEMA:TABLE
+    physical_names = (table, '{}:{}'.format(schema, name) if schema else table)
+    guideposts = await _query(connection, 'SELECT GUIDE_POST_KEY FROM SYSTEM.STATS WHERE PHYSICAL_NAME IN (?, ?)',
+                              physical_names)
+    values = [decode_key_column(r[0], data_type, sort_order == SORT_ORDER_DESC, salted, column_size)
+              for r in guideposts if r[0]]
+    if not values:
+        logger.warning('No guideposts found for %s, run UPDATE STATISTICS to split its scans', table)
+    return _quantiles(values, count)
+
+
+def _check_splittable(sql, split_by, ordered):
+    """Rejects the queries returning other rows once run separately on each range.
+
+    A trailing ``ORDER BY split_by`` is kept with ``ordered``, the ranges being read in order.
+    """
+    sql = _LITERALS.sub("''", sql)
+    if ordered:
+        sql = re.sub(r'\bORDER\s+BY\s+"?{}"?(\s+ASC)?\s*$'.format(re.escape(split_by)), '', sql,
+                     flags=re.IGNORECASE)
+    match = _UNSUPPORTED_CLAUSES.search(sql)
+    if match is not None:
+        raise ProgrammingError('Cannot split a query using {}, its results depend on all the rows.'
+                               .format(' '.join(match.group(1).rstrip('(').split()).upper()))
+
+
+def _range_queries(sql, column, parameters, points):
+    """Wraps a query into one query per range of ``column`` delimited by ``points``.
+
+    Phoenix flattens the derived table, so the range becomes the scan range of the table.
+    """
+    parameters = tuple(parameters or ())
+    if not points:
+        return [(sql, parameters)]
+    template = 'SELECT * FROM ({}) WHERE '.format(sql)
+    column = '"{}"'.format(column.replace('"', '""'))
+    queries = [(template + '{} < ?'.format(column), parameters + (points[0], ))]
+    for low, high in zip(points, points[1:]):
+        queries.append((template + '{0} >= ? AND {0} < ?'.format(column), parameters + (low, high)))
+    queries.append((template + '{} >= ?'.format(column), parameters + (points[-1], )))
+    return queries
+
+
+_DONE = object()
+
+
+async def _scan_range(connection, pool, sql, parameters, queue, semaphore, timeout):
+    async with semaphore:
+        try:
+            if pool is not None:
+                async with pool.acquire() as conn:
+                    await _fetch_range(conn, sql, parameters, queue, timeout)
+            else:
+                await _fetch_range(connection, sql, parameters, queue, timeout)
+        except Exception as e:
+            # Raised by the consumer
+            await queue.put(e)
+            return
+    await queue.put(_DONE)
+
+
+async def _fetch_range(connection, sql, parameters, queue, timeout):
+    async with connection.cursor() as cursor:
+        await cursor.execute(sql, parameters=parameters, timeout=timeout)
+        async for rows in cursor.iter_frames(timeout):
+            await queue.put(rows)
+
+
+async def parallel_scan(connection, sql, split_by, parallelism=4, parameters=None, table=None, splits=None,
+                        ordered=False, pool=None, buffer_frames=2, timeout=None):
+    """Runs a query as several range queries fetched concurrently, see
+    :meth:`Connection.parallel_scan() <aiophoenixdb.connection.Connection.parallel_scan>`."""
+    if parallelism < 1:
+        raise ProgrammingError('parallelism should be at least 1')
+    if pool is None and parallelism > 1:
+        logger.warning('parallel_scan without a pool scans its ranges one after the other, '
+                       'parallelism %s only sets the number of ranges', parallelism)
+    _check_splittable(sql, split_by, ordered)
+    if splits is None:
+        if table is None:
+            raise ProgrammingError('Either splits or table is required to split the scan.')
+        splits = await get_split_points(connection, table, split_by, parallelism)
+    queries = _range_queries(sql, split_by, parameters, list(splits))
+
+    # A connection runs one request at a time, the ranges only run concurrently on the pool
+    semaphore = asyncio.Semaphore(parallelism if pool is not None else 1)
+    if ordered:
+        # The ranges are disjoint and increasing, reading them one after the other keeps the order
+        queues = [asyncio.Queue(buffer_frames) for _ in queries]
+    else:
+        queues = [asyncio.Queue(buffer_frames * parallelism)] * len(queries)
+    tasks = [asyncio.ensure_future(_scan_range(connection, pool, q, p, queue, semaphore, timeout))
+             for (q, p), queue in zip(queries, queues)]
+    try:
+        remaining = len(tasks)
+        index = 0
+        while remaining:
+            item = await queues[index].get()
+            if item is _DONE:
+                remaining -= 1
+                if ordered:
+                    index += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                for row in item:
+                    yield row
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
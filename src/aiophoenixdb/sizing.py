@@ -0,0 +1,100 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__all__ = ['AdaptiveFrameSize']
+
+
+class AdaptiveFrameSize(object):
+    """Adjusts the number of rows requested per frame to the rows of the current query.
+
+    The first frame is kept small so that the first rows come back quickly. Its size in
+    bytes then gives the width of a row, from which the next frames are sized to reach
+    ``target_bytes``. The duration of each fetch is measured too, and the frame size
+    shrinks when a round trip takes longer than ``target_latency`` and grows back,
+    up to the size given by ``target_bytes``, when it takes less. Latency driven
+    changes are limited to a factor 2 per frame, as a single slow fetch is not
+    representative.
+
+    Assign an instance to :attr:`Cursor.frame_sizing <aiophoenixdb.cursors.Cursor.frame_sizing>`,
+    it is reset at each execution and should not be shared between cursors.
+
+    :param target_bytes:
+        Encoded size aimed for each frame.
+
+    :param target_latency:
+        Seconds aimed for each fetch round trip.
+
+    :param first_frame_size:
+        Maximum number of rows of the first frame, returned along with the execution.
+
+    :param initial_size:
+        Number of rows requested by a fetch before any frame was measured.
+
+    :param min_size:
+        Lower bound of the frame size.
+
+    :param max_size:
+        Upper bound of the frame size.
+    """
+
+    def __init__(self, target_bytes=4 * 1024 * 1024, target_latency=0.5, first_frame_size=100,
+                 initial_size=2000, min_size=100, max_size=100000):
+        if min_size < 1 or max_size < min_size:
+            raise ValueError('max_size should be not less than min_size and greater than zero')
+        if first_frame_size < 1:
+            raise ValueError('first_frame_size should be at least 1')
+        self.target_bytes = target_bytes
+        self.target_latency = target_latency
+        self.first_frame_size = first_frame_size
+        self.initial_size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self._size = self._clamp(initial_size)
+
+    @property
+    def frame_size(self):
+        """Maximum number of rows requested by the next fetch."""
+        return self._size
+
+    def reset(self):
+        self._size = self._clamp(self.initial_size)
+
+    def _clamp(self, size):
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    def record(self, rows, nbytes, elapsed=None):
+        """Takes a frame into account for the next fetches.
+
+        :param rows:
+            Number of rows of the frame.
+
+        :param nbytes:
+            Encoded size of the frame.
+
+        :param elapsed:
+            Seconds the fetch took, ``None`` for the first frame whose round trip
+            also ran the query.
+        """
+        if rows <= 0:
+            return
+        size = None
+        if nbytes > 0:
+            # Row widths are measured exactly, follow them straight away
+            size = self.target_bytes * rows / nbytes
+        if elapsed is not None and elapsed > 0:
+            by_latency = self.target_latency * rows / elapsed
+            by_latency = max(self._size / 2, min(self._size * 2, by_latency))
+            size = by_latency if size is None else min(size, by_latency)
+        if size is not None:
+            self._size = self._clamp(size)
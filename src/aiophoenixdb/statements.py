@@ -0,0 +1,200 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+__all__ = ['PreparedStatement', 'StatementCache', 'StatementPool']
+
+
+class PreparedStatement(object):
+    """A statement prepared on the query server, along with the SQL it was prepared from.
+
+    :param sql:
+        SQL text of the statement.
+
+    :param handle:
+        Protobuf StatementHandle object returned by the ``PrepareRequest``.
+    """
+
+    __slots__ = ('sql', 'handle', '_signature_bytes')
+
+    def __init__(self, sql, handle):
+        self.sql = sql
+        self.handle = handle
+        self._signature_bytes = None
+
+    @property
+    def id(self):
+        return self.handle.id
+
+    @property
+    def signature(self):
+        return self.handle.signature
+
+    @property
+    def signature_bytes(self):
+        """The serialized signature, sent back with every execution of the statement."""
+        if self._signature_bytes is None:
+            self._signature_bytes = bytes(self.handle.signature)
+        return self._signature_bytes
+
+
+class StatementCache(object):
+    """LRU cache of the statements prepared on a connection, keyed by SQL text.
+
+    A statement holds a single result set on the query server, so a cursor checks a
+    statement out with :meth:`acquire` and owns it until it gives it back with
+    :meth:`release`. Several cursors executing the same SQL at once get distinct
+    statements. Only the statements given back are cached, the least recently
+    released ones being closed once there are more than ``max_size``.
+
+    :param connection:
+        The :class:`~aiophoenixdb.connection.Connection` the statements are prepared on.
+
+    :param max_size:
+        Maximum number of idle statements kept open, 0 disables caching.
+    """
+
+    def __init__(self, connection, max_size=32):
+        if max_size < 0:
+            raise ValueError('max_size should not be negative')
+        self._connection = connection
+        self.max_size = max_size
+        # Idle statements of each SQL text, the least recently released SQL first
+        self._idle = collections.OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self._size
+
+    async def acquire(self, sql, timeout=None):
+        """Checks out a prepared statement for ``sql``, preparing it if no idle one is cached.
+
+        :param timeout:
+            Seconds allowed for the ``PrepareRequest``, ``None`` waits forever.
+
+        :returns:
+            A :class:`PreparedStatement`.
+        """
+        statements = self._idle.get(sql)
+        if statements:
+            statement = statements.pop()
+            if not statements:
+                del self._idle[sql]
+            self._size -= 1
+            self.hits += 1
+            return statement
+        self.misses += 1
+        connection = self._connection
+        handle = await connection.client.prepare(connection.connect_id, sql, timeout=timeout)
+        return PreparedStatement(sql, handle)
+
+    def release(self, statement):
+        """Gives back a statement checked out with :meth:`acquire`, for the next cursor
+        executing the same SQL. The least recently released statements are closed in the
+        background once the cache is full."""
+        statements = self._idle.get(statement.sql)
+        if statements is None:
+            statements = self._idle[statement.sql] = []
+        else:
+            self._idle.move_to_end(statement.sql)
+        statements.append(statement)
+        self._size += 1
+        while self._size > self.max_size:
+            sql, statements = next(iter(self._idle.items()))
+            self._close(statements.pop(0))
+            if not statements:
+                del self._idle[sql]
+            self._size -= 1
+
+    def discard(self, sql=None):
+        """Forgets the idle statements of ``sql``, or all of them, without closing them,
+        e.g. after the query server lost them."""
+        if sql is None:
+            self._idle.clear()
+            self._size = 0
+        else:
+            self._size -= len(self._idle.pop(sql, ()))
+
+    def clear(self):
+        """Closes all the idle statements in the background."""
+        for statements in self._idle.values():
+            for statement in statements:
+                self._close(statement)
+        self.discard()
+
+    def _close(self, statement):
+        self._connection._close_statement_later(statement.id)
+
+
+class StatementPool(object):
+    """Pool of the plain statements of a connection, on which the cursors execute SQL
+    without parameters with a ``PrepareAndExecuteRequest``.
+
+    A cursor checks a statement ID out with :meth:`acquire` instead of creating a statement,
+    and gives it back with :meth:`release` when it is closed instead of closing it, so that a
+    short-lived cursor costs no statement bookkeeping round trip once the pool is warm. The
+    statements given back beyond ``max_size`` are closed in the background.
+
+    :param connection:
+        The :class:`~aiophoenixdb.connection.Connection` the statements are created on.
+
+    :param max_size:
+        Maximum number of idle statements kept open, 0 disables pooling.
+    """
+
+    def __init__(self, connection, max_size=16):
+        if max_size < 0:
+            raise ValueError('max_size should not be negative')
+        self._connection = connection
+        self.max_size = max_size
+        self._idle = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._idle)
+
+    async def acquire(self, timeout=None):
+        """Checks out the ID of a statement, creating one if none is idle.
+
+        :param timeout:
+            Seconds allowed for the ``CreateStatementRequest``, ``None`` waits forever.
+        """
+        if self._idle:
+            self.hits += 1
+            return self._idle.pop()
+        self.misses += 1
+        connection = self._connection
+        return await connection.client.create_statement(connection.connect_id, timeout=timeout)
+
+    def release(self, statement_id):
+        """Gives back a statement ID checked out with :meth:`acquire`, once no result set is
+        open on it. It is closed in the background when the pool is full."""
+        if len(self._idle) < self.max_size:
+            self._idle.append(statement_id)
+        else:
+            self._connection._close_statement_later(statement_id)
+
+    def discard(self):
+        """Forgets the idle statements without closing them, e.g. after the query server lost them."""
+        del self._idle[:]
+
+    def clear(self):
+        """Closes all the idle statements in the background."""
+        for statement_id in self._idle:
+            self._connection._close_statement_later(statement_id)
+        self.discard()
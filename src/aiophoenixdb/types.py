@@ -13,17 +13,19 @@
 # limitations under the License.
 
 import datetime
+import functools
 import sys
 import time
 from decimal import Decimal
 from typing import Dict
 from aiophoenixdb.avatica.proto import common_pb
+from aiophoenixdb.errors import ProgrammingError
 
 
 __all__ = [
     'to_date', 'to_time', 'to_timestamp', 'to_date_from_ticks', 'to_time_from_ticks', 'to_timestamp_from_ticks',
     'to_binary', 'STRING', 'BINARY', 'NUMBER', 'DATETIME', 'ROWID', 'BOOLEAN',
-    'TypeHelper',
+    'TypeHelper', 'Converters', 'timestamp_converter',
 ]
 
 
@@ -62,35 +64,74 @@ def to_binary(value):
     return bytes(value)
 
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+MS_PER_DAY = 24 * 3600 * 1000
+
+
 def time_from_java_sql_time(n):
-    dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=n)
-    return dt.time()
+    seconds, ms = divmod(n % MS_PER_DAY, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return datetime.time(hours, minutes, seconds, ms * 1000)
 
 
 def time_to_java_sql_time(t):
     return ((t.hour * 60 + t.minute) * 60 + t.second) * 1000 + t.microsecond // 1000
 
 
+@functools.lru_cache(maxsize=65536)
 def date_from_java_sql_date(n):
-    return datetime.date(1970, 1, 1) + datetime.timedelta(days=n)
+    # A result set holds few distinct days, each date is built once
+    return datetime.date.fromordinal(_EPOCH_ORDINAL + n)
 
 
 def date_to_java_sql_date(d):
     if isinstance(d, datetime.datetime):
         d = d.date()
-    td = d - datetime.date(1970, 1, 1)
-    return td.days
+    return d.toordinal() - _EPOCH_ORDINAL
 
 
 def datetime_from_java_sql_timestamp(n):
-    return datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=n)
+    # timedelta(days, seconds, microseconds, milliseconds), faster than splitting n with divmod
+    return _EPOCH + datetime.timedelta(0, 0, 0, n)
+
+
+def datetime_from_java_sql_timestamp_utc(n):
+    """Same as :func:`datetime_from_java_sql_timestamp`, returning an aware datetime in UTC."""
+    return _EPOCH_UTC + datetime.timedelta(0, 0, 0, n)
 
 
 def datetime_to_java_sql_timestamp(d):
-    td = d - datetime.datetime(1970, 1, 1)
+    if d.tzinfo is not None:
+        td = d - _EPOCH_UTC
+    else:
+        td = d - _EPOCH
     return td.microseconds // 1000 + (td.seconds + td.days * 24 * 3600) * 1000
 
 
+@functools.lru_cache(maxsize=None)
+def timestamp_converter(tz=None):
+    """Returns the function converting TIMESTAMP wire values into datetimes of the given timezone.
+
+    The wire value is read as milliseconds since the epoch in UTC. With ``tz=None`` the
+    datetimes are naive, as returned by :func:`datetime_from_java_sql_timestamp`.
+    The same function is returned for equal timezones, so that row decoders can be shared.
+    """
+    if tz is None:
+        return datetime_from_java_sql_timestamp
+    if tz == datetime.timezone.utc:
+        return datetime_from_java_sql_timestamp_utc
+
+    def datetime_from_java_sql_timestamp_tz(n):
+        return (_EPOCH_UTC + datetime.timedelta(0, 0, 0, n)).astimezone(tz)
+    return datetime_from_java_sql_timestamp_tz
+
+
 # FIXME This doesn't seem to be used anywhere in the code
 class ColumnType(object):
 
@@ -180,6 +221,28 @@ This mapping should be structured as:
     }
 """
 
+NUMPY_DTYPES = {
+    common_pb.Rep.BOOLEAN: 'bool',
+    common_pb.Rep.PRIMITIVE_BOOLEAN: 'bool',
+    common_pb.Rep.INTEGER: 'int64',
+    common_pb.Rep.PRIMITIVE_INT: 'int64',
+    common_pb.Rep.SHORT: 'int64',
+    common_pb.Rep.PRIMITIVE_SHORT: 'int64',
+    common_pb.Rep.LONG: 'int64',
+    common_pb.Rep.PRIMITIVE_LONG: 'int64',
+    common_pb.Rep.BYTE: 'int64',
+    common_pb.Rep.DOUBLE: 'float64',
+    common_pb.Rep.PRIMITIVE_DOUBLE: 'float64',
+    # Milliseconds since the epoch, days since the epoch and milliseconds since midnight
+    common_pb.Rep.JAVA_SQL_TIMESTAMP: 'datetime64[ms]',
+    common_pb.Rep.JAVA_SQL_DATE: 'datetime64[D]',
+    common_pb.Rep.JAVA_SQL_TIME: 'timedelta64[ms]',
+}
+"""NumPy dtypes of the reps whose TypedData value can be stored without conversion, keyed by Rep
+
+The values of the other reps (strings, decimals, binaries) go into object arrays.
+"""
+
 JDBC_TO_REP: Dict[int, common_pb.Rep] = dict([
     # These are the standard types that are used in Phoenix
     (-6, common_pb.Rep.BYTE),  # TINYINT
@@ -295,6 +358,21 @@ class TypeHelper(object):
         else:
             return TypeHelper._from_jdbc(column.type.id)
 
+    @staticmethod
+    def numpy_dtype(column):
+        """Retrieves the NumPy dtype of a column's values in columnar results
+
+        :param column:
+            Protobuf ColumnMetaData object
+
+        :returns:
+            A dtype name from ``NUMPY_DTYPES``, or ``None`` if the values are stored in an object array.
+        """
+        if column.type.id == 2003:
+            return None
+        field_name, rep, mutate_to, cast_from = TypeHelper.from_column(column)
+        return NUMPY_DTYPES.get(rep)
+
     @staticmethod
     def _from_jdbc(jdbc_code):
         if jdbc_code not in JDBC_MAP:
@@ -302,3 +380,105 @@ class TypeHelper(object):
             raise NotImplementedError('JDBC TYPE CODE {} is not supported'.format(jdbc_code))
 
         return JDBC_MAP[jdbc_code]
+
+
+class Converters(object):
+    """Overrides of the functions converting the wire values of result columns into Python values.
+
+    Keys are JDBC type IDs (``int``), e.g. ``93`` for TIMESTAMP, or :class:`common_pb.Rep
+    <aiophoenixdb.avatica.proto.common_pb.Rep>` values, e.g. ``Rep.JAVA_SQL_TIMESTAMP``, the
+    JDBC type ID taking precedence. Values are functions taking a wire value, or ``None`` to
+    return the wire value itself. The elements of ARRAY columns are converted according to
+    the type of the elements.
+
+    Wire values are ``int`` milliseconds since the epoch for TIMESTAMP, days since the epoch
+    for DATE, milliseconds since midnight for TIME, ``str`` for DECIMAL and ``bytes`` for
+    binaries.
+
+    Assign an instance to :attr:`Connection.converters <aiophoenixdb.connection.Connection.converters>`
+    or :attr:`Cursor.converters <aiophoenixdb.cursors.Cursor.converters>`, it takes effect from
+    the next execution.
+
+    :param converters:
+        A mapping or another :class:`Converters` whose entries are copied.
+    """
+
+    def __init__(self, converters=None):
+        self._by_jdbc = {}
+        self._by_rep = {}
+        if converters is not None:
+            self.update(converters)
+
+    @classmethod
+    def raw(cls):
+        """Returns converters leaving the values of every type as they come on the wire,
+        for pass-through services that serialize them again."""
+        return cls(dict((rep, None) for rep in REP_MAP))
+
+    def __setitem__(self, key, cast_from):
+        if isinstance(key, common_pb.Rep):
+            self._by_rep[key] = cast_from
+        else:
+            self._by_jdbc[key & 0xffffffff] = cast_from
+
+    def __delitem__(self, key):
+        if isinstance(key, common_pb.Rep):
+            del self._by_rep[key]
+        else:
+            del self._by_jdbc[key & 0xffffffff]
+
+    def __len__(self):
+        return len(self._by_jdbc) + len(self._by_rep)
+
+    def items(self):
+        return list(self._by_jdbc.items()) + list(self._by_rep.items())
+
+    def update(self, converters):
+        for key, cast_from in converters.items():
+            self[key] = cast_from
+
+    def copy(self):
+        return self.__class__(self)
+
+    def apply(self, column, column_type):
+        """Returns the ``(field_name, rep, mutate_to, cast_from)`` tuple of a column, with
+        ``cast_from`` replaced if the column's type is overridden.
+
+        :param column:
+            Protobuf ColumnMetaData object
+
+        :param column_type:
+            The tuple returned by :meth:`TypeHelper.from_column`.
+        """
+        jdbc_code = column.type.component.id if column.type.id == 2003 else column.type.id
+        field_name, rep, mutate_to, cast_from = column_type
+        if jdbc_code in self._by_jdbc:
+            cast_from = self._by_jdbc[jdbc_code]
+        elif rep in self._by_rep:
+            cast_from = self._by_rep[rep]
+        else:
+            return column_type
+        return field_name, rep, mutate_to, cast_from
+
+
+PROFILES = {
+    'raw': Converters.raw,
+}
+"""Built-in converter profiles, accepted by name wherever :class:`Converters` are"""
+
+
+def get_converters(converters):
+    """Normalizes a converters setting: ``None``, a profile name of :data:`PROFILES`,
+    a mapping or a :class:`Converters`, returned as a :class:`Converters` or ``None``.
+
+    :raises:
+        ProgrammingError if the profile is unknown.
+    """
+    if converters is None or isinstance(converters, Converters):
+        return converters
+    if isinstance(converters, str):
+        if converters not in PROFILES:
+            raise ProgrammingError('Unknown converter profile {!r}, expected one of {}.'
+                                   .format(converters, ', '.join(PROFILES)))
+        return PROFILES[converters]()
+    return Converters(converters)
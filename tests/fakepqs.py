@@ -0,0 +1,153 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process fake of the Phoenix Query Server, answering the Avatica requests of a cursor
+with the rows of a single table."""
+
+import contextlib
+import re
+
+from aiohttp import web
+
+from aiophoenixdb.avatica.proto import common_pb, requests_pb, responses_pb
+
+_REQUEST_PREFIX = 'org.apache.calcite.avatica.proto.Requests$'
+_RESPONSE_PREFIX = 'org.apache.calcite.avatica.proto.Responses$'
+
+COLUMNS = [
+    ('ID', -5, 'BIGINT', common_pb.Rep.LONG),
+    ('NAME', 12, 'VARCHAR', common_pb.Rep.STRING),
+    ('PRICE', 3, 'DECIMAL', common_pb.Rep.BIG_DECIMAL),
+    ('TS', 93, 'TIMESTAMP', common_pb.Rep.JAVA_SQL_TIMESTAMP),
+]
+
+TS_BASE = 1700000000000
+
+
+def row_values(i):
+    """Returns the wire values of the i-th row of the table."""
+    return i, 'name-{}'.format(i), '{}.{:02d}'.format(i, i % 100), TS_BASE + i * 1000
+
+
+def _typed_value(rep, value):
+    if rep in (common_pb.Rep.LONG, common_pb.Rep.JAVA_SQL_TIMESTAMP):
+        return common_pb.TypedValue(type=rep, number_value=value)
+    return common_pb.TypedValue(type=rep, string_value=value)
+
+
+def _signature(sql):
+    signature = common_pb.Signature(sql=sql)
+    for ordinal, (name, type_id, type_name, rep) in enumerate(COLUMNS):
+        column_type = common_pb.AvaticaType(id=type_id & 0xffffffff, name=type_name, rep=rep)
+        signature.columns.append(common_pb.ColumnMetaData(
+            ordinal=ordinal, column_name=name, label=name, nullable=1, precision=10,
+            scale=2 if type_id == 3 else 0, type=column_type))
+    return signature
+
+
+class FakeQueryServer(object):
+    """Serves ``SELECT`` statements over ``rows`` rows, or ``LIMIT n`` rows when the SQL has one.
+
+    ``fail_next`` requests are answered with HTTP 503, which the client retries up to its
+    maximum number of attempts.
+    """
+
+    def __init__(self, rows=100):
+        self.rows = rows
+        self.fail_next = 0
+        self.requests = []
+        self.url = None
+        self._statements = {}
+        self._next_id = 1
+
+    def _frame(self, statement, offset, size):
+        total = statement['total']
+        end = total if size is None or size <= 0 else min(total, offset + size)
+        frame = common_pb.Frame(offset=offset, done=end >= total)
+        for i in range(offset, end):
+            frame.rows.append(common_pb.Row(value=[
+                common_pb.ColumnValue(scalar_value=_typed_value(rep, value))
+                for (_, _, _, rep), value in zip(COLUMNS, row_values(i))]))
+        return frame
+
+    async def handle(self, request):
+        message = common_pb.WireMessage().parse(await request.read())
+        name = message.name[len(_REQUEST_PREFIX):]
+        self.requests.append(name)
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=503)
+        response = getattr(self, 'on_' + name)(getattr(requests_pb, name)().parse(message.wrapped_message))
+        body = common_pb.WireMessage(name=_RESPONSE_PREFIX + type(response).__name__,
+                                     wrapped_message=bytes(response))
+        return web.Response(body=bytes(body), content_type='application/x-google-protobuf')
+
+    def on_OpenConnectionRequest(self, request):
+        return responses_pb.OpenConnectionResponse()
+
+    def on_CloseConnectionRequest(self, request):
+        return responses_pb.CloseConnectionResponse()
+
+    def on_ConnectionSyncRequest(self, request):
+        return responses_pb.ConnectionSyncResponse(conn_props=request.conn_props)
+
+    def on_CreateStatementRequest(self, request):
+        statement_id = self._next_id
+        self._next_id += 1
+        self._statements[statement_id] = {'total': 0}
+        return responses_pb.CreateStatementResponse(connection_id=request.connection_id, statement_id=statement_id)
+
+    def on_CloseStatementRequest(self, request):
+        self._statements.pop(request.statement_id, None)
+        return responses_pb.CloseStatementResponse()
+
+    def on_PrepareAndExecuteRequest(self, request):
+        statement = self._statements.get(request.statement_id)
+        if statement is None:
+            return responses_pb.ExecuteResponse(missing_statement=True)
+        limit = re.search(r'LIMIT (\d+)', request.sql)
+        statement['total'] = int(limit.group(1)) if limit else self.rows
+        result = responses_pb.ResultSetResponse(
+            connection_id=request.connection_id, statement_id=request.statement_id, own_statement=True,
+            signature=_signature(request.sql), update_count=2 ** 64 - 1,
+            first_frame=self._frame(statement, 0, request.first_frame_max_size))
+        return responses_pb.ExecuteResponse(results=[result])
+
+    def on_FetchRequest(self, request):
+        statement = self._statements.get(request.statement_id)
+        if statement is None:
+            return responses_pb.FetchResponse(missing_statement=True)
+        return responses_pb.FetchResponse(frame=self._frame(statement, request.offset, request.frame_max_size))
+
+    def on_CommitRequest(self, request):
+        return responses_pb.CommitResponse()
+
+    def on_RollbackRequest(self, request):
+        return responses_pb.RollbackResponse()
+
+
+@contextlib.asynccontextmanager
+async def serve(server):
+    """Serves ``server`` on a local port for the duration of the block."""
+    app = web.Application()
+    app.router.add_post('/', server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    server.url = 'http://127.0.0.1:{}/'.format(site._server.sockets[0].getsockname()[1])
+    try:
+        yield server
+    finally:
+        await runner.cleanup()
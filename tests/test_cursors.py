@@ -0,0 +1,81 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import decimal
+
+import pytest
+
+import aiophoenixdb
+from aiophoenixdb.avatica.retry import get_circuit_breaker
+from aiophoenixdb.errors import MasRetriesError
+from fakepqs import FakeQueryServer, row_values, serve
+
+
+def run(test):
+    """Runs ``test(cursor, server)`` against a fake query server."""
+    async def main():
+        async with serve(FakeQueryServer()) as server:
+            connection = await aiophoenixdb.connect(server.url)
+            try:
+                async with connection.cursor() as cursor:
+                    await test(cursor, server)
+            finally:
+                await connection.close()
+                await aiophoenixdb.close_default_session()
+    asyncio.run(main())
+
+
+def test_raw_converters_fetch_arrow_table():
+    pytest.importorskip('pyarrow')
+
+    async def test(cursor, server):
+        cursor.converters = 'raw'
+        cursor._iter_size = 7
+        await cursor.execute('SELECT * FROM T LIMIT 20')
+        table = await cursor.fetch_arrow_table()
+        assert table.num_rows == 20
+        assert table.column('PRICE').to_pylist() == [decimal.Decimal(row_values(i)[2]) for i in range(20)]
+        assert table.column('ID').to_pylist() == list(range(20))
+
+    run(test)
+
+
+def test_custom_converter_rejected_by_arrow():
+    pytest.importorskip('pyarrow')
+
+    async def test(cursor, server):
+        cursor.converters = {3: str}
+        await cursor.execute('SELECT * FROM T LIMIT 5')
+        with pytest.raises(aiophoenixdb.ProgrammingError):
+            await cursor.fetch_arrow_table()
+
+    run(test)
+
+
+def test_fetchall_after_failed_frame():
+    async def test(cursor, server):
+        cursor._iter_size = 7
+        cursor.prefetch = 0
+        await cursor.execute('SELECT * FROM T LIMIT 20')
+        rows = await cursor.fetchmany(3)
+        server.fail_next = 3
+        with pytest.raises(MasRetriesError):
+            await cursor.fetchall()
+        get_circuit_breaker(server.url).record_success()
+        rows += await cursor.fetchall()
+        assert [row[0] for row in rows] == list(range(20))
+        assert await cursor.fetchall() == []
+
+    run(test)
@@ -0,0 +1,25 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from aiophoenixdb.scan import _range_queries
+
+
+def test_range_queries_quote_column():
+    queries = _range_queries('SELECT * FROM T', 'Id"x', (1, ), [10, 20])
+    assert queries == [
+        ('SELECT * FROM (SELECT * FROM T) WHERE "Id""x" < ?', (1, 10)),
+        ('SELECT * FROM (SELECT * FROM T) WHERE "Id""x" >= ? AND "Id""x" < ?', (1, 10, 20)),
+        ('SELECT * FROM (SELECT * FROM T) WHERE "Id""x" >= ?', (1, 20)),
+    ]
@@ -0,0 +1,36 @@
+# Copyright 2024 Nick Hao
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from aiophoenixdb.sizing import AdaptiveFrameSize
+
+
+def test_size_recovers_after_slow_frame():
+    sizing = AdaptiveFrameSize(target_latency=1.0, initial_size=1000)
+    sizing.record(1000, 0, 4.0)
+    assert sizing.frame_size == 500
+    sizing.record(500, 0, 0.25)
+    assert sizing.frame_size == 1000
+    sizing.record(1000, 0, 0.25)
+    assert sizing.frame_size == 2000
+
+
+def test_latency_growth_capped_by_target_bytes():
+    sizing = AdaptiveFrameSize(target_bytes=1000 * 100, target_latency=1.0, initial_size=1000)
+    sizing.record(1000, 1000 * 100, 4.0)
+    assert sizing.frame_size == 500
+    sizing.record(500, 500 * 100, 0.1)
+    assert sizing.frame_size == 1000
+    sizing.record(1000, 1000 * 100, 0.1)
+    assert sizing.frame_size == 1000